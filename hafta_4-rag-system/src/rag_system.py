@@ -34,13 +34,6 @@ PDF_PATHS = {
 client = chromadb.Client()
 collection_name = "rag_demo_collection"
 
-# Delete and recreate the collection for fresh start
-try:
-    client.delete_collection(collection_name)
-    # print(f"Collection '{collection_name}' deleted.")
-except Exception:
-    pass
-
 # -------------------------------
 # 2️⃣ Embedding Model (DÜZELTME BAŞLANGICI)
 # -------------------------------
@@ -50,12 +43,23 @@ embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
     model_name="all-MiniLM-L6-v2"
 )
 
-# Collection'ı oluştururken embedding_function'ı parametre olarak veriyoruz
-collection = client.create_collection(
-    name=collection_name,
-    metadata={"hnsw:space": "cosine"}, # Kosinüs mesafesi (distance) kullanılıyor: 0.0 en iyi eşleşme
-    embedding_function=embedding_function 
-)
+def create_collection(chroma_client):
+    """Creates an empty collection on the given client (an existing one is deleted)."""
+    # Delete and recreate the collection for fresh start
+    try:
+        chroma_client.delete_collection(collection_name)
+        # print(f"Collection '{collection_name}' deleted.")
+    except Exception:
+        pass
+
+    # Collection'ı oluştururken embedding_function'ı parametre olarak veriyoruz
+    return chroma_client.create_collection(
+        name=collection_name,
+        metadata={"hnsw:space": "cosine"}, # Kosinüs mesafesi (distance) kullanılıyor: 0.0 en iyi eşleşme
+        embedding_function=embedding_function 
+    )
+
+collection = create_collection(client)
 
 # -------------------------------
 # 3️⃣ PDF Reading + Chunk Creation
@@ -113,22 +117,39 @@ for category, path in pdf_files.items():
 # -------------------------------
 # 5️⃣ Add to ChromaDB
 # -------------------------------
-if all_chunks:
-    texts = [c["text"] for c in all_chunks]
-    metadatas = [c["metadata"] for c in all_chunks]
-    ids = [c["metadata"]["chunk_id"] for c in all_chunks]
+def add_chunks(target, chunks):
+    """Adds the chunks (text + metadata) to the given collection."""
+    texts = [c["text"] for c in chunks]
+    metadatas = [c["metadata"] for c in chunks]
+    ids = [c["metadata"]["chunk_id"] for c in chunks]
 
-    collection.add(
+    target.add(
         documents=texts,
         metadatas=metadatas,
         ids=ids
     )
 
+if all_chunks:
+    add_chunks(collection, all_chunks)
+
     print(f"✅ {pdf_found_count} PDFs loaded, {len(all_chunks)} total chunks added to ChromaDB!")
 else:
     print("❌ No chunks found. Please ensure 'pdfs/pdf1.pdf', 'pdfs/pdf2.pdf', and 'pdfs/pdf3.pdf' exist.")
 
 
+def rebuild_collection():
+    """
+    Recreates only the ChromaDB client and collection from the chunks already in memory.
+    PDFs are not re-read and the embedding model is not reloaded.
+    """
+    global client, collection
+    client = chromadb.Client()
+    collection = create_collection(client)
+    if all_chunks:
+        add_chunks(collection, all_chunks)
+    return collection
+
+
 # -------------------------------
 # 6️⃣ Vector DB Search Function
 # -------------------------------
@@ -160,6 +181,15 @@ def search_vector_db(query, top_k=1):
 # -------------------------------
 # 7️⃣ OpenAI Response Function
 # -------------------------------
+_openai_clients = {}
+
+def get_openai_client(api_key):
+    """Returns a shared OpenAI client per API key (connection pool is reused across calls)."""
+    client = _openai_clients.get(api_key)
+    if client is None or client.is_closed():
+        client = _openai_clients[api_key] = openai.OpenAI(api_key=api_key)
+    return client
+
 def answer_with_openai(prompt):
     """Generates a response using the OpenAI API."""
     if not OPENAI_AVAILABLE:
@@ -170,8 +200,8 @@ def answer_with_openai(prompt):
         return "❌ OPENAI_API_KEY environment variable not found. Please check your .env file."
     
     try:
-        # Initialize OpenAI client
-        client = openai.OpenAI(api_key=api_key)
+        # Reuse the shared OpenAI client
+        client = get_openai_client(api_key)
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -1,6 +1,5 @@
 import streamlit as st
-# rag_system.py dosyasını aynı dizinde olduğu için doğrudan import ediyoruz.
-from rag_system import rag_pipeline 
+import importlib
 import os
 from dotenv import load_dotenv
 import sys
@@ -9,6 +8,64 @@ import sys
 load_dotenv()
 
 st.set_page_config(page_title="📚 Mini RAG Chat", page_icon="🤖")
+
+
+# -------------------------------
+# Önbellek Katmanları
+# -------------------------------
+def _rag_is_healthy(rag) -> bool:
+    # Bellekteki koleksiyon, yüklenen parçalarla hâlâ tutarlı mı?
+    try:
+        return rag.collection.count() == len(rag.all_chunks)
+    except Exception:
+        return False
+
+
+@st.cache_resource(show_spinner="📚 RAG sistemi yükleniyor (embedding modeli + PDF'ler)...", validate=_rag_is_healthy)
+def load_rag_system():
+    """
+    rag_system modülünü (ChromaDB, embedding modeli, PDF parçaları) süreç başına
+    bir kez yükler; Streamlit'in her rerun'ında yeniden kurulmaz.
+    Sağlık kontrolü başarısız olursa sadece ChromaDB client'ı ve koleksiyon
+    yeniden kurulur; embedding modeli ve okunmuş PDF parçaları korunur.
+    """
+    if "rag_system" in sys.modules:
+        rag = sys.modules["rag_system"]
+        rag.rebuild_collection()
+        return rag
+    # rag_system.py dosyasını aynı dizinde olduğu için doğrudan import ediyoruz.
+    return importlib.import_module("rag_system")
+
+
+class _UncachedResult(Exception):
+    """Hatalı sonuçların önbelleğe yazılmaması için kullanılır."""
+
+    def __init__(self, result):
+        super().__init__("uncached")
+        self.result = result
+
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _cached_rag_pipeline(query: str, use_openai: bool):
+    result = load_rag_system().rag_pipeline(query, use_openai=use_openai)
+    if result["response"].startswith("❌"):
+        raise _UncachedResult(result)
+    return result
+
+
+def run_rag(query: str, use_openai: bool):
+    """
+    Aynı (sorgu, LLM seçeneği) için retrieval ve LLM yanıtını tekrar hesaplamaz;
+    checkbox gibi widget etkileşimleri sorguyu yeniden çalıştırmaz.
+    """
+    try:
+        return _cached_rag_pipeline(query.strip(), use_openai)
+    except _UncachedResult as e:
+        return e.result
+
+
+# Ağır kaynakları ilk çalıştırmada (sorgudan önce) yükle
+load_rag_system()
 st.title("📚 Mini RAG Chat Demo")
 
 st.markdown("""
@@ -31,8 +88,8 @@ if not openai_available:
 if query:
     st.info("🔍 Sorgu işleniyor...")
     
-    # RAG pipeline çalıştır
-    result = rag_pipeline(query, use_openai=use_openai)
+    # RAG pipeline çalıştır (önbellekli)
+    result = run_rag(query, use_openai=use_openai)
     
     if result['context']:
         st.subheader("🔍 Retrieval Sonucu (Bağlam)")
@@ -4,10 +4,14 @@ from dotenv import load_dotenv
 from pathlib import Path
 from storage.lingo_storage import LingoStorage
 from chains.lingo_chain import LingoChain
+from chains.llm_cache import LLMCache
+from chains.quiz_prefetch import QuizSession
+from chains.word_bank import WordBank
 import uuid
 import datetime
 import re
 import os
+import importlib.util
 import pandas as pd
 
 # TTS için
@@ -20,9 +24,40 @@ ROOT = Path(__file__).parent
 DATA_DIR = ROOT / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
+# ---------- cached resources ----------
+# Streamlit her etkileşimde script'i baştan çalıştırır; storage ve LLM chain
+# süreç başına bir kez oluşturulur ve sağlık kontrolünden geçtikçe yeniden kullanılır.
+def _storage_is_healthy(s: LingoStorage) -> bool:
+    return s.db_file.exists()
+
+
+def _chain_is_healthy(chain: LingoChain) -> bool:
+    root = getattr(chain.llm, "root_client", None)
+    return root is None or not root.is_closed()
+
+
+@st.cache_resource(show_spinner=False, validate=_storage_is_healthy)
+def get_storage(data_dir: str) -> LingoStorage:
+    return LingoStorage(Path(data_dir))
+
+
+@st.cache_resource(show_spinner=False, validate=_chain_is_healthy)
+def get_lingo(model: str = "gpt-4o-mini", temperature: float = 0.7) -> LingoChain:
+    # Kelime bazlı LLM cevapları (word, level) anahtarıyla diskte saklanır; tüm kullanıcılar
+    # ve süreçler paylaşır. Pratik alanına her yazışta olan rerun'lar LLM'e gitmez.
+    return LingoChain(model=model, temperature=temperature, cache=LLMCache(DATA_DIR / "llm_cache.db"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_word_bank() -> WordBank:
+    # Günün kelimeleri önceden üretilmiş havuzdan gelir; havuz arka planda doldurulur
+    return WordBank(DATA_DIR / "word_bank.db", get_lingo())
+
+
 # init storage & LLM chain
-storage = LingoStorage(DATA_DIR)
-lingo = LingoChain()
+storage = get_storage(str(DATA_DIR))
+lingo = get_lingo()
+word_bank = get_word_bank()
 
 st.set_page_config(page_title="LingoMind • Kişisel İngilizce Asistanı", layout="wide")
 st.title("🧠 LingoMind — Personal English Vocabulary Coach")
@@ -123,6 +158,11 @@ with st.sidebar:
             except Exception:
                 pass
         st.markdown("---")
+        cache_stats = lingo.cache_stats()
+        if cache_stats:
+            st.caption(f"LLM cache: %{cache_stats['hit_rate'] * 100:.0f} isabet "
+                       f"({cache_stats['memory_hits'] + cache_stats['disk_hits']} / "
+                       f"{cache_stats['memory_hits'] + cache_stats['disk_hits'] + cache_stats['misses']})")
         if st.button("Günün kelimelerini al (1–3)"):
             st.session_state["fetch_words"] = True
             try:
@@ -140,6 +180,10 @@ if not user:
     st.error("Kullanıcı bulunamadı; lütfen profili yeniden oluşturun.")
     st.stop()
 
+# Kullanıcının daha önce gördüğü kelimeler havuzdan tekrar önerilmez
+known_words = {str(e.get("word") or "").strip().lower() for e in storage.get_user_words(user["id"])}
+word_bank.ensure(user["level"], user["interest"], exclude=known_words)
+
 # Ensure session keys
 if "quiz_results" not in st.session_state:
     st.session_state["quiz_results"] = []
@@ -157,7 +201,7 @@ with col1:
         if st.session_state.get("fetch_words"):
             n = st.slider("Kaç kelime istersin?", 1, 3, 1)
             try:
-                raw = lingo.suggest_words(level=user["level"], interest=user["interest"], n=n)
+                raw = word_bank.take(level=user["level"], interest=user["interest"], n=n, exclude=known_words)
             except Exception:
                 raw = None
             suggestions = []
@@ -213,16 +257,11 @@ with col1:
 
         if practice_word:
             try:
-                teach_text = lingo.teach_word(word=practice_word, level=user["level"])
-                short = _truncate_metadata(teach_text).splitlines()
+                card = lingo.practice_bundle(word=practice_word.strip().lower(), level=user["level"])
+                short = _truncate_metadata(card.get("teaching", "")).splitlines()
                 if short:
                     st.markdown(f"**Kelime hakkında (kısa):** {_clean_inline(short[0])}")
-            except Exception:
-                pass
-            try:
-                trans_prompt = f'Provide a one-word Turkish translation for the English word \"{practice_word}\". Return only the translation.'
-                tur = lingo.llm_call(trans_prompt)
-                tur = _clean_inline(_unwrap_content(tur))
+                tur = _clean_inline(card.get("translation", ""))
                 if tur:
                     st.markdown(f"**Türkçe karşılığı:** `{tur}`")
             except Exception:
@@ -235,33 +274,18 @@ with col1:
             if not practice_word or not user_sentence:
                 st.warning("Kelime ve örnek cümle girin.")
             else:
-                corr = lingo.correct_answer(expected=practice_word, user_input=user_sentence)
-                raw = _unwrap_content(corr)
-                cleaned = _truncate_metadata(raw).strip()
-                lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
-                corrected = None
-                explanation = None
-                # quick parsing (same logic as before but minimal)
-                m = re.search(r'["“”\']([^"“”\']+?)["“”\']', cleaned)
-                if m:
-                    corrected = m.group(1).strip()
-                if not corrected:
-                    m2 = re.search(r'Correct(?:ed)?(?:\sversion)?(?:\sis|:)\s*(.+)', cleaned, re.I)
-                    if m2:
-                        corrected = m2.group(1).splitlines()[0].strip()
-                if len(lines) >= 2:
-                    explanation = lines[1]
-                # translate explanation short
-                expl_tr = ""
-                if explanation:
-                    expl_tr = lingo.llm_call("Translate this short sentence into Turkish (one short phrase):\n\n" + explanation)
-                    expl_tr = _clean_inline(_unwrap_content(expl_tr))
+                # düzeltme + açıklama + Türkçe çevirisi tek çağrıda (kelime kartı zaten cache'te)
+                check = lingo.practice_bundle(word=practice_word, level=user["level"],
+                                              user_sentence=user_sentence, include_card=False)
+                corrected = _clean_inline(check.get("corrected", ""))
+                explanation = _clean_inline(check.get("explanation", ""))
+                expl_tr = _clean_inline(check.get("explanation_tr", ""))
                 if corrected:
                     st.markdown(f"**✅ Düzeltme:** `{corrected}`")
                 if explanation:
                     st.markdown(f"**💡 Açıklama (TR):** {expl_tr or explanation}")
                 # store
-                res = "ok" if ("no change needed" in cleaned.lower() or "correct as" in cleaned.lower()) else "failed"
+                res = "ok" if check.get("is_correct") else "failed"
                 storage.append_word_entry({
                     "user_id": user["id"],
                     "word": practice_word,
@@ -336,7 +360,7 @@ with col1:
             words_list = []
             if source.startswith("Günün"):
                 try:
-                    raw = lingo.suggest_words(level=user["level"], interest=user["interest"], n=qn)
+                    raw = word_bank.take(level=user["level"], interest=user["interest"], n=qn, exclude=known_words)
                 except Exception:
                     raw = []
                 if isinstance(raw, list):
@@ -365,14 +389,19 @@ with col1:
             if not words_list:
                 st.info("Kelime listesi oluşturulamadı. Önce birkaç kelime ekleyin veya tekrar deneyin.")
             else:
-                quiz = lingo.generate_quiz(words=words_list, n_questions=qn)
-                if not quiz:
+                previous = st.session_state.get("quiz")
+                if isinstance(previous, QuizSession):
+                    previous.cancel()
+                # Sorular kelime başına paralel üretilir; sadece ilki beklenir,
+                # kalanlar kullanıcı cevaplarken arka planda hazırlanır
+                quiz = QuizSession(lingo, words_list, n_questions=qn)
+                if quiz.get(0, timeout=60) is None and quiz.done:
                     st.info("Quiz oluşturulamadı. Lütfen tekrar deneyin.")
                 else:
                     st.session_state.quiz = quiz
                     st.session_state.quiz_idx = 0
                     st.session_state.quiz_score = 0
-                    st.session_state.quiz_total = len(quiz)
+                    st.session_state.quiz_total = quiz.total
                     st.session_state.quiz_answered = False
                     # reset results list for this new quiz
                     st.session_state.quiz_results = []
@@ -380,12 +409,20 @@ with col1:
 
         # show quiz only if exists and valid
         if st.session_state.get("quiz"):
-            quiz = st.session_state.get("quiz", [])
+            quiz = st.session_state.get("quiz")
             idx = int(st.session_state.get("quiz_idx", 0))
-            total = len(quiz)
+            # Normalde soru önceden hazırdır; değilse burada üretilmesi beklenir
+            q = quiz.get(idx, timeout=60) if idx < quiz.total else None
+            total = quiz.total
+
+            if q is None and not quiz.done:
+                # Zaman aşımı: soru hâlâ üretiliyor, quiz bitmiş sayılmaz
+                st.info("Sıradaki soru hâlâ hazırlanıyor, lütfen biraz bekleyin.")
+                st.button("Tekrar dene", key=f"quiz_wait_{idx}")
 
             # Guard: if idx out of bounds, finalize quiz gracefully
-            if idx >= total:
+            elif q is None:
+                quiz.cancel()
                 score = st.session_state.get("quiz_score", 0)
                 st.success(f"Quiz tamamlandı — Skor: {score}/{total}")
                 # store summary in storage
@@ -419,8 +456,9 @@ with col1:
                 safe_rerun()
 
             else:
-                q = quiz[idx]
                 st.markdown(f"**Soru {idx+1}/{total}**")
+                if not quiz.done:
+                    st.caption(f"{quiz.ready}/{total} soru hazır")
                 st.markdown(q.get("question") or "")
 
                 # show options or fill-in
@@ -626,10 +664,19 @@ with col2:
 
     st.markdown("---")
     if st.button("CSV olarak indir (öğrenilenler)"):
-        out = storage.export_user_words_csv(user["id"], DATA_DIR / f"{user['id']}_words.csv")
-        if out:
-            with open(out, "rb") as f:
-                st.download_button("İndir CSV", f, file_name=out.name)
+        # CSV is written straight from the storage cursor into memory (no DataFrame, no temp file)
+        csv_bytes = storage.user_words_csv_bytes(user["id"])
+        if csv_bytes:
+            st.download_button("İndir CSV", csv_bytes, file_name=f"{user['id']}_words.csv", mime="text/csv")
+        else:
+            st.info("Henüz kayıt yok.")
+
+    # Parquet sadece bu butona basılınca üretilir (pyarrow kuruluysa)
+    if importlib.util.find_spec("pyarrow") is not None and st.button("Parquet olarak indir (analiz için)"):
+        parquet_buf = io.BytesIO()
+        if storage.export_user_words_parquet(user["id"], parquet_buf) is not None:
+            st.download_button("İndir Parquet", parquet_buf.getvalue(),
+                               file_name=f"{user['id']}_words.parquet", mime="application/octet-stream")
         else:
             st.info("Henüz kayıt yok.")
 
@@ -0,0 +1,228 @@
+# chains/json_repair.py
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+# Tolerant JSON reader for LLM output. One left-to-right pass rebuilds valid JSON
+# text, fixing the defects models typically produce:
+# - prose / ``` fences around the JSON, and text after it
+# - single or smart quotes, unquoted keys, Python True/False/None
+# - unescaped quotes and raw newlines inside strings
+# - # and // comments, trailing or missing commas, missing colons
+# - truncated output (open strings and containers are closed, dangling keys dropped)
+# - several top-level objects/arrays in a row (returned as one list)
+
+_OPEN_QUOTES = {'"': '"”', "'": "'’", "“": '”"', "‘": "’'", "„": '“”"'}
+_CONSTANTS = {"true": "true", "false": "false", "null": "null",
+              "True": "true", "False": "false", "None": "null"}
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$')
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"', "'": "'"}
+# Bare (unquoted) tokens end at these; keys additionally end at ':'. Quotes inside
+# a bare token are apostrophes ("don't"), so they do not end it.
+_VALUE_STOP = set(',{}[]\n#')
+_KEY_STOP = _VALUE_STOP | {":"}
+
+
+def _string_closes(text: str, j: int, in_key: bool) -> bool:
+    # A quote only ends the string if what follows fits the JSON structure;
+    # otherwise it is an unescaped quote or apostrophe inside the text.
+    n = len(text)
+    newline = False
+    while j < n and text[j].isspace():
+        newline = newline or text[j] == "\n"
+        j += 1
+    if j >= n or newline:
+        return True
+    return text[j] in (":,}" if in_key else ",}]#")
+
+
+def _read_string(text: str, i: int, in_key: bool) -> Tuple[str, int]:
+    closers = _OPEN_QUOTES[text[i]]
+    buf: List[str] = []
+    i += 1
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c == "\\" and i + 1 < n:
+            nxt = text[i + 1]
+            if nxt == "u" and re.match(r'[0-9a-fA-F]{4}', text[i + 2:i + 6]):
+                buf.append(chr(int(text[i + 2:i + 6], 16)))
+                i += 6
+            else:
+                buf.append(_ESCAPES.get(nxt, nxt))
+                i += 2
+            continue
+        if c in closers and _string_closes(text, i + 1, in_key):
+            return "".join(buf), i + 1
+        buf.append(c)
+        i += 1
+    # Truncated: keep what was generated
+    return "".join(buf), n
+
+
+def _bare_literal(token: str) -> str:
+    if token in _CONSTANTS:
+        return _CONSTANTS[token]
+    if _NUMBER.match(token):
+        return token
+    return json.dumps(token, ensure_ascii=False)
+
+
+class _Builder:
+    def __init__(self):
+        self.out: List[str] = []
+        # [kind, expect]; expect is key/colon/value/comma for "{", value/comma for "["
+        self.stack: List[List[str]] = []
+
+    def expecting_key(self) -> bool:
+        return bool(self.stack) and self.stack[-1][0] == "{" and self.stack[-1][1] in ("key", "comma")
+
+    def _before_value(self):
+        top = self.stack[-1]
+        if top[0] == "[":
+            if top[1] == "comma":
+                self.out.append(",")
+        elif top[1] == "colon":
+            self.out.append(":")
+        elif top[1] in ("key", "comma"):
+            # A value where a key belongs (e.g. a nested object without a key): give it one
+            if top[1] == "comma":
+                self.out.append(",")
+            self.out.append(json.dumps(f"_{len(self.out)}"))
+            self.out.append(":")
+        top[1] = "comma"
+
+    def scalar(self, literal: str, key_literal: str):
+        top = self.stack[-1]
+        if top[0] == "{" and top[1] in ("key", "comma"):
+            if top[1] == "comma":
+                # Missing comma between members
+                self.out.append(",")
+            self.out.append(key_literal)
+            top[1] = "colon"
+            return
+        self._before_value()
+        self.out.append(literal)
+
+    def open(self, kind: str):
+        if self.stack:
+            self._before_value()
+        self.out.append(kind)
+        self.stack.append([kind, "key" if kind == "{" else "value"])
+
+    def comma(self):
+        top = self.stack[-1]
+        if top[1] == "comma":
+            self.out.append(",")
+            top[1] = "key" if top[0] == "{" else "value"
+        # A comma anywhere else (leading, doubled, after a key) is dropped
+
+    def colon(self):
+        top = self.stack[-1]
+        if top[0] == "{" and top[1] == "colon":
+            self.out.append(":")
+            top[1] = "value"
+
+    def close(self):
+        kind, expect = self.stack.pop()
+        if kind == "{":
+            if expect == "value":
+                # Key and colon without a value: drop both
+                self.out.pop()
+                expect = "colon"
+            if expect == "colon":
+                self.out.pop()
+        if self.out[-1] == ",":
+            self.out.pop()
+        self.out.append("}" if kind == "{" else "]")
+
+
+def _skip_comment(text: str, i: int) -> Optional[int]:
+    if text[i] == "#" or text.startswith("//", i):
+        end = text.find("\n", i)
+        return len(text) if end == -1 else end
+    if text.startswith("/*", i):
+        end = text.find("*/", i + 2)
+        return len(text) if end == -1 else end + 2
+    return None
+
+
+def repair_json(text: str) -> str:
+    """
+    Return valid JSON text for the first JSON object/array in `text` (several
+    consecutive top-level values of the same kind are wrapped into one list).
+    Raises ValueError if there is no object or array at all.
+    """
+    starts = [p for p in (text.find("{"), text.find("[")) if p != -1]
+    if not starts:
+        raise ValueError("no JSON object or array found")
+    i = min(starts)
+    first_kind = text[i]
+    values: List[str] = []
+    b = _Builder()
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if not b.stack:
+            # Between top-level values: only another value of the same kind continues
+            nxt = text.find(first_kind, i)
+            if nxt == -1 or text[i:nxt].strip(" \t\r\n,"):
+                break
+            i = nxt
+            c = first_kind
+        if c.isspace() or c == "`":
+            i += 1
+            continue
+        skipped = _skip_comment(text, i)
+        if skipped is not None:
+            i = skipped
+            continue
+        if c in "{[":
+            b.open(c)
+            i += 1
+        elif c in "}]":
+            b.close()
+            i += 1
+            if not b.stack:
+                values.append("".join(b.out))
+                b.out = []
+        elif c == ",":
+            b.comma()
+            i += 1
+        elif c == ":":
+            b.colon()
+            i += 1
+        elif c in _OPEN_QUOTES:
+            in_key = b.expecting_key()
+            s, i = _read_string(text, i, in_key)
+            literal = json.dumps(s, ensure_ascii=False)
+            b.scalar(literal, literal)
+        else:
+            in_key = b.expecting_key()
+            stop = _KEY_STOP if in_key else _VALUE_STOP
+            j = i
+            while j < n and text[j] not in stop and not text.startswith("//", j):
+                j += 1
+            token = text[i:j].strip()
+            head = token.split(None, 1)[0] if token else ""
+            if not in_key and head != token and (head in _CONSTANTS or _NUMBER.match(head)):
+                # Number/constant followed by more text on the line: a missing comma
+                token = head
+                j = i + len(head)
+            i = j
+            if token:
+                b.scalar(_bare_literal(token), json.dumps(token, ensure_ascii=False))
+    # Truncated output: close whatever is still open
+    while b.stack:
+        b.close()
+    if b.out:
+        values.append("".join(b.out))
+    return values[0] if len(values) == 1 else "[" + ",".join(values) + "]"
+
+
+def loads_lenient(text: str) -> Any:
+    """json.loads for LLM output: strict parse first, repair pass only if needed."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(repair_json(text))
@@ -1,8 +1,18 @@
 # chains/lingo_chain.py
 from langchain_openai import ChatOpenAI
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional
+
+from chains.json_repair import repair_json
+from chains.llm_cache import LLMCache
+
+# Models that accept response_format={"type": "json_object"} (OpenAI JSON mode)
+JSON_MODE_MODELS = ("gpt-4o", "gpt-4.1", "gpt-4-turbo", "gpt-3.5-turbo", "o1", "o3", "o4")
+# Keys that mark a JSON object as a single item (word / question) rather than a wrapper
+ITEM_KEYS = ("word", "Word", "term", "question")
 
 class LingoChain:
     """
@@ -13,17 +23,31 @@ class LingoChain:
     - teach_word(word, level)
     - correct_answer(expected, user_input)
     - mini_speaking(word, level)
+    - translate_word(word)
+    - practice_bundle(word, level, user_sentence)  # tek LLM çağrısında pratik içeriği
     - generate_quiz(words, n_questions)
+    - aiter_quiz / agenerate_quiz  # async: kelime başına paralel soru üretimi
     - llm(prompt)  # raw prompt call
+    Kelime bazlı çağrılar (teach_word, mini_speaking, translate_word, kelime kartı)
+    `cache` verilirse (word, level) anahtarıyla kullanıcılar arasında paylaşılarak saklanır.
+    JSON bekleyen çağrılar destekleyen modellerde JSON mode ile yapılır; cevap
+    json_repair ile tek geçişte onarılarak okunur.
     """
 
-    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.7):
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.7, cache: Optional[LLMCache] = None,
+                 json_mode: Optional[bool] = None):
         self.llm = ChatOpenAI(model=model, temperature=temperature)
+        self.model = model
+        self.cache = cache
+        self.json_mode = model.startswith(JSON_MODE_MODELS) if json_mode is None else json_mode
+        # how JSON replies were read: valid as-is, valid after repair, unusable (-> text fallback)
+        self.json_stats = {"strict": 0, "repaired": 0, "failed": 0}
 
-    def _call_llm(self, prompt: str, max_tokens: int = 300) -> str:
+    def _call_llm(self, prompt: str, max_tokens: int = 300, strict: bool = False) -> str:
         """
         Call the LLM safely and return text.
         Attempts different call styles depending on installed langchain version.
+        With strict=True a failed call raises instead of returning the prompt.
         """
         try:
             # LangChain ChatOpenAI usually supports __call__ returning text
@@ -43,62 +67,172 @@ class LingoChain:
                 except Exception:
                     return str(resp)
             except Exception:
+                if strict:
+                    raise
                 # ultimate fallback
                 return str(prompt)
 
+    def _call_json(self, prompt: str, max_tokens: int = 300, strict: bool = False) -> str:
+        """
+        Call the LLM for a JSON reply. Uses JSON mode when the model supports it
+        (the prompt must mention JSON and ask for an object); otherwise a plain call.
+        """
+        if self.json_mode:
+            try:
+                out = self.llm.bind(response_format={"type": "json_object"}, max_tokens=max_tokens).invoke(prompt)
+                return str(getattr(out, "content", out))
+            except Exception as e:
+                # only older langchain / endpoints without JSON mode get a plain call
+                if not self._json_mode_unsupported(e):
+                    if strict:
+                        raise
+                    return str(prompt)
+        return self._call_llm(prompt, max_tokens=max_tokens, strict=strict)
+
+    @staticmethod
+    def _json_mode_unsupported(e: Exception) -> bool:
+        # The client has no bind()/response_format, or the endpoint rejected the request (400).
+        # Upstream outages (timeouts, 429, 5xx) are not retried as a plain call.
+        return isinstance(e, (AttributeError, NotImplementedError, TypeError)) or getattr(e, "status_code", None) == 400
+
+    # --- async calls ---
+    async def _acall_llm(self, prompt: str, max_tokens: int = 300, strict: bool = False) -> str:
+        """
+        Async variant of _call_llm. Only an LLM without an async API falls back
+        to the sync call in a worker thread; upstream errors are not retried.
+        """
+        try:
+            out = await self.llm.ainvoke(prompt)
+        except (AttributeError, NotImplementedError):
+            return await asyncio.to_thread(self._call_llm, prompt, max_tokens, strict)
+        except Exception:
+            if strict:
+                raise
+            # same fallback as _call_llm
+            return str(prompt)
+        return str(getattr(out, "content", out))
+
+    async def _acall_json(self, prompt: str, max_tokens: int = 300, strict: bool = False) -> str:
+        if self.json_mode:
+            try:
+                llm = self.llm.bind(response_format={"type": "json_object"}, max_tokens=max_tokens)
+                out = await llm.ainvoke(prompt)
+                return str(getattr(out, "content", out))
+            except Exception as e:
+                if not self._json_mode_unsupported(e):
+                    if strict:
+                        raise
+                    return str(prompt)
+        return await self._acall_llm(prompt, max_tokens=max_tokens, strict=strict)
+
+    def _parse_json(self, raw: str) -> Any:
+        """Strict json.loads first, then the one-pass repair; None if there is no JSON at all."""
+        try:
+            obj = json.loads(raw)
+            self.json_stats["strict"] += 1
+            return obj
+        except ValueError:
+            pass
+        try:
+            obj = json.loads(repair_json(raw))
+            self.json_stats["repaired"] += 1
+            return obj
+        except ValueError:
+            self.json_stats["failed"] += 1
+            return None
+
+    @staticmethod
+    def _json_items(obj: Any, key: str) -> List[Any]:
+        # JSON mode returns an object: {"words": [...]}; plain calls may return a bare
+        # list, and a one-item reply is often the item object itself
+        if isinstance(obj, list):
+            return obj
+        if isinstance(obj, dict):
+            if isinstance(obj.get(key), list):
+                return obj[key]
+            if any(k in obj for k in ITEM_KEYS):
+                return [obj]
+            lists = [v for v in obj.values() if isinstance(v, list)]
+            return lists[0] if lists else [obj]
+        return []
+
+    def _cached(self, kind: str, word: str, level: str, compute: Callable[[], Any], fallback: Any = None) -> Any:
+        """
+        Memoize a word-level answer. Failed (raising) or empty answers are not
+        stored; `fallback` is returned for failures.
+        """
+        key = LLMCache.make_key(kind, self.model, word.strip().lower(), level) if self.cache else None
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        try:
+            value = compute()
+        except Exception:
+            return fallback
+        if key is not None and value:
+            self.cache.set(key, value)
+        return value if value is not None else fallback
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache else {}
+
     # --- existing helper methods (simple) ---
-    def suggest_words(self, level: str = "B1", interest: str = "general", n: int = 1) -> List[Dict[str, Any]]:
+    def suggest_words(self, level: str = "B1", interest: str = "general", n: int = 1,
+                      exclude: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Ask LLM for n words for given level/interest. Returns normalized list of dicts:
         [{word, meaning, example}, ...]
+        exclude: words that must not be suggested (e.g. already in the word bank)
         """
         prompt = (
             f"Suggest {n} English vocabulary words for a learner level {level} "
-            f"interested in {interest}. For each word return short fields: Word, Meaning (Turkish short), Example sentence. "
-            "Return as a short numbered list or JSON. Be concise."
+            f"interested in {interest}. For each word return short fields: word, meaning (Turkish short), example (sentence). "
+            'Return JSON only, in this format: {"words": [{"word": "...", "meaning": "...", "example": "..."}]}. '
+            "Be concise."
         )
-        raw = self._call_llm(prompt)
-        # Try to find JSON first
-        json_obj = None
+        if exclude:
+            prompt += f"\nDo not suggest any of these words: {', '.join(exclude)}."
         try:
-            # extract {...} or [...]
-            m = re.search(r'(\[.*\]|\{.*\})', raw, re.S)
-            if m:
-                jtxt = m.group(1)
-                json_obj = json.loads(jtxt)
-                if isinstance(json_obj, dict):
-                    # convert to list
-                    json_obj = [json_obj]
-            else:
-                # try to parse line blocks into list
-                parsed = []
-                blocks = [b.strip() for b in re.split(r'\n\s*\n', raw) if b.strip()]
-                for blk in blocks:
-                    # each block may contain "Word: X" lines
-                    word = re.search(r'(?:Word|word|Kelime|term)[:\s-]+(.+)', blk)
-                    meaning = re.search(r'(?:Meaning|meaning|Anlam|Türkçe)[:\s-]+(.+)', blk)
-                    example = re.search(r'(?:Example|example|Örnek)[:\s-]+(.+)', blk)
-                    parsed.append({
-                        "word": (word.group(1).strip() if word else blk.splitlines()[0].strip()),
-                        "meaning": (meaning.group(1).strip() if meaning else ""),
-                        "example": (example.group(1).strip() if example else "")
-                    })
-                json_obj = parsed
+            raw = self._call_json(prompt, max_tokens=min(100 + 60 * n, 2000), strict=True)
         except Exception:
-            # fallback: produce very small structured output
-            items = []
-            lines = [ln.strip() for ln in raw.splitlines() if ln.strip()]
-            for ln in lines[:n]:
-                items.append({"word": ln, "meaning": "", "example": ""})
-            json_obj = items
-        return json_obj or []
+            # a non-strict failure returns the prompt, whose JSON template would parse as a word
+            return []
+        items = self._json_items(self._parse_json(raw), "words")
+        if items:
+            words = []
+            for it in items:
+                if isinstance(it, dict):
+                    words.append({
+                        "word": str(it.get("word") or it.get("Word") or it.get("term") or it.get("kelime") or "").strip(),
+                        "meaning": str(it.get("meaning") or it.get("Meaning") or it.get("anlam") or "").strip(),
+                        "example": str(it.get("example") or it.get("Example") or it.get("örnek") or "").strip()
+                    })
+                elif isinstance(it, str):
+                    words.append({"word": it.strip(), "meaning": "", "example": ""})
+            return [w for w in words if w["word"]]
+
+        # No JSON at all: try to parse line blocks into list
+        parsed = []
+        blocks = [b.strip() for b in re.split(r'\n\s*\n', raw) if b.strip()]
+        for blk in blocks:
+            # each block may contain "Word: X" lines
+            word = re.search(r'(?:Word|word|Kelime|term)[:\s-]+(.+)', blk)
+            meaning = re.search(r'(?:Meaning|meaning|Anlam|Türkçe)[:\s-]+(.+)', blk)
+            example = re.search(r'(?:Example|example|Örnek)[:\s-]+(.+)', blk)
+            parsed.append({
+                "word": (word.group(1).strip() if word else blk.splitlines()[0].strip()),
+                "meaning": (meaning.group(1).strip() if meaning else ""),
+                "example": (example.group(1).strip() if example else "")
+            })
+        return parsed
 
     def teach_word(self, word: str, level: str = "B1") -> str:
         prompt = (
             f"Give a short teaching snippet for the word '{word}' for level {level}.\n"
             "One-line definition, one short example sentence, one quick tip to remember."
         )
-        return self._call_llm(prompt)
+        return self._cached("teach", word, level, lambda: self._call_llm(prompt, strict=True), fallback=prompt)
 
     def correct_answer(self, expected: str, user_input: str) -> str:
         prompt = (
@@ -113,12 +247,122 @@ class LingoChain:
             f"Provide a one-sentence speaking prompt using the word '{word}' for level {level}, "
             "a one-line pronounciation / IPA, and a one-line tip. Return 3 short lines labeled Example, Pronunciation, Tip."
         )
-        return self._call_llm(prompt)
+        return self._cached("speaking", word, level, lambda: self._call_llm(prompt, strict=True), fallback=prompt)
+
+    def translate_word(self, word: str) -> str:
+        prompt = f'Provide a one-word Turkish translation for the English word "{word}". Return only the translation.'
+        # the translation does not depend on the level
+        return self._cached("translate", word, "", lambda: self._call_llm(prompt, strict=True), fallback=prompt)
 
     def llm_call(self, prompt: str) -> str:
         """Expose generic LLM call"""
         return self._call_llm(prompt)
 
+    # --- combined practice call ---
+    def practice_bundle(self, word: str, level: str = "B1", user_sentence: Optional[str] = None,
+                        include_card: bool = True) -> Dict[str, Any]:
+        """
+        Everything the practice tab needs in one LLM round trip.
+        The card-only call (no user_sentence) is cached per (word, level).
+        Returns a dict with (depending on the arguments):
+        {
+            "teaching": "short teaching snippet",         # include_card
+            "translation": "Turkish translation",         # include_card
+            "is_correct": True,                           # user_sentence
+            "corrected": "corrected full sentence",       # user_sentence
+            "explanation": "short explanation",           # user_sentence
+            "explanation_tr": "explanation in Turkish"    # user_sentence
+        }
+        If the reply is not valid JSON, the separate prompts are sent concurrently
+        instead (explanation_tr is then left empty to avoid a second round trip).
+        """
+        fields = {}
+        if include_card:
+            fields["teaching"] = "one line: short definition, one short example sentence, one quick tip to remember"
+            fields["translation"] = "one-word Turkish translation of the target word"
+        if user_sentence:
+            fields["is_correct"] = "true if the user sentence is correct and uses the word properly, else false"
+            fields["corrected"] = "the corrected full sentence (the original sentence if it is correct)"
+            fields["explanation"] = "one short English explanation of the correction"
+            fields["explanation_tr"] = "the explanation translated into Turkish (one short phrase)"
+        if not fields:
+            return {}
+
+        prompt = (
+            f"You are a concise English tutor for a Turkish learner at level {level}. "
+            f"The target word is '{word}'.\n"
+            + (f'User sentence: "{user_sentence}"\n' if user_sentence else "")
+            + "Return ONLY a JSON object with these keys:\n"
+            + "\n".join(f'  "{k}": {v}' for k, v in fields.items())
+        )
+
+        def ask() -> Optional[Dict[str, Any]]:
+            parsed = self._parse_json(self._call_json(prompt, max_tokens=400, strict=True))
+            if not isinstance(parsed, dict) or not all(k in parsed for k in fields):
+                return None
+            return self._normalize_bundle(parsed, fields)
+
+        if user_sentence:
+            try:
+                bundle = ask()
+            except Exception:
+                bundle = None
+        else:
+            bundle = self._cached("card", word, level, ask)
+        if bundle is None:
+            return self._practice_fanout(word, level, user_sentence, include_card)
+        return bundle
+
+    @staticmethod
+    def _normalize_bundle(obj: Dict[str, Any], fields: Dict[str, str]) -> Dict[str, Any]:
+        out = {}
+        for key in fields:
+            val = obj.get(key)
+            if key == "is_correct":
+                out[key] = val if isinstance(val, bool) else str(val).strip().lower() in ("true", "yes", "1")
+            else:
+                out[key] = "" if val is None else str(val).strip()
+        return out
+
+    def _practice_fanout(self, word: str, level: str, user_sentence: Optional[str],
+                         include_card: bool) -> Dict[str, Any]:
+        # fallback: old single-purpose prompts, sent in parallel
+        calls = {}
+        if include_card:
+            calls["teaching"] = lambda: self.teach_word(word=word, level=level)
+            calls["translation"] = lambda: self.translate_word(word)
+        if user_sentence:
+            calls["correction"] = lambda: self.correct_answer(expected=word, user_input=user_sentence)
+        with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+            futures = {k: pool.submit(fn) for k, fn in calls.items()}
+            texts = {k: f.result() for k, f in futures.items()}
+
+        out = {k: texts[k].strip() for k in ("teaching", "translation") if k in texts}
+        if "correction" in texts:
+            out.update(self._parse_correction(texts["correction"]))
+        return out
+
+    @staticmethod
+    def _parse_correction(raw: str) -> Dict[str, Any]:
+        """Parse the free-text reply of correct_answer()."""
+        cleaned = raw.strip()
+        lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
+        corrected = ""
+        m = re.search(r'["“”\']([^"“”\']+?)["“”\']', cleaned)
+        if m:
+            corrected = m.group(1).strip()
+        if not corrected:
+            m2 = re.search(r'Correct(?:ed)?(?:\sversion)?(?:\sis|:)\s*(.+)', cleaned, re.I)
+            if m2:
+                corrected = m2.group(1).splitlines()[0].strip()
+        low = cleaned.lower()
+        return {
+            "is_correct": "no change needed" in low or "correct as" in low,
+            "corrected": corrected,
+            "explanation": lines[1] if len(lines) >= 2 else "",
+            "explanation_tr": "",
+        }
+
     # --- NEW: generate_quiz ---
     def generate_quiz(self, words: List[Dict[str, Any]], n_questions: int = 5) -> List[Dict[str, Any]]:
         """
@@ -142,6 +386,43 @@ class LingoChain:
         if not pool:
             return []
 
+        try:
+            result = self._parse_questions(self._call_json(self._quiz_prompt(pool), max_tokens=800, strict=True))
+        except Exception:
+            result = []
+        if result:
+            return result
+        # Fallback: simple MCQ generation heuristics (meaning-based)
+        return [self._fallback_question(w) for w in pool]
+
+    async def agenerate_question(self, word: Dict[str, Any]) -> Dict[str, Any]:
+        """One small JSON call for a single word; heuristic question if it fails."""
+        try:
+            raw = await self._acall_json(self._quiz_prompt([word]), max_tokens=250, strict=True)
+            questions = self._parse_questions(raw)
+        except Exception:
+            questions = []
+        return questions[0] if questions else self._fallback_question(word)
+
+    async def aiter_quiz(self, words: List[Dict[str, Any]], n_questions: int = 5) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate one question per word concurrently and yield them in completion
+        order, so the first question is ready after a single small call.
+        """
+        tasks = [asyncio.ensure_future(self.agenerate_question(w)) for w in words[:n_questions]]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def agenerate_quiz(self, words: List[Dict[str, Any]], n_questions: int = 5) -> List[Dict[str, Any]]:
+        """Async generate_quiz: per-word questions concurrently, in word order."""
+        return list(await asyncio.gather(*(self.agenerate_question(w) for w in words[:n_questions])))
+
+    @staticmethod
+    def _quiz_prompt(pool: List[Dict[str, Any]]) -> str:
         # Build prompt asking for structured JSON
         examples = []
         for w in pool:
@@ -149,9 +430,9 @@ class LingoChain:
             meaning = w.get("meaning") or w.get("definition") or ""
             examples.append({"word": word, "meaning": meaning})
 
-        prompt = (
+        return (
             "Create a short quiz with the following words. For each word return either a multiple-choice question (mcq) "
-            "with 4 choices (one correct) or a fill-in (cloze) question. Return valid JSON array only. "
+            "with 4 choices (one correct) or a fill-in (cloze) question. Return JSON only. "
             "Format example for each question:\n"
             "{\n"
             '  "type": "mcq",\n'
@@ -163,86 +444,65 @@ class LingoChain:
             "}\n\n"
             "Or for fill:\n"
             '{ "type":"fill", "word":"WORD", "question":"Fill the blank: ...", "answer":"full correct sentence", "explanation":"..." }\n\n'
-            "Use the meanings to craft plausible distractors. Return a JSON array of questions.\n\n"
+            'Use the meanings to craft plausible distractors. Return a JSON object: {"questions": [ ...questions... ]}.\n\n'
             f"INPUT WORDS: {json.dumps(examples, ensure_ascii=False)}\n"
             "Be concise."
         )
 
-        raw = self._call_llm(prompt, max_tokens=800)
-        # Try to extract JSON block
-        try:
-            m = re.search(r'(\[.*\])', raw, re.S)
-            if m:
-                jtxt = m.group(1)
-            else:
-                # maybe LLM used single quotes; normalize
-                jtxt = raw.strip()
-            # replace trailing commas etc — attempt to parse robustly
-            # sanitize smart quotes
-            jtxt = jtxt.replace("“", '"').replace("”", '"').replace("’", "'")
-            # if single quotes used for keys, try to convert to double quotes
-            # naive replace only when it appears like a JSON object
-            if "'" in jtxt and '"' not in jtxt:
-                jtxt = jtxt.replace("'", '"')
-            quiz = json.loads(jtxt)
-            # validate each item
-            result = []
-            for q in quiz:
-                if not isinstance(q, dict):
-                    continue
-                # normalize keys
-                qtype = q.get("type", "mcq")
-                question = q.get("question") or q.get("q") or ""
-                options = q.get("options") or []
-                answer = q.get("answer")
-                explanation = q.get("explanation") or ""
-                word = q.get("word") or ""
-                # ensure options is list
-                if qtype == "mcq" and (not isinstance(options, list) or len(options) < 2):
-                    # skip or convert => try to create options heuristically
-                    continue
-                result.append({
-                    "type": qtype,
-                    "word": word,
-                    "question": question,
-                    "options": options,
-                    "answer": answer,
-                    "explanation": explanation
-                })
-            if result:
-                return result
-        except Exception:
-            pass
+    def _parse_questions(self, raw: str) -> List[Dict[str, Any]]:
+        # validate each item
+        result = []
+        for q in self._json_items(self._parse_json(raw), "questions"):
+            if not isinstance(q, dict):
+                continue
+            # normalize keys
+            qtype = q.get("type", "mcq")
+            question = q.get("question") or q.get("q") or ""
+            options = q.get("options") or []
+            answer = q.get("answer")
+            explanation = q.get("explanation") or ""
+            word = q.get("word") or ""
+            # ensure options is list
+            if qtype == "mcq" and (not isinstance(options, list) or len(options) < 2):
+                # skip or convert => try to create options heuristically
+                continue
+            result.append({
+                "type": qtype,
+                "word": word,
+                "question": question,
+                "options": options,
+                "answer": answer,
+                "explanation": explanation
+            })
+        return result
 
-        # Fallback: simple MCQ generation heuristics (meaning-based)
-        fallback = []
-        for w in pool:
-            word = (w.get("word") or "").strip()
-            meaning = (w.get("meaning") or "").strip()
-            # build three distractors by modifying the meaning or using placeholders
-            distractors = []
-            if meaning:
-                distractors.append(meaning)
-                distractors.append("something similar") 
-                distractors.append("opposite meaning")
-                distractors.append("another meaning")
-                # make options unique and shuffle
-                opts = list(dict.fromkeys(distractors))[:4]
-                # ensure correct included (put at index 0)
-                if meaning in opts:
-                    correct_index = opts.index(meaning)
-                else:
-                    opts[0] = meaning
-                    correct_index = 0
+    @staticmethod
+    def _fallback_question(w: Dict[str, Any]) -> Dict[str, Any]:
+        word = (w.get("word") or "").strip()
+        meaning = (w.get("meaning") or "").strip()
+        # build three distractors by modifying the meaning or using placeholders
+        distractors = []
+        if meaning:
+            distractors.append(meaning)
+            distractors.append("something similar") 
+            distractors.append("opposite meaning")
+            distractors.append("another meaning")
+            # make options unique and shuffle
+            opts = list(dict.fromkeys(distractors))[:4]
+            # ensure correct included (put at index 0)
+            if meaning in opts:
+                correct_index = opts.index(meaning)
             else:
-                opts = ["option1", "option2", "option3", "option4"]
+                opts[0] = meaning
                 correct_index = 0
-            fallback.append({
-                "type": "mcq",
-                "word": word,
-                "question": f"What is the meaning of '{word}'?",
-                "options": opts,
-                "answer": correct_index,
-                "explanation": f"The correct meaning is: {meaning}" if meaning else ""
-            })
-        return fallback
+        else:
+            opts = ["option1", "option2", "option3", "option4"]
+            correct_index = 0
+        return {
+            "type": "mcq",
+            "word": word,
+            "question": f"What is the meaning of '{word}'?",
+            "options": opts,
+            "answer": correct_index,
+            "explanation": f"The correct meaning is: {meaning}" if meaning else ""
+        }
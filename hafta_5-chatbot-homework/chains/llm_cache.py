@@ -0,0 +1,152 @@
+# chains/llm_cache.py
+from collections import OrderedDict
+from pathlib import Path
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+# Two-level cache for LLM answers that only depend on their inputs (word, level, ...):
+# an in-process LRU in front of a SQLite file shared by every session and process.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key     TEXT PRIMARY KEY,
+    value   TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires);
+"""
+
+DEFAULT_TTL = float(os.getenv("LINGO_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("LINGO_CACHE_MEMORY_ENTRIES", "2048"))
+DEFAULT_DISK_ENTRIES = int(os.getenv("LINGO_CACHE_DISK_ENTRIES", "50000"))
+
+# Expired rows and overflow are trimmed once every this many writes
+TRIM_EVERY = 64
+
+
+class LLMCache:
+    # path=None keeps the cache in memory only
+    # ttl: seconds an answer stays valid (same on both levels)
+    # max_disk_entries: oldest entries (by expiry) are dropped beyond this;
+    #   reads never write, so the disk level is FIFO rather than LRU
+    def __init__(self, path: Optional[Union[str, Path]] = None, ttl: float = DEFAULT_TTL,
+                 max_memory_entries: int = DEFAULT_MEMORY_ENTRIES, max_disk_entries: int = DEFAULT_DISK_ENTRIES):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0,
+                       "memory_evictions": 0, "disk_evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn().executescript(SCHEMA)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return json.dumps([str(p) for p in parts], ensure_ascii=False)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection guarded by self._lock; reopened after fork
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # Losing the last few entries on power loss only costs a few LLM calls
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db_pid = os.getpid()
+        return self._db
+
+    # ---------- Reads ----------
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                expires, value = hit
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+            if self.path is not None:
+                try:
+                    row = self._conn().execute(
+                        "SELECT value, expires FROM llm_cache WHERE key = ? AND expires > ?", (key, now)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self._stats["disk_hits"] += 1
+                    return value
+            self._stats["misses"] += 1
+            return None
+
+    # ---------- Writes ----------
+    def set(self, key: str, value: Any):
+        now = time.time()
+        expires = now + self.ttl
+        with self._lock:
+            self._remember(key, expires, value)
+            self._stats["writes"] += 1
+            if self.path is None:
+                return
+            try:
+                conn = self._conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created, expires) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, expires)
+                )
+                self._writes += 1
+                if self._writes % TRIM_EVERY == 0:
+                    self._trim(conn, now)
+            except sqlite3.Error:
+                # A locked or read-only cache file must never break the app
+                pass
+
+    def _remember(self, key: str, expires: float, value: Any):
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _trim(self, conn: sqlite3.Connection, now: float):
+        removed = conn.execute("DELETE FROM llm_cache WHERE expires <= ?", (now,)).rowcount
+        (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count > self.max_disk_entries:
+            removed += conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY expires LIMIT ?)",
+                (count - self.max_disk_entries,)
+            ).rowcount
+        self._stats["disk_evictions"] += max(removed, 0)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.path is not None:
+                self._conn().execute("DELETE FROM llm_cache")
+
+    # ---------- Metrics ----------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["memory_entries"] = len(self._memory)
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = (out["memory_hits"] + out["disk_hits"]) / lookups if lookups else 0.0
+        return out
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,58 @@
+# chains/quiz_prefetch.py
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+
+# Streamlit scripts are synchronous and rerun on every click, so the async quiz
+# pipeline runs on one long-lived event loop in a daemon thread. A QuizSession is
+# kept in st.session_state: the first question is shown as soon as it arrives and
+# the rest keep generating while the user answers.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="quiz-prefetch", daemon=True).start()
+    return _loop
+
+
+class QuizSession:
+    # lingo: a LingoChain; one question is generated per word (words[:n_questions])
+    def __init__(self, lingo, words: List[Dict[str, Any]], n_questions: int = 5):
+        self.total = len(words[:n_questions])
+        self.questions: List[Dict[str, Any]] = []
+        self.done = False
+        self._cond = threading.Condition()
+        self._future = asyncio.run_coroutine_threadsafe(
+            self._run(lingo, words[:n_questions]), _background_loop()
+        )
+
+    async def _run(self, lingo, words: List[Dict[str, Any]]):
+        try:
+            async for question in lingo.aiter_quiz(words, len(words)):
+                with self._cond:
+                    self.questions.append(question)
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                # every word yields a question (LLM or heuristic) unless the run was cancelled
+                self.total = len(self.questions)
+                self.done = True
+                self._cond.notify_all()
+
+    def get(self, idx: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Question idx, waiting until it is generated; None if it never will be (or timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.questions) > idx or self.done, timeout)
+            return self.questions[idx] if idx < len(self.questions) else None
+
+    @property
+    def ready(self) -> int:
+        return len(self.questions)
+
+    def cancel(self):
+        self._future.cancel()
@@ -0,0 +1,161 @@
+# chains/word_bank.py
+from pathlib import Path
+import datetime
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# Pre-generated vocabulary per (level, interest). "Günün kelimeleri" is served from
+# this table; a background thread tops it up with one large suggest_words call
+# whenever a user has fewer than `low_watermark` unseen words left in it.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS word_bank (
+    level    TEXT NOT NULL,
+    interest TEXT NOT NULL,
+    word     TEXT NOT NULL,
+    meaning  TEXT,
+    example  TEXT,
+    created  TEXT NOT NULL,
+    PRIMARY KEY (level, interest, word)
+);
+"""
+
+LOW_WATERMARK = int(os.getenv("WORD_BANK_LOW_WATERMARK", "15"))
+REFILL_BATCH = int(os.getenv("WORD_BANK_REFILL_BATCH", "25"))
+# How many existing words are listed in the refill prompt to avoid duplicates
+MAX_AVOID_IN_PROMPT = 150
+
+
+def _norm(text: Any) -> str:
+    return str(text or "").strip().lower()
+
+
+class WordBank:
+    # lingo: a LingoChain (only suggest_words is used)
+    # low_watermark: refill when a user has fewer unseen words than this for their (level, interest)
+    # refill_batch: words requested per refill call
+    def __init__(self, path: Union[str, Path], lingo, low_watermark: int = LOW_WATERMARK,
+                 refill_batch: int = REFILL_BATCH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lingo = lingo
+        self.low_watermark = low_watermark
+        self.refill_batch = refill_batch
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._refills: "queue.Queue" = queue.Queue()
+        self._pending: Set[Tuple[str, str]] = set()
+        self._worker: Optional[threading.Thread] = None
+        with self._lock:
+            self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection guarded by self._lock; reopened after fork
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db_pid = os.getpid()
+        return self._db
+
+    # ---------- Reads ----------
+    def words(self, level: str, interest: str) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT word, meaning, example FROM word_bank WHERE level = ? AND interest = ?",
+                (_norm(level), _norm(interest))
+            ).fetchall()
+        return [{"word": w, "meaning": m or "", "example": e or ""} for w, m, e in rows]
+
+    def take(self, level: str, interest: str, n: int = 1, exclude: Iterable[str] = ()) -> List[Dict[str, str]]:
+        """
+        Return n random words the user has not seen yet ({word, meaning, example}).
+        Served locally; only an empty/exhausted bank falls back to a synchronous
+        suggest_words call. Schedules a background refill below the watermark.
+        """
+        known = {_norm(w) for w in exclude}
+        unseen = [w for w in self.words(level, interest) if _norm(w["word"]) not in known]
+        picked = random.sample(unseen, min(n, len(unseen)))
+        if len(picked) < n:
+            # Cold start: fetch what is missing now (the refill below fills the rest)
+            avoid = known | {_norm(w["word"]) for w in unseen}
+            fresh = self._generate(level, interest, n - len(picked), avoid=avoid)
+            picked += [w for w in fresh if _norm(w["word"]) not in known][:n - len(picked)]
+        if len(unseen) - len(picked) < self.low_watermark:
+            self.request_refill(level, interest)
+        return picked
+
+    # ---------- Refill ----------
+    def ensure(self, level: str, interest: str, exclude: Iterable[str] = ()):
+        """Schedule a refill if the user is close to running out (non-blocking)."""
+        known = {_norm(w) for w in exclude}
+        unseen = sum(1 for w in self.words(level, interest) if _norm(w["word"]) not in known)
+        if unseen < self.low_watermark:
+            self.request_refill(level, interest)
+
+    def request_refill(self, level: str, interest: str):
+        key = (_norm(level), _norm(interest))
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._refill_loop, name="word-bank-refill", daemon=True)
+                self._worker.start()
+        self._refills.put(key)
+
+    def _refill_loop(self):
+        while True:
+            level, interest = self._refills.get()
+            try:
+                self.refill(level, interest)
+            except Exception:
+                # LLM unavailable: the next request below the watermark retries
+                pass
+            finally:
+                with self._lock:
+                    self._pending.discard((level, interest))
+
+    def refill(self, level: str, interest: str) -> int:
+        """One batched suggest_words call; returns how many new words were added."""
+        existing = {_norm(w["word"]) for w in self.words(level, interest)}
+        return len(self._generate(level, interest, self.refill_batch, avoid=existing))
+
+    def _generate(self, level: str, interest: str, n: int, avoid: Set[str]) -> List[Dict[str, str]]:
+        raw = self.lingo.suggest_words(level=level, interest=interest, n=n,
+                                       exclude=sorted(avoid)[:MAX_AVOID_IN_PROMPT])
+        fresh = []
+        seen = set(avoid)
+        for item in raw or []:
+            if not isinstance(item, dict):
+                continue
+            word = re.sub(r'^\d+[\.\)]\s*', '', str(item.get("word") or "")).strip()
+            # Skip empty rows and whole lines the fallback parser returned as a "word"
+            if not word or len(word) > 40 or _norm(word) in seen:
+                continue
+            seen.add(_norm(word))
+            fresh.append({"word": word, "meaning": str(item.get("meaning") or ""),
+                          "example": str(item.get("example") or "")})
+        self.add(level, interest, fresh)
+        return fresh
+
+    def add(self, level: str, interest: str, words: List[Dict[str, str]]):
+        now = datetime.datetime.utcnow().isoformat()
+        with self._lock:
+            self._conn().executemany(
+                "INSERT OR IGNORE INTO word_bank (level, interest, word, meaning, example, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(_norm(level), _norm(interest), w["word"], w.get("meaning", ""), w.get("example", ""), now)
+                 for w in words]
+            )
+
+    def size(self, level: str, interest: str) -> int:
+        with self._lock:
+            (count,) = self._conn().execute(
+                "SELECT COUNT(*) FROM word_bank WHERE level = ? AND interest = ?", (_norm(level), _norm(interest))
+            ).fetchone()
+        return count
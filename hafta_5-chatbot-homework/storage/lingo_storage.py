@@ -1,110 +1,627 @@
 # storage/lingo_storage.py
 from pathlib import Path
+import csv
+import io
 import json
-from typing import Optional, Dict, Any, List
-import pandas as pd
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import warnings
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager, nullcontext
+from typing import Optional, Dict, Any, Iterator, List, Set, Tuple, Union, IO
 import datetime
 
+# SQLite (WAL) backed storage. Appends are a single indexed INSERT instead of
+# rewriting the whole JSON history; per-user reads only touch that user's rows.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id   TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS words (
+    seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id   TEXT,
+    timestamp TEXT,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_words_user_ts ON words (user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_words_ts ON words (timestamp);
+CREATE TABLE IF NOT EXISTS versions (
+    key     TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    user_id  TEXT NOT NULL,
+    day      TEXT NOT NULL,
+    word     TEXT,
+    count    INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day, word)
+);
+"""
+
+# Bumped when a schema change needs existing data to be backfilled
+# (2: rollups key entries without a word as '' instead of NULL)
+SCHEMA_VERSION = 2
+
+INSERT_WORD = "INSERT INTO words (user_id, timestamp, data) VALUES (?, ?, ?)"
+# Typed columns for the Parquet export; any other entry fields go to a JSON "extra" column
+PARQUET_COLUMNS = ("user_id", "word", "meaning", "example", "timestamp", "result", "failures", "type", "question")
+
+UPSERT_ROLLUP = """
+INSERT INTO daily_rollups (user_id, day, word, count, failures) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(user_id, day, word) DO UPDATE SET
+    count = count + excluded.count, failures = failures + excluded.failures
+"""
+
+# Version keys: every write bumps the key of what it changed, so cached reads can
+# be validated with one primary-key lookup (also across processes).
+USERS_KEY = "users"
+ALL_WORDS_KEY = "words"
+
+
+def _words_key(user_id: str) -> str:
+    return f"words:{user_id}"
+
+
 class LingoStorage:
-    def __init__(self, data_dir: Path):
+    # durable: synchronous=FULL, a committed entry survives power loss (WAL alone survives crashes)
+    # group_commit: appends from concurrent sessions are batched by one writer thread into a
+    #   single transaction (one fsync), and each caller returns only after its batch committed
+    def __init__(self, data_dir: Path, durable: bool = True, group_commit: bool = True, max_batch: int = 256):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db_file = self.data_dir / "lingo.db"
+        # Legacy JSON files: imported once into the database, then renamed
         self.users_file = self.data_dir / "users.json"
         self.words_file = self.data_dir / "words.json"
-        # Ensure files exist
-        for f in (self.users_file, self.words_file):
-            if not f.exists():
-                f.write_text("[]", encoding="utf-8")
+        self._local = threading.local()
+        # In-process read cache: (version, value); invalidated by version bumps
+        self._cache_lock = threading.Lock()
+        self._users_cache = None
+        self._user_words_cache: Dict[str, Any] = {}
+        self.durable = durable
+        self.group_commit = group_commit
+        self.max_batch = max_batch
+        self._append_queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+        self._writer_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._migrate_schema()
+        self._migrate_json()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Streamlit runs each session in its own thread; sqlite3 connections must not be shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_file, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=FULL" if self.durable else "PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        # Flush pending group-commit appends before closing
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._append_queue.put(None)
+            writer.join()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     # ---------- Users ----------
+    # Readers get copies: the cached dicts are shared by every session and thread
     def load_users(self) -> List[Dict[str, Any]]:
-        return self._read(self.users_file)
+        return [dict(u) for u in self._users_index().values()]
 
     def save_users(self, users: List[Dict[str, Any]]):
-        self._write(self.users_file, users)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM users")
+            conn.executemany("INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)",
+                             [(u.get("id"), self._dump(u)) for u in users])
+            self._bump(conn, USERS_KEY)
 
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        users = self.load_users()
-        for u in users:
-            if u.get("id") == user_id:
-                return u
-        return None
+        user = self._users_index().get(user_id)
+        return dict(user) if user is not None else None
 
     def upsert_user(self, user: Dict[str, Any]):
-        users = self.load_users()
-        found = False
-        for i,u in enumerate(users):
-            if u.get("id") == user.get("id"):
-                users[i] = user
-                found = True
-                break
-        if not found:
-            users.append(user)
-        self.save_users(users)
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (id, data) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                (user.get("id"), self._dump(user))
+            )
+            self._bump(conn, USERS_KEY)
+
+    def _users_index(self) -> Dict[str, Dict[str, Any]]:
+        # id -> user, rebuilt only when the users version changes
+        with self._read_snapshot() as conn:
+            version = self._version(conn, USERS_KEY)
+            cached = self._users_cache
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = conn.execute("SELECT data FROM users ORDER BY rowid").fetchall()
+        index = {}
+        for r in rows:
+            u = json.loads(r[0])
+            index[u.get("id")] = u
+        self._users_cache = (version, index)
+        return index
 
     # ---------- Words / Journal ----------
     def load_words(self) -> List[Dict[str, Any]]:
-        return self._read(self.words_file)
+        rows = self._conn().execute("SELECT data FROM words ORDER BY seq").fetchall()
+        return [json.loads(r[0]) for r in rows]
 
     def save_words(self, arr: List[Dict[str, Any]]):
-        self._write(self.words_file, arr)
+        rows = [self._word_row(e) for e in arr]
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM words")
+            conn.execute("DELETE FROM daily_rollups")
+            self._write_word_rows(conn, rows)
+            self._bump(conn, ALL_WORDS_KEY)
 
     def append_word_entry(self, entry: Dict[str, Any]):
-        arr = self.load_words()
-        arr.append(entry)
-        self.save_words(arr)
+        row = self._word_row(entry)
+        if not self.group_commit:
+            self._insert_words([row])
+            return
+        done = Future()
+        self._ensure_writer()
+        self._append_queue.put((row, done))
+        # Returns once the batch containing this entry is committed (or re-raises its error)
+        while True:
+            try:
+                return done.result(timeout=1.0)
+            except FutureTimeout:
+                # Entry queued just as the writer died: a new writer picks it up
+                self._ensure_writer()
 
     def get_user_words(self, user_id: str) -> List[Dict[str, Any]]:
-        arr = self.load_words()
-        return [x for x in arr if x.get("user_id") == user_id]
+        # user_id -> rows index; repeated reads in one Streamlit rerun cost one version lookup
+        with self._read_snapshot() as conn:
+            version = self._words_version(conn, user_id)
+            cached = self._user_words_cache.get(user_id)
+            if cached is not None and cached[0] == version:
+                return [dict(e) for e in cached[1]]
+            rows = conn.execute(
+                "SELECT data FROM words WHERE user_id = ? ORDER BY seq", (user_id,)
+            ).fetchall()
+        entries = [json.loads(r[0]) for r in rows]
+        with self._cache_lock:
+            self._user_words_cache[user_id] = (version, entries)
+        return [dict(e) for e in entries]
 
     def clear_user_words(self, user_id: str):
-        arr = [x for x in self.load_words() if x.get("user_id") != user_id]
-        self.save_words(arr)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM words WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM daily_rollups WHERE user_id = ?", (user_id,))
+            self._bump(conn, _words_key(user_id))
+
+    # ---------- Group commit ----------
+    def _ensure_writer(self):
+        writer = self._writer
+        if writer is not None and writer.is_alive() and self._writer_pid == os.getpid():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive() or self._writer_pid != os.getpid():
+                self._writer = threading.Thread(target=self._writer_loop, name="lingo-storage-writer", daemon=True)
+                self._writer_pid = os.getpid()
+                self._writer.start()
+
+    def _writer_loop(self):
+        # No artificial delay: whatever queued up while the previous commit was
+        # syncing goes into the next transaction
+        batch = []
+        try:
+            while True:
+                item = self._append_queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._append_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._commit_batch(batch)
+                        return
+                    batch.append(item)
+                self._commit_batch(batch)
+                batch = []
+        except BaseException as e:
+            # The writer is dying: fail its batch and everything queued behind it
+            # instead of leaving callers blocked on done.result()
+            self._fail_pending(batch, e)
+            raise
+        finally:
+            # self._local is per thread: this is the writer's own connection
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                conn.close()
+                self._local.conn = None
+
+    def _fail_pending(self, batch, error: BaseException):
+        while True:
+            for _, done in batch:
+                if not done.done():
+                    done.set_exception(error)
+            try:
+                item = self._append_queue.get_nowait()
+            except queue.Empty:
+                return
+            batch = [item] if item is not None else []
+
+    def _commit_batch(self, batch):
+        try:
+            self._insert_words([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # One bad entry must not fail the whole group: retry one by one
+            for item in batch:
+                self._commit_batch([item])
+            return
+        for _, done in batch:
+            done.set_result(None)
+
+    def _insert_words(self, rows):
+        with self._transaction() as conn:
+            self._write_word_rows(conn, rows)
+            for user_id in {row[0] for row in rows}:
+                self._bump(conn, _words_key(user_id))
+
+    @staticmethod
+    def _write_word_rows(conn: sqlite3.Connection, rows):
+        # Journal rows and their per-day rollups are written in the same transaction
+        conn.executemany(INSERT_WORD, [row[:3] for row in rows])
+        LingoStorage._write_rollups(conn, rows)
+
+    @staticmethod
+    def _write_rollups(conn: sqlite3.Connection, rows):
+        rollups: Dict[tuple, List[int]] = {}
+        for user_id, _, _, day, word, failures in rows:
+            if day is None:
+                continue
+            # NULL never conflicts in a primary key; '' keeps one row per (user, day)
+            agg = rollups.setdefault((user_id, day, "" if word is None else word), [0, 0])
+            agg[0] += 1
+            agg[1] += failures
+        conn.executemany(UPSERT_ROLLUP, [(*key, c, f) for key, (c, f) in rollups.items()])
 
     # ---------- Helpers ----------
-    def _read(self, path: Path):
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE ... COMMIT / ROLLBACK around multi-statement writes
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def _read_snapshot(self):
+        # Version and rows are read in one WAL snapshot, so rows are never cached under a newer version
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, key: str):
+        conn.execute(
+            "INSERT INTO versions (key, version) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET version = version + 1", (key,)
+        )
+
+    @staticmethod
+    def _version(conn: sqlite3.Connection, key: str) -> int:
+        row = conn.execute("SELECT version FROM versions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _words_version(conn: sqlite3.Connection, user_id: str):
+        # Bulk rewrites (save_words) bump the global key, single-user writes the per-user key
+        rows = dict(conn.execute(
+            "SELECT key, version FROM versions WHERE key IN (?, ?)", (ALL_WORDS_KEY, _words_key(user_id))
+        ).fetchall())
+        return rows.get(ALL_WORDS_KEY, 0), rows.get(_words_key(user_id), 0)
+
+    @staticmethod
+    def _dump(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def _word_row(self, entry: Dict[str, Any]):
+        # (user_id, timestamp, json, rollup day, word, failures)
+        ts = entry.get("timestamp")
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
+            day = datetime.datetime.fromisoformat(ts).date().isoformat()
+        except (TypeError, ValueError):
+            day = None
+        return (entry.get("user_id"), ts, self._dump(entry),
+                day, entry.get("word"), _to_int(entry.get("failures")))
+
+    def _migrate_schema(self):
+        conn = self._conn()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with self._transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Backfill daily rollups for journals written before they existed
+                conn.execute("DELETE FROM daily_rollups")
+                rows = [self._word_row(json.loads(r[0])) for r in conn.execute("SELECT data FROM words")]
+                self._write_rollups(conn, rows)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _read(self, path: Path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
 
-    def _write(self, path: Path, data):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _migrate_json(self):
+        # One-time import of the old users.json / words.json into the database
+        if not (self.users_file.exists() or self.words_file.exists()):
+            return
+        with self._transaction() as conn:
+            # Re-check under the write lock: another process may have migrated meanwhile
+            legacy = []
+            for f in (self.users_file, self.words_file):
+                if not f.exists():
+                    continue
+                try:
+                    legacy.append((f, self._read(f)))
+                except ValueError:
+                    # A truncated file is left in place instead of being imported as empty
+                    warnings.warn(f"{f} is not valid JSON; skipping migration of this file")
+            data = dict(legacy)
+            users = data.get(self.users_file, [])
+            words = data.get(self.words_file, [])
+            conn.executemany("INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)",
+                             [(u.get("id"), self._dump(u)) for u in users])
+            self._write_word_rows(conn, [self._word_row(e) for e in words])
+            self._bump(conn, USERS_KEY)
+            self._bump(conn, ALL_WORDS_KEY)
+            for f, _ in legacy:
+                f.replace(f.with_name(f.name + ".migrated"))
+
+    # ---------- Export ----------
+    def iter_user_words(self, user_id: str, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        # Streams entries straight from the cursor (bypasses the read cache, constant memory)
+        cur = self._conn().execute("SELECT data FROM words WHERE user_id = ? ORDER BY seq", (user_id,))
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                return
+            for r in batch:
+                yield json.loads(r[0])
+
+    def _export_columns(self, user_id: str) -> Tuple[List[str], Set[str]]:
+        # First of the CSV export's two cursor passes. Collects the union of keys in
+        # first-seen order (same header pandas produced), plus the columns pandas would
+        # have typed float64: numeric-only columns with a missing value or a float in them
+        # (an int column with gaps is written as 1.0). Neither is known before the last row.
+        columns: Dict[str, None] = {}
+        numeric: Dict[str, bool] = {}
+        present: Dict[str, int] = {}
+        has_float: Set[str] = set()
+        total = 0
+        for entry in self.iter_user_words(user_id):
+            total += 1
+            for key, value in entry.items():
+                columns.setdefault(key)
+                if value is None:
+                    continue
+                present[key] = present.get(key, 0) + 1
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                numeric[key] = numeric.get(key, True) and is_number
+                if isinstance(value, float):
+                    has_float.add(key)
+        float_columns = {k for k, ok in numeric.items() if ok and (present[k] < total or k in has_float)}
+        return list(columns), float_columns
+
+    def write_user_words_csv(self, user_id: str, f: IO[str]) -> int:
+        # Two passes over the journal cursor, constant memory: _export_columns reads every
+        # row once for the pandas-compatible header and float formatting, then the rows are
+        # read again and written. Returns the row count.
+        columns, float_columns = self._export_columns(user_id)
+        if not columns:
+            return 0
+        writer = csv.DictWriter(f, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        count = 0
+        for entry in self.iter_user_words(user_id):
+            for key in float_columns:
+                if entry.get(key) is not None:
+                    entry[key] = float(entry[key])
+            writer.writerow(entry)
+            count += 1
+        return count
 
     def export_user_words_csv(self, user_id: str, out_path: Path):
-        rows = self.get_user_words(user_id)
-        if not rows:
+        out_path = Path(out_path)
+        try:
+            with atomic_write(out_path, newline="") as f:
+                if not self.write_user_words_csv(user_id, f):
+                    raise _NothingToExport
+        except _NothingToExport:
             return None
-        df = pd.DataFrame(rows)
-        df.to_csv(out_path, index=False)
         return out_path
 
+    def user_words_csv_bytes(self, user_id: str) -> Optional[bytes]:
+        # In-memory CSV for st.download_button: no DataFrame, no temp file
+        buf = io.BytesIO()
+        text = io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True)
+        count = self.write_user_words_csv(user_id, text)
+        text.detach()
+        return buf.getvalue() if count else None
+
+    def export_user_words_parquet(self, user_id: str, out: Union[Path, IO[bytes]], batch_size: int = 5000):
+        # Columnar export with typed columns, written in row groups from the cursor (requires pyarrow)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+
+        schema = pa.schema([
+            ("user_id", pa.string()), ("word", pa.string()), ("meaning", pa.string()),
+            ("example", pa.string()), ("timestamp", pa.timestamp("us")), ("result", pa.string()),
+            ("failures", pa.int32()), ("type", pa.string()), ("question", pa.string()),
+            ("extra", pa.string()),
+        ])
+
+        def to_batch(entries):
+            cols = {name: [] for name in schema.names}
+            for e in entries:
+                for name in PARQUET_COLUMNS:
+                    cols[name].append(e.get(name))
+                extra = {k: v for k, v in e.items() if k not in PARQUET_COLUMNS}
+                cols["extra"].append(self._dump(extra) if extra else None)
+            cols["timestamp"] = [_parse_ts(ts) for ts in cols["timestamp"]]
+            cols["failures"] = [_to_int(v) for v in cols["failures"]]
+            for name in ("user_id", "word", "meaning", "example", "result", "type", "question"):
+                cols[name] = [None if v is None else str(v) for v in cols[name]]
+            return pa.record_batch([cols[name] for name in schema.names], schema=schema)
+
+        if isinstance(out, (str, Path)):
+            out = Path(out)
+            ctx = atomic_write(out, mode="wb")
+        else:
+            ctx = nullcontext(out)
+        count = 0
+        try:
+            with ctx as f, pq.ParquetWriter(f, schema) as writer:
+                batch = []
+                for entry in self.iter_user_words(user_id):
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        writer.write_batch(to_batch(batch))
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    writer.write_batch(to_batch(batch))
+                    count += len(batch)
+                if not count:
+                    raise _NothingToExport
+        except _NothingToExport:
+            return None
+        return out
+
+    # ---------- Reports ----------
+    def summary(self, user_id: str, start: datetime.date, end: datetime.date) -> Dict[str, Any]:
+        # Inclusive UTC day range, answered from the per-day rollups: the cost depends on
+        # the number of days and words in the range, not on the length of the history
+        return self._summarize(self._rollup_rows(user_id, start.isoformat(), end.isoformat()))
+
     def weekly_summary(self, user_id: str):
-        rows = self.get_user_words(user_id)
-        if not rows:
-            return {"count":0, "hardest": None}
-        # filter last 7 days
-        now = datetime.datetime.utcnow()
-        last7 = []
-        for r in rows:
-            ts = r.get("timestamp")
-            try:
-                t = datetime.datetime.fromisoformat(ts)
-                if (now - t).days < 7:
-                    last7.append(r)
-            except Exception:
-                pass
-        count = len(last7)
-        # find word with most failures (field 'failures' tracked)
-        hardest = None
-        if last7:
-            freq = {}
-            for r in last7:
-                w = r.get("word")
-                freq[w] = freq.get(w,0) + (r.get("failures",0) or 0)
-            if freq:
-                hardest = max(freq.items(), key=lambda x: x[1])[0]
-        return {"count": count, "hardest": hardest}
+        # Rolling 7x24 h window (entries newer than now - 7 days), as before the rollups.
+        # Whole days after the cut come from the rollups; only the cut day itself is
+        # read from the journal and filtered by timestamp.
+        since = datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        cut_day = since.date()
+        rows = self._rollup_rows(user_id, (cut_day + datetime.timedelta(days=1)).isoformat(), None)
+        partial: Dict[Any, List[int]] = {}
+        for seq, data in self._conn().execute(
+            "SELECT seq, data FROM words WHERE user_id = ? AND timestamp >= ? AND timestamp < ?",
+            (user_id, cut_day.isoformat(), (cut_day + datetime.timedelta(days=1)).isoformat())
+        ):
+            entry = json.loads(data)
+            ts = _parse_ts(entry.get("timestamp"))
+            if ts is None or ts.tzinfo is not None or ts <= since:
+                continue
+            agg = partial.setdefault(entry.get("word"), [0, 0, seq])
+            agg[0] += 1
+            agg[1] += _to_int(entry.get("failures"))
+        # The cut day's entries are the oldest in the window: they win failure ties
+        return self._summarize(
+            [(w, c, f, (0, seq)) for w, (c, f, seq) in partial.items()]
+            + [(w, c, f, (1, order)) for w, c, f, order in rows]
+        )
+
+    def monthly_summary(self, user_id: str):
+        # Last 30 UTC calendar days (today included)
+        today = datetime.datetime.utcnow().date()
+        return self.summary(user_id, today - datetime.timedelta(days=29), today)
+
+    def _rollup_rows(self, user_id: str, start: str, end: Optional[str]):
+        # (word, count, failures, first rowid) per word; end=None means no upper bound
+        return self._conn().execute(
+            "SELECT word, SUM(count), SUM(failures), MIN(rowid) FROM daily_rollups "
+            "WHERE user_id = ? AND day >= ? AND day <= COALESCE(?, day) GROUP BY word",
+            (user_id, start, end)
+        ).fetchall()
+
+    @staticmethod
+    def _summarize(rows) -> Dict[str, Any]:
+        merged: Dict[Any, List[Any]] = {}
+        for word, count, failures, order in rows:
+            word = word or None
+            agg = merged.setdefault(word, [0, 0, order])
+            agg[0] += count
+            agg[1] += failures
+            agg[2] = min(agg[2], order)
+        if not merged:
+            return {"count": 0, "hardest": None}
+        # word with most failures; ties go to the word seen first
+        hardest = min(merged.items(), key=lambda kv: (-kv[1][1], kv[1][2]))[0]
+        return {"count": sum(agg[0] for agg in merged.values()), "hardest": hardest}
+
+
+class _NothingToExport(Exception):
+    # Aborts atomic_write without replacing the target when there are no rows
+    pass
+
+
+def _to_int(value) -> int:
+    # Tolerant int for legacy fields ("2", 2.0, "", None, garbage -> 0)
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def _parse_ts(ts) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", encoding: Optional[str] = "utf-8", newline: Optional[str] = None):
+    # Write to a temp file in the same directory, fsync, then rename over the target:
+    # readers see either the old or the new file, never a truncated one
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding,
+                       newline=None if "b" in mode else newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    # Persist the rename itself
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# Run from the project root layout: `storage` and `chains` are top-level packages
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
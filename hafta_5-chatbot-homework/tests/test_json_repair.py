@@ -0,0 +1,61 @@
+# tests/test_json_repair.py
+import json
+
+import pytest
+
+from chains.json_repair import loads_lenient, repair_json
+
+
+@pytest.mark.parametrize("raw, expected", [
+    # prose and fences around the JSON
+    ('Here you go:\n```json\n{"word": "apple"}\n```\nEnjoy!', {"word": "apple"}),
+    # single / smart quotes, unquoted keys, Python constants
+    ("{'word': 'apple', ok: True, extra: None}", {"word": "apple", "ok": True, "extra": None}),
+    ('{“word”: “apple”}', {"word": "apple"}),
+    # trailing and missing commas, comments
+    ('{"a": 1, "b": [1, 2,], // note\n "c": 3,}', {"a": 1, "b": [1, 2], "c": 3}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ('[1 2 true]', [1, 2, True]),
+    ('{"a": 1, # comment\n "b": 2}', {"a": 1, "b": 2}),
+    # unescaped quote and apostrophe inside a string
+    ('{"example": "He said "hi" to me"}', {"example": 'He said "hi" to me'}),
+    ("{'example': 'don't stop'}", {"example": "don't stop"}),
+    # raw newline inside a string
+    ('{"meaning": "line one\nline two"}', {"meaning": "line one\nline two"}),
+    # bare words
+    ('{"word": apple, "n": 3}', {"word": "apple", "n": 3}),
+])
+def test_repairs_common_defects(raw, expected):
+    assert json.loads(repair_json(raw)) == expected
+
+
+def test_truncated_output_is_closed():
+    assert json.loads(repair_json('{"words": [{"word": "apple"}, {"word": "pl')) == \
+        {"words": [{"word": "apple"}, {"word": "pl"}]}
+
+
+def test_truncated_dangling_key_dropped():
+    assert json.loads(repair_json('{"word": "apple", "meaning":')) == {"word": "apple"}
+
+
+def test_consecutive_top_level_values_become_list():
+    assert json.loads(repair_json('{"word": "a"}\n{"word": "b"}')) == [{"word": "a"}, {"word": "b"}]
+
+
+def test_text_after_json_ignored():
+    assert json.loads(repair_json('[1, 2] and then {"x": 1}')) == [1, 2]
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        repair_json("no structure here")
+
+
+def test_loads_lenient_prefers_strict_parse():
+    assert loads_lenient('{"a": [1, 2]}') == {"a": [1, 2]}
+    assert loads_lenient("{'a': [1, 2,]}") == {"a": [1, 2]}
+
+
+def test_loads_lenient_raises_without_json():
+    with pytest.raises(ValueError):
+        loads_lenient("plain text")
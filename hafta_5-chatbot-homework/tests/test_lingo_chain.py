@@ -0,0 +1,23 @@
+# tests/test_lingo_chain.py
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from chains.lingo_chain import LingoChain  # noqa: E402
+
+
+@pytest.mark.parametrize("obj, expected", [
+    ([{"word": "a"}], [{"word": "a"}]),
+    ({"words": [{"word": "a"}, {"word": "b"}]}, [{"word": "a"}, {"word": "b"}]),
+    # one-item reply given as the item itself
+    ({"word": "a", "meaning": "x"}, [{"word": "a", "meaning": "x"}]),
+    ({"question": "q?"}, [{"question": "q?"}]),
+    # list under an unexpected key
+    ({"items": [{"term": "a"}]}, [{"term": "a"}]),
+    # object without a list or an item key
+    ({"foo": "bar"}, [{"foo": "bar"}]),
+    ("text", []),
+    (None, []),
+])
+def test_json_items(obj, expected):
+    assert LingoChain._json_items(obj, "words") == expected
@@ -0,0 +1,250 @@
+# tests/test_lingo_storage.py
+import csv
+import datetime
+import io
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from storage.lingo_storage import LingoStorage, SCHEMA_VERSION
+
+
+def _ts(delta: datetime.timedelta = datetime.timedelta(0)) -> str:
+    return (datetime.datetime.utcnow() + delta).isoformat()
+
+
+def _entry(user_id="u1", word="apple", failures=0, ts=None, **extra):
+    return {"user_id": user_id, "word": word, "failures": failures,
+            "timestamp": ts or _ts(), **extra}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    s = LingoStorage(tmp_path)
+    yield s
+    s.close()
+
+
+# ---------- Append / read ----------
+def test_append_and_read_per_user(storage):
+    storage.append_word_entry(_entry("u1", "apple"))
+    storage.append_word_entry(_entry("u2", "pear"))
+    storage.append_word_entry(_entry("u1", "plum"))
+
+    assert [e["word"] for e in storage.get_user_words("u1")] == ["apple", "plum"]
+    assert [e["word"] for e in storage.get_user_words("u2")] == ["pear"]
+    assert storage.get_user_words("nobody") == []
+
+
+def test_without_group_commit(tmp_path):
+    s = LingoStorage(tmp_path, durable=False, group_commit=False)
+    try:
+        s.append_word_entry(_entry())
+        assert len(s.get_user_words("u1")) == 1
+    finally:
+        s.close()
+
+
+def test_cached_read_returns_copies(storage):
+    storage.append_word_entry(_entry())
+    storage.get_user_words("u1")[0]["word"] = "changed"
+    assert storage.get_user_words("u1")[0]["word"] == "apple"
+
+
+def test_cache_invalidated_by_append_and_clear(storage):
+    storage.append_word_entry(_entry())
+    assert len(storage.get_user_words("u1")) == 1
+    storage.append_word_entry(_entry(word="plum"))
+    assert len(storage.get_user_words("u1")) == 2
+    storage.clear_user_words("u1")
+    assert storage.get_user_words("u1") == []
+    assert storage.weekly_summary("u1") == {"count": 0, "hardest": None}
+
+
+def test_concurrent_appends_all_committed(storage):
+    def worker(i):
+        for j in range(20):
+            storage.append_word_entry(_entry(f"u{i}", f"w{j}"))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for i in range(8):
+        assert [e["word"] for e in storage.get_user_words(f"u{i}")] == [f"w{j}" for j in range(20)]
+
+
+def test_users_upsert_and_persist(tmp_path):
+    s = LingoStorage(tmp_path)
+    s.upsert_user({"id": "u1", "name": "Ayşe", "level": "B1"})
+    s.upsert_user({"id": "u1", "name": "Ayşe", "level": "B2"})
+    s.close()
+
+    s = LingoStorage(tmp_path)
+    try:
+        assert s.get_user("u1")["level"] == "B2"
+        assert len(s.load_users()) == 1
+        assert s.get_user("missing") is None
+    finally:
+        s.close()
+
+
+def test_entries_survive_reopen(tmp_path):
+    s = LingoStorage(tmp_path)
+    s.append_word_entry(_entry())
+    s.close()
+
+    s = LingoStorage(tmp_path)
+    try:
+        assert [e["word"] for e in s.get_user_words("u1")] == ["apple"]
+    finally:
+        s.close()
+
+
+# ---------- Migration ----------
+def test_migrates_legacy_json(tmp_path):
+    users = [{"id": "u1", "name": "Ali"}]
+    words = [_entry("u1", "apple", failures=2), _entry("u1", "plum")]
+    (tmp_path / "users.json").write_text(json.dumps(users), encoding="utf-8")
+    (tmp_path / "words.json").write_text(json.dumps(words), encoding="utf-8")
+
+    s = LingoStorage(tmp_path)
+    try:
+        assert s.get_user("u1")["name"] == "Ali"
+        assert [e["word"] for e in s.get_user_words("u1")] == ["apple", "plum"]
+        assert s.weekly_summary("u1") == {"count": 2, "hardest": "apple"}
+    finally:
+        s.close()
+    assert not (tmp_path / "users.json").exists()
+    assert (tmp_path / "users.json.migrated").exists()
+    assert (tmp_path / "words.json.migrated").exists()
+
+    # Second open does not import again
+    s = LingoStorage(tmp_path)
+    try:
+        assert len(s.get_user_words("u1")) == 2
+    finally:
+        s.close()
+
+
+def test_invalid_legacy_json_left_in_place(tmp_path):
+    (tmp_path / "words.json").write_text('[{"user_id": "u1"', encoding="utf-8")
+    (tmp_path / "users.json").write_text(json.dumps([{"id": "u1"}]), encoding="utf-8")
+
+    with pytest.warns(UserWarning):
+        s = LingoStorage(tmp_path)
+    try:
+        assert s.get_user("u1") is not None
+        assert s.get_user_words("u1") == []
+    finally:
+        s.close()
+    assert (tmp_path / "words.json").exists()
+    assert (tmp_path / "users.json.migrated").exists()
+
+
+def test_schema_v1_rollups_rebuilt(tmp_path):
+    s = LingoStorage(tmp_path)
+    s.append_word_entry(_entry(word=None, failures=1))
+    s.append_word_entry(_entry(word=None, failures=1))
+    s.close()
+
+    # Simulate a v1 database: NULL word keys, one row per entry
+    conn = sqlite3.connect(tmp_path / "lingo.db")
+    with conn:
+        conn.execute("UPDATE daily_rollups SET word = NULL")
+        conn.execute("INSERT INTO daily_rollups SELECT user_id, day, word, count, failures FROM daily_rollups")
+        conn.execute("PRAGMA user_version = 1")
+    conn.close()
+
+    s = LingoStorage(tmp_path)
+    try:
+        conn = sqlite3.connect(tmp_path / "lingo.db")
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT word, count, failures FROM daily_rollups").fetchall() == [("", 2, 2)]
+        conn.close()
+        assert s.weekly_summary("u1") == {"count": 2, "hardest": None}
+    finally:
+        s.close()
+
+
+# ---------- Reports ----------
+def test_weekly_summary_is_rolling_window(storage):
+    storage.append_word_entry(_entry(word="old", failures=9, ts=_ts(-datetime.timedelta(days=7, hours=1))))
+    storage.append_word_entry(_entry(word="edge", failures=1, ts=_ts(-datetime.timedelta(days=6, hours=23))))
+    storage.append_word_entry(_entry(word="new", failures=3))
+    storage.append_word_entry(_entry(word="new", failures=0))
+
+    assert storage.weekly_summary("u1") == {"count": 3, "hardest": "new"}
+
+
+def test_summary_ties_go_to_first_word(storage):
+    storage.append_word_entry(_entry(word="first", failures=2))
+    storage.append_word_entry(_entry(word="second", failures=2))
+    assert storage.weekly_summary("u1")["hardest"] == "first"
+
+
+def test_summary_date_range(storage):
+    today = datetime.datetime.utcnow().date()
+    storage.append_word_entry(_entry(word="a", ts=_ts()))
+    storage.append_word_entry(_entry(word="b", ts=_ts(-datetime.timedelta(days=3))))
+
+    assert storage.summary("u1", today, today)["count"] == 1
+    assert storage.summary("u1", today - datetime.timedelta(days=3), today)["count"] == 2
+    assert storage.monthly_summary("u1")["count"] == 2
+
+
+def test_legacy_failures_values_tolerated(storage):
+    for failures in ("2", 1.0, "", None, "x"):
+        storage.append_word_entry(_entry(word="w", failures=failures))
+    assert storage.weekly_summary("u1") == {"count": 5, "hardest": "w"}
+
+
+# ---------- Export ----------
+def test_csv_export(storage):
+    storage.append_word_entry(_entry(word="apple", failures=1, meaning="elma"))
+    storage.append_word_entry({"user_id": "u1", "word": "plum", "timestamp": _ts()})
+
+    data = storage.user_words_csv_bytes("u1")
+    rows = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+    assert list(rows[0]) == ["user_id", "word", "failures", "timestamp", "meaning"]
+    # An int column with a gap is written as float, as pandas did
+    assert [r["failures"] for r in rows] == ["1.0", ""]
+    assert [r["meaning"] for r in rows] == ["elma", ""]
+
+    assert storage.user_words_csv_bytes("nobody") is None
+
+
+def test_csv_export_matches_pandas(storage):
+    pd = pytest.importorskip("pandas")
+    storage.append_word_entry(_entry(word="apple", failures=1, meaning="elma"))
+    storage.append_word_entry({"user_id": "u1", "word": "plum", "timestamp": _ts(), "type": "quiz"})
+    storage.append_word_entry(_entry(word="pear", failures=2.5))
+
+    expected = pd.DataFrame(storage.get_user_words("u1")).to_csv(index=False)
+    assert storage.user_words_csv_bytes("u1").decode("utf-8") == expected
+
+
+def test_csv_export_to_file_keeps_target_when_empty(storage, tmp_path):
+    out = tmp_path / "export.csv"
+    out.write_text("previous", encoding="utf-8")
+    assert storage.export_user_words_csv("nobody", out) is None
+    assert out.read_text(encoding="utf-8") == "previous"
+
+
+def test_parquet_export(storage, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    storage.append_word_entry(_entry(word="apple", failures="3", note="x"))
+    storage.append_word_entry(_entry(word="plum", failures="garbage"))
+
+    out = storage.export_user_words_parquet("u1", tmp_path / "words.parquet", batch_size=1)
+    table = pq.read_table(out)
+    assert table.column("word").to_pylist() == ["apple", "plum"]
+    assert table.column("failures").to_pylist() == [3, 0]
+    assert json.loads(table.column("extra").to_pylist()[0]) == {"note": "x"}
+
+    assert storage.export_user_words_parquet("nobody", tmp_path / "empty.parquet") is None
+    assert not (tmp_path / "empty.parquet").exists()
@@ -9,36 +9,56 @@ import os
 from dotenv import load_dotenv
 import time
 
+from chat_history import ConversationMemory
+from lazy_imports import lazy_import
+
+# PDF kütüphaneleri sadece PDF yüklendiğinde import edilir
+pdfplumber = lazy_import("pdfplumber")
+PyPDF2 = lazy_import("PyPDF2")
+
 # Environment variables yükle
 load_dotenv()
 
 # OpenAI client
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+
+def summarize_conversation(previous_summary, messages):
+    """
+    Pencereden çıkan mesajları önceki özetle birleştirip kısa bir özet üret
+    """
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "Konuşma özetleyicisisin. Önceki özeti ve yeni mesajları, kullanıcının bilgilerini ve verilen kararları koruyarak en fazla 5 cümlelik tek bir özette birleştir."},
+            {"role": "user", "content": f"Önceki özet:\n{previous_summary or '(yok)'}\n\nYeni mesajlar:\n{transcript}"}
+        ],
+        max_tokens=200,
+        temperature=0.3
+    )
+    return response.choices[0].message.content
+
+
+# Oturum başına token bütçeli geçmiş (kayan pencere + kümülatif özet)
+chat_memory = ConversationMemory(summarizer=summarize_conversation, max_history_tokens=1500)
+
 # ============================================================================
 # ÖRNEK 1: Basit Chatbot Arayüzü
 # ============================================================================
 
-def simple_chatbot(message, history):
+def simple_chatbot(message, history, session_id="default"):
     """
     Basit chatbot fonksiyonu
     """
     try:
-        # Convert history to OpenAI format
-        messages = [{"role": "system", "content": "Sen yardımcı bir asistansın. Kısa ve net cevaplar ver."}]
-        
-        # Add conversation history if it exists
-        if history:
-            for msg in history:
-                if isinstance(msg, dict) and "role" in msg and "content" in msg:
-                    messages.append(msg)
-                elif isinstance(msg, (list, tuple)) and len(msg) == 2:
-                    # Handle old tuple format if any
-                    messages.append({"role": "user", "content": msg[0]})
-                    messages.append({"role": "assistant", "content": msg[1]})
-        
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        # Geçmiş token bütçesine göre kırpılır, eski turlar özet olarak eklenir
+        messages = chat_memory.build_messages(
+            "Sen yardımcı bir asistansın. Kısa ve net cevaplar ver.",
+            history,
+            message,
+            session_id=f"simple:{session_id}"
+        )
         
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
@@ -55,26 +75,18 @@ def simple_chatbot(message, history):
 # ÖRNEK 2: Streaming Output ile Chatbot
 # ============================================================================
 
-def streaming_chatbot(message, history):
+def streaming_chatbot(message, history, session_id="default"):
     """
     Streaming output ile chatbot
     """
     try:
-        # Convert history to OpenAI format
-        messages = [{"role": "system", "content": "Sen yardımcı bir asistansın."}]
-        
-        # Add conversation history if it exists
-        if history:
-            for msg in history:
-                if isinstance(msg, dict) and "role" in msg and "content" in msg:
-                    messages.append(msg)
-                elif isinstance(msg, (list, tuple)) and len(msg) == 2:
-                    # Handle old tuple format if any
-                    messages.append({"role": "user", "content": msg[0]})
-                    messages.append({"role": "assistant", "content": msg[1]})
-        
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        # Geçmiş token bütçesine göre kırpılır, eski turlar özet olarak eklenir
+        messages = chat_memory.build_messages(
+            "Sen yardımcı bir asistansın.",
+            history,
+            message,
+            session_id=f"streaming:{session_id}"
+        )
         
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
@@ -162,76 +174,236 @@ def code_explainer(code, language):
 # ÖRNEK 5: Dosya Yükleme ve İşleme
 # ============================================================================
 
+FILE_CHUNK_CHARS = 6000        # Map adımında bir LLM çağrısına giden metin
+FILE_REDUCE_CHARS = 12000      # Reduce adımında tek çağrıda birleştirilecek özet uzunluğu
+FILE_MAX_PARALLEL = int(os.getenv("FILE_MAX_PARALLEL", "4"))
+
+FILE_ANALYSIS_SYSTEM_PROMPT = "Sen bir dosya analiz uzmanısın. Verilen dosya içeriğini analiz et, özetini çıkar ve ana konuları belirt."
+
+
+def iter_pdf_pages(file_path):
+    """
+    PDF sayfalarını tek tek oku (tüm dosya belleğe alınmaz).
+    pdfplumber yoksa veya metin çıkaramazsa PyPDF2'ye düşer.
+    """
+    yielded = False
+    try:
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                # Sayfa nesnelerinin önbelleğini bırak; büyük PDF'lerde bellek sabit kalır
+                page.flush_cache()
+                if page_text:
+                    if yielded:
+                        # Sayfa sınırı paragraf sonu sayılır
+                        yield "\n\n"
+                    yielded = True
+                    yield page_text
+    except Exception:
+        # pdfplumber yoksa veya dosyayı açamazsa PyPDF2 denenir
+        if yielded:
+            raise
+    if yielded:
+        return
+    
+    with open(file_path, 'rb') as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        for page in pdf_reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                if yielded:
+                    yield "\n\n"
+                yielded = True
+                yield page_text
+
+
+def iter_text_file(file_path, block_size=64 * 1024):
+    """
+    Metin dosyasını bloklar halinde oku; karakter kodlaması ilk bloktan tahmin edilir
+    """
+    import codecs
+    
+    with open(file_path, 'rb') as f:
+        sample = f.read(block_size)
+    encoding = 'latin-1'
+    for candidate in ['utf-8', 'cp1252', 'iso-8859-1']:
+        try:
+            # Blok sonunda yarım kalan çok baytlı karakter hata sayılmasın
+            codecs.getincrementaldecoder(candidate)().decode(sample, final=False)
+            encoding = candidate
+            break
+        except UnicodeDecodeError:
+            continue
+    
+    with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+def iter_chunks(segments, chunk_chars=FILE_CHUNK_CHARS):
+    """
+    Sayfa/blok akışını yaklaşık `chunk_chars` uzunluğunda parçalara böl.
+    Segmentler olduğu gibi birleştirilir; ayraç gerekiyorsa (PDF sayfaları)
+    kaynak iterator üretir.
+    """
+    buffer = []
+    size = 0
+    for segment in segments:
+        while segment:
+            take = segment[:chunk_chars - size]
+            segment = segment[len(take):]
+            buffer.append(take)
+            size += len(take)
+            if size >= chunk_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+    if buffer and "".join(buffer).strip():
+        yield "".join(buffer)
+
+
+def summarize_chunk(chunk, filename, index):
+    """
+    Map adımı: tek bir dosya parçasını özetle
+    """
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "Sen bir dosya analiz uzmanısın. Verilen dosya parçasını kısaca özetle ve ana konuları madde madde belirt."},
+            {"role": "user", "content": f"Dosya adı: {filename}\nParça {index + 1}:\n\n{chunk}"}
+        ],
+        max_tokens=300,
+        temperature=0.5
+    )
+    return response.choices[0].message.content
+
+
+def merge_summaries(summaries, filename, file_extension, max_tokens=400):
+    """
+    Reduce adımı: parça özetlerini tek bir analizde birleştir
+    """
+    joined = "\n\n".join(f"[Bölüm {i + 1}]\n{summary}" for i, summary in enumerate(summaries))
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": FILE_ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Dosya adı: {filename}\nDosya tipi: {file_extension}\n\nAşağıda dosyanın bölüm bölüm özetleri var. Bunları birleştirerek tüm dosyayı analiz et:\n\n{joined}"}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.5
+    )
+    return response.choices[0].message.content
+
+
 def file_processor(file):
     """
     Dosya içeriğini işleme (PDF, metin dosyaları vb.)
+    
+    Dosyanın tamamı akış halinde okunur ve parçalara bölünür (map-reduce):
+    parçalar en fazla FILE_MAX_PARALLEL eşzamanlı çağrı ile özetlenir, sonra
+    özetler birleştirilir. İlerleme durumu arayüze adım adım yansıtılır.
     """
     if file is None:
-        return "Lütfen bir dosya yükleyin."
+        yield "Lütfen bir dosya yükleyin."
+        return
+    
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
     
     try:
         # Dosya yolunu al
         file_path = file.name if hasattr(file, 'name') else file
         
         # Dosya adını ve uzantısını al
-        import os
         filename = os.path.basename(file_path)
         file_extension = os.path.splitext(filename)[1].lower()
         
-        content = ""
-        
-        # PDF dosyaları için
         if file_extension == '.pdf':
-            try:
-                import pdfplumber
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages[:5]:  # İlk 5 sayfa
-                        page_text = page.extract_text()
-                        if page_text:
-                            content += page_text + "\n\n"
-                
-                if not content:
-                    # Alternatif olarak PyPDF2 dene
-                    import PyPDF2
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        for page_num in range(min(5, len(pdf_reader.pages))):
-                            page = pdf_reader.pages[page_num]
-                            content += page.extract_text() + "\n\n"
-                            
-            except Exception as pdf_error:
-                return f"PDF okuma hatası: {str(pdf_error)}"
-        
-        # Metin dosyaları için
+            segments = iter_pdf_pages(file_path)
         else:
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
+            segments = iter_text_file(file_path)
         
-        if not content:
-            return "Dosya okunamadı. Desteklenmeyen format veya karakter kodlaması."
+        summaries = {}
+        first_chunk = None
+        submitted = 0
         
-        # İlk 2000 karakteri al (API limiti için)
-        content_preview = content[:2000]
+        with ThreadPoolExecutor(max_workers=FILE_MAX_PARALLEL) as executor:
+            pending = {}
+            chunks = iter_chunks(segments)
+            try:
+                for index, chunk in enumerate(chunks):
+                    if index == 0:
+                        # Tek parçalık dosyalarda map adımı gereksiz; doğrudan analiz edilir
+                        first_chunk = chunk
+                        continue
+                    if index == 1:
+                        pending[executor.submit(summarize_chunk, first_chunk, filename, 0)] = 0
+                        submitted += 1
+                    pending[executor.submit(summarize_chunk, chunk, filename, index)] = index
+                    submitted += 1
+                    # Okuma, özetlemenin çok önüne geçmesin (bellek sınırlı kalsın)
+                    while len(pending) >= FILE_MAX_PARALLEL * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            summaries[pending.pop(future)] = future.result()
+                        yield f"⏳ {len(summaries)}/{submitted}+ parça özetlendi..."
+            except Exception:
+                # Henüz başlamamış parçaları iptal et
+                for future in pending:
+                    future.cancel()
+                raise
+            
+            if first_chunk is None:
+                yield "Dosya okunamadı. Desteklenmeyen format veya karakter kodlaması."
+                return
+            
+            if submitted == 0:
+                response = client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": FILE_ANALYSIS_SYSTEM_PROMPT},
+                        {"role": "user", "content": f"Dosya adı: {filename}\nDosya tipi: {file_extension}\n\nDosya içeriğini analiz et:\n\n{first_chunk}"}
+                    ],
+                    max_tokens=400,
+                    temperature=0.5
+                )
+                yield response.choices[0].message.content
+                return
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    summaries[pending.pop(future)] = future.result()
+                yield f"⏳ {len(summaries)}/{submitted} parça özetlendi..."
+            
+            # Reduce: özetler tek çağrıya sığmıyorsa gruplar halinde paralel birleştir
+            partials = [summaries[i] for i in range(submitted)]
+            while sum(len(p) for p in partials) > FILE_REDUCE_CHARS:
+                # Tek başına bütçeyi aşan bir özet, son birleştirmeyi bütçe dışına taşır;
+                # bütçenin yarısına kırpılır. Böylece her grupta en az iki özet olur ve
+                # her turda özet sayısı azalır.
+                partials = [p[:FILE_REDUCE_CHARS // 2] for p in partials]
+                groups, group, size = [], [], 0
+                for partial in partials:
+                    if group and size + len(partial) > FILE_REDUCE_CHARS:
+                        groups.append(group)
+                        group, size = [], 0
+                    group.append(partial)
+                    size += len(partial)
+                groups.append(group)
+                if len(groups) == 1:
+                    # Kırpma sonrası hepsi tek çağrıya sığdı
+                    break
+                yield f"🔗 {len(partials)} özet {len(groups)} grupta birleştiriliyor..."
+                partials = list(executor.map(
+                    lambda g: merge_summaries(g, filename, file_extension, max_tokens=300), groups
+                ))
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Sen bir dosya analiz uzmanısın. Verilen dosya içeriğini analiz et, özetini çıkar ve ana konuları belirt."},
-                {"role": "user", "content": f"Dosya adı: {filename}\nDosya tipi: {file_extension}\n\nDosya içeriğini analiz et:\n\n{content_preview}"}
-            ],
-            max_tokens=400,
-            temperature=0.5
-        )
-        return response.choices[0].message.content
+        yield "🔗 Bölüm özetleri birleştiriliyor..."
+        yield merge_summaries(partials, filename, file_extension, max_tokens=600)
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        yield f"Hata oluştu: {str(e)}"
 
 
 # ============================================================================
@@ -273,8 +445,8 @@ def create_gradio_interface():
                 submit_btn = gr.Button("Gönder", variant="primary")
                 clear_btn = gr.Button("Temizle")
                 
-                def respond(message, chat_history):
-                    bot_message = simple_chatbot(message, chat_history)
+                def respond(message, chat_history, request: gr.Request):
+                    bot_message = simple_chatbot(message, chat_history, request.session_hash)
                     chat_history.append({"role": "user", "content": message})
                     chat_history.append({"role": "assistant", "content": bot_message})
                     return "", chat_history
@@ -295,10 +467,10 @@ def create_gradio_interface():
                 streaming_submit = gr.Button("Gönder", variant="primary")
                 streaming_clear = gr.Button("Temizle")
                 
-                def streaming_respond(message, chat_history):
+                def streaming_respond(message, chat_history, request: gr.Request):
                     chat_history.append({"role": "user", "content": message})
                     chat_history.append({"role": "assistant", "content": ""})
-                    for response in streaming_chatbot(message, chat_history[:-2]):  # Exclude the current exchange
+                    for response in streaming_chatbot(message, chat_history[:-2], request.session_hash):  # Exclude the current exchange
                         chat_history[-1] = {"role": "assistant", "content": response}
                         yield chat_history
                 
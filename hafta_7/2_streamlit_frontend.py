@@ -9,13 +9,36 @@ import os
 from dotenv import load_dotenv
 import time
 import pandas as pd
-import plotly.express as px
+
+from lazy_imports import lazy_import
+from markdown_stream import IncrementalMarkdownRenderer
+
+# plotly sadece Veri Görselleştirme sekmesinde grafik çizilirken yüklenir
+px = lazy_import("plotly.express")
 
 # Environment variables yükle
 load_dotenv()
 
+# ============================================================================
+# ÖNBELLEKLİ KAYNAKLAR
+# ============================================================================
+
+def _client_is_open(cached_client):
+    # Kapatılmış bir client önbellekten döndürülmez, yeniden oluşturulur
+    return not cached_client.is_closed()
+
+
+@st.cache_resource(show_spinner=False, validate=_client_is_open)
+def get_openai_client(api_key):
+    """
+    Süreç başına tek OpenAI client (bağlantı havuzu rerun'lar arasında korunur).
+    Önbellek anahtarı API key'dir; key değişirse yeni client oluşturulur.
+    """
+    return OpenAI(api_key=api_key)
+
+
 # OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_openai_client(os.getenv("OPENAI_API_KEY"))
 
 # ============================================================================
 # SAYFA YAPILANDIRMASI
@@ -111,6 +134,19 @@ def get_openai_response(prompt, system_prompt="Sen yardımcı bir asistansın.",
         return f"Hata oluştu: {str(e)}"
 
 
+@st.cache_data(show_spinner=False)
+def load_sample_data():
+    """
+    Örnek veri tablosu (her rerun'da yeniden oluşturulmaz)
+    """
+    sample_data = {
+        "Ürün": ["A", "B", "C", "D", "E"],
+        "Satış": [100, 150, 200, 120, 180],
+        "Kategori": ["Elektronik", "Giyim", "Elektronik", "Giyim", "Elektronik"]
+    }
+    return pd.DataFrame(sample_data)
+
+
 def stream_openai_response(prompt, system_prompt="Sen yardımcı bir asistansın.", model="gpt-3.5-turbo"):
     """
     OpenAI API'den streaming yanıt al
@@ -127,11 +163,10 @@ def stream_openai_response(prompt, system_prompt="Sen yardımcı bir asistansın
             temperature=temperature
         )
         
-        full_response = ""
+        # Her seferinde tüm metni değil, sadece yeni parçayı (delta) üret
         for chunk in response:
             if chunk.choices[0].delta.content:
-                full_response += chunk.choices[0].delta.content
-                yield full_response
+                yield chunk.choices[0].delta.content
     except Exception as e:
         yield f"Hata oluştu: {str(e)}"
 
@@ -203,14 +238,12 @@ with tab2:
         
         # Bot streaming yanıtını al ve göster
         with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            full_response = ""
+            renderer = IncrementalMarkdownRenderer(st.empty())
             
-            for chunk in stream_openai_response(streaming_prompt, model=model_choice):
-                full_response = chunk
-                message_placeholder.markdown(full_response + "▌")
+            for delta in stream_openai_response(streaming_prompt, model=model_choice):
+                renderer.append(delta)
             
-            message_placeholder.markdown(full_response)
+            full_response = renderer.finish()
             st.session_state.streaming_messages.append({"role": "assistant", "content": full_response})
     
     # Temizle butonu
@@ -318,13 +351,8 @@ with tab5:
     st.header("📊 Veri Görselleştirme")
     st.markdown("### LLM ile veri analizi ve görselleştirme")
     
-    # Örnek veri oluştur
-    sample_data = {
-        "Ürün": ["A", "B", "C", "D", "E"],
-        "Satış": [100, 150, 200, 120, 180],
-        "Kategori": ["Elektronik", "Giyim", "Elektronik", "Giyim", "Elektronik"]
-    }
-    df = pd.DataFrame(sample_data)
+    # Örnek veri (önbellekten)
+    df = load_sample_data()
     
     st.subheader("Örnek Veri")
     st.dataframe(df, width='stretch')
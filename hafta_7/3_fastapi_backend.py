@@ -4,23 +4,87 @@ LLM tabanlı uygulamalar için RESTful API
 """
 
 from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
 import os
 from dotenv import load_dotenv
-import uvicorn
 import json
+import time
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+from backend_metrics import BackendMetrics, MultiProcessMetricsStore, PrometheusMiddleware, CONTENT_TYPE_LATEST
+from backend_limiter import AdmissionController, AdmissionRejected, Permit, Priority, estimate_tokens
+from backend_lifecycle import BackendLifecycle
+from prompt_templates import registry as prompts, build_text_messages
+from shared_state import create_state_backend
+
 # Environment variables yükle
 load_dotenv()
 
 # OpenAI client
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# ============================================================================
+# YAŞAM DÖNGÜSÜ (STARTUP / SHUTDOWN)
+# ============================================================================
+
+METRICS_SYNC_INTERVAL = float(os.getenv("METRICS_SYNC_INTERVAL", "1.0"))
+# Açılışta upstream'e (OpenAI) bağlantı kurup havuzu ısıt; anahtarsız ortamlarda kapatılabilir
+WARMUP_UPSTREAM = os.getenv("WARMUP_UPSTREAM", "1") == "1"
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "5"))
+
+
+async def sync_metrics_periodically():
+    """
+    Çoklu worker modunda bu worker'ın metriklerini paylaşılan dizine yaz
+    """
+    while True:
+        await asyncio.sleep(METRICS_SYNC_INTERVAL)
+        await run_in_threadpool(metrics_store.write, metrics.snapshot())
+
+
+async def warm_up():
+    """
+    Readiness'ten önce paylaşılan state'i ve upstream bağlantısını ısıt
+    """
+    checks = {}
+    try:
+        await run_in_threadpool(state.cache_set, "__warmup__", "1", 60)
+        checks["state"] = await run_in_threadpool(state.cache_get, "__warmup__") == "1"
+    except Exception:
+        checks["state"] = False
+    if WARMUP_UPSTREAM:
+        try:
+            # TLS bağlantısı havuza girer; ilk kullanıcı isteği handshake beklemez
+            await run_in_threadpool(client.with_options(timeout=WARMUP_TIMEOUT, max_retries=0).models.list)
+            checks["upstream"] = True
+        except Exception:
+            checks["upstream"] = False
+    lifecycle.mark_warm(checks)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    lifecycle.install_signal_handler(asyncio.get_running_loop())
+    warmup_task = asyncio.create_task(warm_up())
+    sync_task = None
+    if metrics_store is not None:
+        sync_task = asyncio.create_task(sync_metrics_periodically())
+    yield
+    warmup_task.cancel()
+    if sync_task is not None:
+        sync_task.cancel()
+        await run_in_threadpool(metrics_store.write, metrics.snapshot())
+    await run_in_threadpool(state.close)
+
+
 # ============================================================================
 # FASTAPI APP OLUŞTURMA
 # ============================================================================
@@ -30,7 +94,8 @@ app = FastAPI(
     description="LLM tabanlı uygulamalar için RESTful API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # ============================================================================
@@ -45,6 +110,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ============================================================================
+# METRİKLER (PROMETHEUS)
+# ============================================================================
+
+metrics = BackendMetrics()
+app.add_middleware(PrometheusMiddleware, metrics=metrics)
+
+# Çoklu worker modunda her worker metriklerini bu dizine yazar, /metrics hepsini birleştirir
+metrics_store = MultiProcessMetricsStore(os.environ["METRICS_MULTIPROC_DIR"]) if os.getenv("METRICS_MULTIPROC_DIR") else None
+
+# ============================================================================
+# PAYLAŞILAN DURUM (CACHE, RATE LIMITER)
+# ============================================================================
+
+# local:// (varsayılan), sqlite:////dev/shm/... veya redis://... (bkz. shared_state.py)
+state = create_state_backend()
+
+# Aynı (model, mesajlar, parametreler) için yanıt cache'i; 0 = kapalı
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0"))
+
+# ============================================================================
+# ADMISSION CONTROL (RATE LIMITING)
+# ============================================================================
+
+# Token bucket + AIMD eşzamanlılık limiti + öncelik kuyruğu
+# Tek worker'da token bucket process içinde tutulur; çoklu worker'da paylaşılan state kullanılır
+admission = AdmissionController(state=None if state.name == "local" else state)
+
+# ============================================================================
+# READINESS VE GRACEFUL SHUTDOWN
+# ============================================================================
+
+# /ready durumu ve SIGTERM'de SSE stream'lerinin boşaltılması (bkz. backend_lifecycle.py)
+lifecycle = BackendLifecycle()
+
 # ============================================================================
 # PYDANTIC MODELLERİ
 # ============================================================================
@@ -69,6 +169,19 @@ class TextProcessRequest(BaseModel):
     model: str = Field(default="gpt-3.5-turbo", description="Kullanılacak model")
 
 
+class BatchItem(BaseModel):
+    id: Optional[str] = Field(default=None, description="İstemci tarafı kimlik (yanıtta aynen döner)")
+    operation: str = Field(..., description="İşlem türü: 'summarize', 'translate', 'analyze'")
+    text: str = Field(..., description="İşlenecek metin")
+    language: Optional[str] = Field(default=None, description="Hedef dil (çeviri için)")
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1, max_length=1000, description="İşlenecek öğeler")
+    model: str = Field(default="gpt-3.5-turbo", description="Kullanılacak model")
+    concurrency: int = Field(default=8, ge=1, le=32, description="Aynı anda yapılacak upstream çağrısı sayısı")
+
+
 class CodeExplainRequest(BaseModel):
     code: str = Field(..., description="Açıklanacak kod")
     language: str = Field(..., description="Programlama dili")
@@ -85,10 +198,27 @@ class HealthResponse(BaseModel):
 # YARDIMCI FONKSİYONLAR
 # ============================================================================
 
+# Upstream'e hiç gitmeden reddedilen (admission 429'u, drain 503'ü) yanıtları işaretler;
+# istemci sadece bu yanıtlarda POST'u tekrar dener (bkz. backend_client.py)
+ADMISSION_REJECTED_HEADER = "X-Admission-Rejected"
+
+
+def rate_limit_exception(detail: str, retry_after: str, before_upstream: bool = False) -> HTTPException:
+    """
+    Retry-After header'lı 429 yanıtı.
+    Upstream'in (OpenAI) 429'unda istek işlenmeye başlamış olabilir; işaretlenmez.
+    """
+    headers = {"Retry-After": retry_after}
+    if before_upstream:
+        headers[ADMISSION_REJECTED_HEADER] = "1"
+    return HTTPException(status_code=429, detail=detail, headers=headers)
+
+
 def get_openai_response(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int):
     """
     OpenAI API'den yanıt al
     """
+    started = time.perf_counter()
     try:
         response = client.chat.completions.create(
             model=model,
@@ -96,15 +226,71 @@ def get_openai_response(messages: List[Dict[str, str]], model: str, temperature:
             temperature=temperature,
             max_tokens=max_tokens
         )
+        metrics.observe_upstream(model, time.perf_counter() - started)
         return response.choices[0].message.content
+    except RateLimitError as e:
+        metrics.record_upstream_error(model, e)
+        retry_after = e.response.headers.get("retry-after", "1") if e.response is not None else "1"
+        raise rate_limit_exception(f"OpenAI rate limit: {str(e)}", retry_after)
     except Exception as e:
+        metrics.record_upstream_error(model, e)
         raise HTTPException(status_code=500, detail=f"OpenAI API hatası: {str(e)}")
 
 
-def stream_openai_response(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int):
+async def acquire_llm_slot(messages: List[Dict[str, str]], model: str, max_tokens: int, priority: Priority) -> Permit:
+    """
+    Upstream çağrısı için admission control'den izin al; kapasite yoksa hızlı 429
+    """
+    try:
+        return await admission.acquire(model, estimate_tokens(messages, max_tokens), priority)
+    except AdmissionRejected as e:
+        raise rate_limit_exception(e.reason, e.retry_after_header, before_upstream=True)
+
+
+async def call_llm(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int,
+                   priority: Priority = Priority.INTERACTIVE):
+    """
+    Admission control üzerinden upstream çağrısı.
+    Bloklayan OpenAI çağrısı threadpool'da çalışır, event loop serbest kalır.
+    """
+    cache_key = None
+    if RESPONSE_CACHE_TTL > 0:
+        cache_key = response_cache_key(messages, model, temperature, max_tokens)
+        cached = await run_in_threadpool(state.cache_get, cache_key)
+        metrics.record_cache("response", hit=cached is not None)
+        if cached is not None:
+            return cached
+
+    permit = await acquire_llm_slot(messages, model, max_tokens, priority)
+    started = time.perf_counter()
+    try:
+        content = await run_in_threadpool(get_openai_response, messages, model, temperature, max_tokens)
+    except HTTPException as e:
+        admission.release(permit, overloaded=(e.status_code == 429))
+        raise
+    except BaseException:
+        admission.release(permit)
+        raise
+    admission.release(permit, latency=time.perf_counter() - started)
+    if cache_key is not None and content is not None:
+        await run_in_threadpool(state.cache_set, cache_key, content, RESPONSE_CACHE_TTL)
+    return content
+
+
+def response_cache_key(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int) -> str:
+    payload = json.dumps([model, temperature, max_tokens, messages], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stream_openai_response(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int,
+                           permit: Optional[Permit] = None):
     """
     OpenAI API'den streaming yanıt al
     """
+    started = time.perf_counter()
+    first_token_seen = False
+    ttft = None
+    overloaded = False
     try:
         response = client.chat.completions.create(
             model=model,
@@ -116,11 +302,120 @@ def stream_openai_response(messages: List[Dict[str, str]], model: str, temperatu
         
         for chunk in response:
             if chunk.choices[0].delta.content:
+                if not first_token_seen:
+                    first_token_seen = True
+                    ttft = time.perf_counter() - started
+                    metrics.observe_ttft(model, ttft)
                 yield f"data: {json.dumps({'content': chunk.choices[0].delta.content})}\n\n"
         
+        metrics.observe_upstream(model, time.perf_counter() - started, mode="stream")
         yield "data: [DONE]\n\n"
     except Exception as e:
+        overloaded = isinstance(e, RateLimitError)
+        metrics.record_upstream_error(model, e)
         yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    finally:
+        # Streaming'de AIMD'ye toplam süre değil time-to-first-token bildirilir
+        if permit is not None:
+            admission.release_threadsafe(permit, latency=None if overloaded else ttft, overloaded=overloaded)
+
+
+class PermitStreamingResponse(StreamingResponse):
+    """
+    Admission iznini stream hiç başlamasa da bırakan StreamingResponse.
+    Body başladıysa izni generator'ın finally'si TTFT / overload sinyaliyle bırakır
+    (AIMD bu sinyalle ayarlanır). İstemci body iterator başlamadan koparsa o
+    finally hiç çalışmaz, BackgroundTask da ClientDisconnect'te atlanır; bu durumda
+    izin __call__ bitince sinyalsiz bırakılır.
+    """
+
+    def __init__(self, content, permit: Permit, **kwargs):
+        self.permit = permit
+        self.body_started = False
+        super().__init__(self._mark_started(content), **kwargs)
+
+    async def _mark_started(self, content):
+        self.body_started = True
+        async for event in content:
+            yield event
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if not self.body_started:
+                admission.release(self.permit)
+
+
+BATCH_MAX_ATTEMPTS = 5
+
+
+async def process_batch_item(messages: List[Dict[str, str]], model: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Batch içindeki tek bir benzersiz öğeyi işle.
+    Admission control 429 döndürürse Retry-After kadar bekleyip tekrar dener;
+    böylece batch işi upstream kapasitesini doldurur ama aşmaz.
+    """
+    async with semaphore:
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            try:
+                result = await call_llm(messages, model, 0.5, 200, Priority.BATCH)
+                return {"result": result}
+            except HTTPException as e:
+                if e.status_code != 429 or attempt == BATCH_MAX_ATTEMPTS - 1:
+                    return {"error": e.detail, "status_code": e.status_code}
+                retry_after = float((e.headers or {}).get("Retry-After", "1"))
+                await asyncio.sleep(retry_after)
+            except Exception as e:
+                return {"error": str(e), "status_code": 500}
+
+
+async def stream_batch_results(request: BatchRequest):
+    """
+    Benzersiz öğeleri eşzamanlı işle, sonuçları bittikçe NDJSON olarak gönder
+    """
+    # Aynı (operation, text, language) için tek upstream çağrısı yapılır
+    groups: Dict[tuple, List[int]] = {}
+    for index, item in enumerate(request.items):
+        key = (item.operation, item.text, item.language)
+        if key in groups:
+            groups[key].append(index)
+            metrics.record_cache("batch_dedup", hit=True)
+        else:
+            groups[key] = [index]
+            metrics.record_cache("batch_dedup", hit=False)
+
+    semaphore = asyncio.Semaphore(request.concurrency)
+    tasks = {}
+    for key, indices in groups.items():
+        messages = build_text_messages(*key)
+        task = asyncio.ensure_future(process_batch_item(messages, request.model, semaphore))
+        tasks[task] = indices
+
+    errors = 0
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcome = task.result()
+                for index in tasks[task]:
+                    item = request.items[index]
+                    if "error" in outcome:
+                        errors += 1
+                    line = {"index": index, "id": item.id, "operation": item.operation, **outcome}
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+        yield json.dumps({
+            "done": True,
+            "total": len(request.items),
+            "unique": len(groups),
+            "errors": errors,
+            "model": request.model
+        }) + "\n"
+    finally:
+        # İstemci bağlantıyı kapatırsa bekleyen upstream çağrılarını iptal et
+        for task in pending:
+            task.cancel()
 
 
 # ============================================================================
@@ -135,14 +430,16 @@ async def root():
     return {
         "message": "LLM Backend API'ye hoş geldiniz!",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready",
+        "metrics": "/metrics"
     }
 
 
 @app.get("/health", response_model=HealthResponse, tags=["General"])
 async def health_check():
     """
-    Health check endpoint
+    Liveness endpoint - süreç ayakta mı? (trafik alabilirliği için /ready)
     """
     return HealthResponse(
         status="healthy",
@@ -151,6 +448,25 @@ async def health_check():
     )
 
 
+@app.get("/ready", tags=["General"])
+async def readiness_check():
+    """
+    Readiness endpoint - ısınma bitti, upstream kuyruğunda yer var ve kapanmıyorsa 200, değilse 503
+    """
+    ready, body = lifecycle.readiness(admission)
+    body["timestamp"] = datetime.now().isoformat()
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", tags=["General"])
+async def metrics_endpoint():
+    """
+    Prometheus metrik endpoint'i (text exposition format)
+    """
+    others = await run_in_threadpool(metrics_store.read_others) if metrics_store is not None else ()
+    return PlainTextResponse(metrics.render(others), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/chat", tags=["Chat"])
 async def chat(request: ChatRequest):
     """
@@ -162,13 +478,20 @@ async def chat(request: ChatRequest):
         
         # Streaming isteniyorsa
         if request.stream:
-            return StreamingResponse(
-                stream_openai_response(messages, request.model, request.temperature, request.max_tokens),
+            if lifecycle.drain_expired():
+                # Kapanış süresi doldu: upstream çağrısı başlatmadan başka replikaya yönlendir
+                raise HTTPException(status_code=503, detail="Sunucu kapanıyor", headers={"Retry-After": "1", ADMISSION_REJECTED_HEADER: "1"})
+            permit = await acquire_llm_slot(messages, request.model, request.max_tokens, Priority.INTERACTIVE)
+            return PermitStreamingResponse(
+                lifecycle.track_stream(
+                    stream_openai_response(messages, request.model, request.temperature, request.max_tokens, permit)
+                ),
+                permit,
                 media_type="text/event-stream"
             )
         
         # Normal yanıt
-        response_content = get_openai_response(
+        response_content = await call_llm(
             messages,
             request.model,
             request.temperature,
@@ -184,6 +507,8 @@ async def chat(request: ChatRequest):
                 "total_tokens": len(str(messages)) + len(response_content.split())
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -194,18 +519,17 @@ async def chat_simple(message: str, model: str = "gpt-3.5-turbo"):
     Basit chat endpoint - Tek mesaj
     """
     try:
-        messages = [
-            {"role": "system", "content": "Sen yardımcı bir asistansın."},
-            {"role": "user", "content": message}
-        ]
+        messages = prompts.build("chat_simple", message=message)
         
-        response_content = get_openai_response(messages, model, 0.7, 150)
+        response_content = await call_llm(messages, model, 0.7, 150)
         
         return {
             "message": message,
             "response": response_content,
             "model": model
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -216,30 +540,9 @@ async def process_text(request: TextProcessRequest):
     Metin işleme endpoint - Özetleme, çeviri, analiz
     """
     try:
-        system_prompts = {
-            "summarize": "Sen bir metin özetleme uzmanısın. Verilen metni kısa ve öz şekilde özetle.",
-            "translate": f"Sen bir çevirmensin. Verilen metni {request.language or 'İngilizce'} diline çevir.",
-            "analyze": "Sen bir metin analiz uzmanısın. Verilen metni analiz et ve yorum yap."
-        }
+        messages = build_text_messages(request.operation, request.text, request.language)
         
-        system_prompt = system_prompts.get(
-            request.operation,
-            "Sen yardımcı bir asistansın."
-        )
-        
-        if request.operation == "translate" and request.language:
-            user_prompt = f"Bu metni {request.language} diline çevir:\n\n{request.text}"
-        elif request.operation == "summarize":
-            user_prompt = f"Bu metni özetle:\n\n{request.text}"
-        else:
-            user_prompt = f"Bu metni analiz et:\n\n{request.text}"
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        response_content = get_openai_response(messages, request.model, 0.5, 200)
+        response_content = await call_llm(messages, request.model, 0.5, 200, Priority.BATCH)
         
         return {
             "original_text": request.text,
@@ -247,6 +550,8 @@ async def process_text(request: TextProcessRequest):
             "result": response_content,
             "model": request.model
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -257,16 +562,14 @@ async def explain_code(request: CodeExplainRequest):
     Kod açıklama endpoint
     """
     try:
-        system_prompt = f"Sen bir {request.language} programlama uzmanısın. Verilen kodu detaylı şekilde açıkla."
-        
-        user_prompt = f"Bu kodu açıkla:\n\n```{request.language.lower()}\n{request.code}\n```"
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
+        messages = prompts.build(
+            "code_explain",
+            language=request.language,
+            fence=request.language.lower(),
+            code=request.code
+        )
         
-        response_content = get_openai_response(messages, request.model, 0.5, 300)
+        response_content = await call_llm(messages, request.model, 0.5, 300)
         
         return {
             "code": request.code,
@@ -274,6 +577,8 @@ async def explain_code(request: CodeExplainRequest):
             "explanation": response_content,
             "model": request.model
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -284,18 +589,17 @@ async def summarize_text(text: str, model: str = "gpt-3.5-turbo"):
     Hızlı metin özetleme endpoint
     """
     try:
-        messages = [
-            {"role": "system", "content": "Sen bir metin özetleme uzmanısın. Verilen metni kısa ve öz şekilde özetle."},
-            {"role": "user", "content": f"Bu metni özetle:\n\n{text}"}
-        ]
+        messages = prompts.build("summarize", text=text)
         
-        response_content = get_openai_response(messages, model, 0.5, 150)
+        response_content = await call_llm(messages, model, 0.5, 150, Priority.BATCH)
         
         return {
             "original_text": text,
             "summary": response_content,
             "model": model
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -306,12 +610,9 @@ async def translate_text(text: str, target_language: str = "İngilizce", model:
     Hızlı metin çeviri endpoint
     """
     try:
-        messages = [
-            {"role": "system", "content": f"Sen bir çevirmensin. Verilen metni {target_language} diline çevir."},
-            {"role": "user", "content": text}
-        ]
+        messages = prompts.build("translate_quick", language=target_language, text=text)
         
-        response_content = get_openai_response(messages, model, 0.3, 200)
+        response_content = await call_llm(messages, model, 0.3, 200, Priority.BATCH)
         
         return {
             "original_text": text,
@@ -319,10 +620,20 @@ async def translate_text(text: str, target_language: str = "İngilizce", model:
             "translation": response_content,
             "model": model
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/text/batch", tags=["Text Processing"])
+async def batch_text(request: BatchRequest):
+    """
+    Toplu metin işleme endpoint - Sonuçlar tamamlandıkça NDJSON olarak döner
+    """
+    return StreamingResponse(stream_batch_results(request), media_type="application/x-ndjson")
+
+
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
@@ -355,12 +666,65 @@ async def internal_error_handler(request, exc):
 # UYGULAMA ÇALIŞTIRMA
 # ============================================================================
 
-if __name__ == "__main__":
+def run_production(host: str, port: int, workers: int):
+    """
+    Production modu: reload yok, çoklu worker, paylaşılan durum.
+
+    gunicorn kuruluysa `preload_app` ile çalışır (modüller master'da bir kez
+    import edilir, worker'lar fork ile copy-on-write paylaşır). Değilse
+    uvicorn'un kendi çoklu worker modu kullanılır.
+    """
+    import shutil
+    import uvicorn
+
+    # Worker'lar bu değişkenleri master'dan miras alır
+    if workers > 1:
+        os.environ.setdefault("STATE_BACKEND_URL", "sqlite:////dev/shm/llm_backend_state.db")
+        os.environ.setdefault("METRICS_MULTIPROC_DIR", "/dev/shm/llm_backend_metrics")
+        # Önceki çalıştırmadan kalan metrik dosyalarını temizle
+        shutil.rmtree(os.environ["METRICS_MULTIPROC_DIR"], ignore_errors=True)
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    os.environ["BIND"] = f"{host}:{port}"
+
+    if shutil.which("gunicorn"):
+        config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+        os.execvp("gunicorn", ["gunicorn", "-c", config, "3_fastapi_backend:app"])
+
     uvicorn.run(
         "3_fastapi_backend:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+        host=host,
+        port=port,
+        workers=workers,
+        reload=False,
+        log_level="info",
+        access_log=False,
+        # Drain süresi dolup stream'ler kapatıldıktan sonra kalan bağlantılar için pay
+        timeout_graceful_shutdown=int(lifecycle.readiness_delay + lifecycle.drain_timeout + 5)
     )
 
+
+if __name__ == "__main__":
+    import argparse
+    # uvicorn sadece script olarak çalıştırılınca gerekir; app'i import eden
+    # diğer süreçler (ör. testler, benchmark'lar) onu yüklemek zorunda kalmaz
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="LLM Backend API")
+    parser.add_argument("--prod", action="store_true", help="Production modu (reload yok, çoklu worker)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+
+    if args.prod:
+        run_production(args.host, args.port, args.workers)
+    else:
+        # Geliştirme modu: tek worker, otomatik yeniden yükleme
+        uvicorn.run(
+            "3_fastapi_backend:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info"
+        )
+
@@ -3,89 +3,107 @@ Frontend-Backend Entegrasyonu
 Gradio ve Streamlit ile FastAPI backend entegrasyonu
 """
 
-import gradio as gr
-import streamlit as st
-import requests
 import json
 from typing import List, Dict, Any
 import os
 from dotenv import load_dotenv
 
+from lazy_imports import lazy_import
+
+# Her mod sadece kendi UI kütüphanesini yükler: `python 4_fastapi_integration.py gradio`
+# streamlit'i, `streamlit run` ise gradio'yu hiç import etmez
+gr = lazy_import("gradio")
+st = lazy_import("streamlit")
+
 # Environment variables yükle
 load_dotenv()
 
 # Backend API URL
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
+# Paylaşılan, keep-alive bağlantı havuzlu backend client
+# (API_BASE_URL .env'den okunduktan sonra import edilmeli)
+from backend_client import BackendHTTPError, BackendUnavailable, get_async_client, get_client
+from markdown_stream import IncrementalMarkdownRenderer
+
 # ============================================================================
 # GRADIO + FASTAPI ENTEGRASYONU
 # ============================================================================
 
-def gradio_chat_with_api(message, history):
+CONNECTION_ERROR_MESSAGE = "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+
+
+def _format_backend_error(e: Exception) -> str:
+    """
+    Backend hatasını kullanıcıya gösterilecek mesaja çevir
+    """
+    if isinstance(e, BackendUnavailable):
+        return CONNECTION_ERROR_MESSAGE
+    if isinstance(e, BackendHTTPError):
+        return f"Hata: {e.status_code} - {e.text}"
+    return f"Hata oluştu: {str(e)}"
+
+
+async def gradio_chat_with_api(message, history):
     """
     Gradio chatbot - FastAPI backend kullanarak
     """
     try:
-        # API'ye istek gönder
-        response = requests.post(
-            f"{API_BASE_URL}/chat/simple",
-            params={"message": message, "model": "gpt-3.5-turbo"},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("response", "Yanıt alınamadı")
-        else:
-            return f"Hata: {response.status_code} - {response.text}"
-    except requests.exceptions.ConnectionError:
-        return "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+        data = await get_async_client().chat_simple(message, model="gpt-3.5-turbo")
+        return data.get("response", "Yanıt alınamadı")
+    except Exception as e:
+        return _format_backend_error(e)
+
+
+def _history_to_messages(history) -> List[Dict[str, str]]:
+    """
+    Gradio (kullanıcı, bot) tuple geçmişini /chat mesaj formatına çevir
+    """
+    messages = []
+    for user_msg, bot_msg in history or []:
+        if user_msg:
+            messages.append({"role": "user", "content": user_msg})
+        if bot_msg:
+            messages.append({"role": "assistant", "content": bot_msg})
+    return messages
+
+
+async def gradio_chat_stream_with_api(message, history):
+    """
+    Gradio streaming chatbot - /chat SSE stream'i geldikçe kısmi yanıt üretir
+    """
+    messages = _history_to_messages(history) + [{"role": "user", "content": message}]
+    partial = ""
+    try:
+        async for delta in get_async_client().stream_chat(messages, model="gpt-3.5-turbo"):
+            partial += delta
+            yield partial
+        if not partial:
+            yield "Yanıt alınamadı"
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        yield (partial + "\n\n" if partial else "") + _format_backend_error(e)
 
 
-def gradio_summarize_with_api(text):
+async def gradio_summarize_with_api(text):
     """
     Gradio metin özetleme - FastAPI backend kullanarak
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/text/summarize",
-            params={"text": text, "model": "gpt-3.5-turbo"},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("summary", "Özet oluşturulamadı")
-        else:
-            return f"Hata: {response.status_code} - {response.text}"
-    except requests.exceptions.ConnectionError:
-        return "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+        data = await get_async_client().summarize(text, model="gpt-3.5-turbo")
+        return data.get("summary", "Özet oluşturulamadı")
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        return _format_backend_error(e)
 
 
-def gradio_translate_with_api(text, target_language):
+async def gradio_translate_with_api(text, target_language):
     """
     Gradio metin çeviri - FastAPI backend kullanarak
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/text/translate",
-            params={"text": text, "target_language": target_language, "model": "gpt-3.5-turbo"},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("translation", "Çeviri yapılamadı")
-        else:
-            return f"Hata: {response.status_code} - {response.text}"
-    except requests.exceptions.ConnectionError:
-        return "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+        data = await get_async_client().translate(text, target_language, model="gpt-3.5-turbo")
+        return data.get("translation", "Çeviri yapılamadı")
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        return _format_backend_error(e)
 
 
 def create_gradio_integration():
@@ -114,10 +132,14 @@ def create_gradio_integration():
                 submit_btn = gr.Button("Gönder", variant="primary")
                 clear_btn = gr.Button("Temizle")
                 
-                def respond(message, chat_history):
-                    bot_message = gradio_chat_with_api(message, chat_history)
-                    chat_history.append((message, bot_message))
-                    return "", chat_history
+                async def respond(message, chat_history):
+                    chat_history = chat_history or []
+                    previous = list(chat_history)
+                    chat_history.append((message, ""))
+                    # İlk token gelir gelmez ekranda görünür
+                    async for partial in gradio_chat_stream_with_api(message, previous):
+                        chat_history[-1] = (message, partial)
+                        yield "", chat_history
                 
                 msg.submit(respond, [msg, chatbot], [msg, chatbot])
                 submit_btn.click(respond, [msg, chatbot], [msg, chatbot])
@@ -179,21 +201,17 @@ def streamlit_chat_with_api(message: str) -> str:
     Streamlit chatbot - FastAPI backend kullanarak
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/chat/simple",
-            params={"message": message, "model": "gpt-3.5-turbo"},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("response", "Yanıt alınamadı")
-        else:
-            return f"Hata: {response.status_code} - {response.text}"
-    except requests.exceptions.ConnectionError:
-        return "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+        data = get_client().chat_simple(message, model="gpt-3.5-turbo")
+        return data.get("response", "Yanıt alınamadı")
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        return _format_backend_error(e)
+
+
+def streamlit_chat_stream_with_api(messages: List[Dict[str, str]]):
+    """
+    Streamlit streaming chatbot - /chat SSE stream'inden metin parçalarını üretir
+    """
+    return get_client().stream_chat(messages, model="gpt-3.5-turbo")
 
 
 def streamlit_summarize_with_api(text: str) -> str:
@@ -201,21 +219,10 @@ def streamlit_summarize_with_api(text: str) -> str:
     Streamlit metin özetleme - FastAPI backend kullanarak
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/text/summarize",
-            params={"text": text, "model": "gpt-3.5-turbo"},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("summary", "Özet oluşturulamadı")
-        else:
-            return f"Hata: {response.status_code} - {response.text}"
-    except requests.exceptions.ConnectionError:
-        return "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+        data = get_client().summarize(text, model="gpt-3.5-turbo")
+        return data.get("summary", "Özet oluşturulamadı")
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        return _format_backend_error(e)
 
 
 def streamlit_translate_with_api(text: str, target_language: str) -> str:
@@ -223,21 +230,10 @@ def streamlit_translate_with_api(text: str, target_language: str) -> str:
     Streamlit metin çeviri - FastAPI backend kullanarak
     """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/text/translate",
-            params={"text": text, "target_language": target_language, "model": "gpt-3.5-turbo"},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("translation", "Çeviri yapılamadı")
-        else:
-            return f"Hata: {response.status_code} - {response.text}"
-    except requests.exceptions.ConnectionError:
-        return "❌ Backend API'ye bağlanılamadı. API'nin çalıştığından emin olun."
+        data = get_client().translate(text, target_language, model="gpt-3.5-turbo")
+        return data.get("translation", "Çeviri yapılamadı")
     except Exception as e:
-        return f"Hata oluştu: {str(e)}"
+        return _format_backend_error(e)
 
 
 def create_streamlit_integration():
@@ -255,11 +251,10 @@ def create_streamlit_integration():
     
     # API durumu kontrolü
     try:
-        health_response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-        if health_response.status_code == 200:
-            st.success(f"✅ Backend API çalışıyor: {API_BASE_URL}")
-        else:
-            st.error(f"❌ Backend API yanıt vermiyor: {health_response.status_code}")
+        get_client().health()
+        st.success(f"✅ Backend API çalışıyor: {API_BASE_URL}")
+    except BackendHTTPError as e:
+        st.error(f"❌ Backend API yanıt vermiyor: {e.status_code}")
     except Exception:
         st.error(f"❌ Backend API'ye bağlanılamadı: {API_BASE_URL}")
         st.info("Backend API'yi başlatmak için: `uvicorn 3_fastapi_backend:app --reload`")
@@ -286,12 +281,24 @@ def create_streamlit_integration():
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Bot yanıtını al ve göster
+            # Bot yanıtını stream olarak al ve göster
             with st.chat_message("assistant"):
-                with st.spinner("Yanıt bekleniyor..."):
-                    response = streamlit_chat_with_api(prompt)
-                    st.markdown(response)
-                    st.session_state.integration_messages.append({"role": "assistant", "content": response})
+                message_placeholder = st.empty()
+                renderer = IncrementalMarkdownRenderer(message_placeholder)
+                error = None
+                try:
+                    for delta in streamlit_chat_stream_with_api(st.session_state.integration_messages):
+                        renderer.append(delta)
+                except Exception as e:
+                    error = _format_backend_error(e)
+                response = renderer.finish()
+                if error:
+                    response = (response + "\n\n" if response else "") + error
+                    message_placeholder.markdown(response)
+                elif not response:
+                    response = "Yanıt alınamadı"
+                    message_placeholder.markdown(response)
+                st.session_state.integration_messages.append({"role": "assistant", "content": response})
         
         # Temizle butonu
         if st.button("🗑️ Geçmişi Temizle"):
@@ -356,21 +363,16 @@ def create_streamlit_integration():
             with st.expander(f"{method_path}"):
                 if st.button(f"Test {method_path}", key=endpoint):
                     try:
-                        if "GET" in method_path:
-                            response = requests.get(f"{API_BASE_URL}{endpoint}", timeout=5)
-                        else:
-                            response = requests.post(
-                                f"{API_BASE_URL}{endpoint}",
-                                params={"message": "test", "text": "test", "target_language": "İngilizce"},
-                                timeout=5
-                            )
-                        
-                        if response.status_code == 200:
-                            st.success(f"✅ Başarılı: {response.status_code}")
-                            st.json(response.json())
-                        else:
-                            st.error(f"❌ Hata: {response.status_code}")
-                            st.text(response.text)
+                        method = "GET" if "GET" in method_path else "POST"
+                        params = None if method == "GET" else {
+                            "message": "test", "text": "test", "target_language": "İngilizce"
+                        }
+                        response = get_client().request(method, endpoint, params=params)
+                        st.success(f"✅ Başarılı: {response.status_code}")
+                        st.json(response.json())
+                    except BackendHTTPError as e:
+                        st.error(f"❌ Hata: {e.status_code}")
+                        st.text(e.text)
                     except Exception as e:
                         st.error(f"❌ Bağlantı hatası: {str(e)}")
         
@@ -389,7 +391,8 @@ if __name__ == "__main__":
         # Gradio arayüzünü başlat
         demo = create_gradio_integration()
         demo.queue()
-        demo.launch(server_name="0.0.0.0", server_port=7861, share=False)
+        # Docker image'ında GRADIO_SERVER_PORT=7860 (docker-compose port eşlemesi)
+        demo.launch(server_name="0.0.0.0", server_port=int(os.getenv("GRADIO_SERVER_PORT", "7861")), share=False)
     else:
         # Streamlit arayüzünü başlat
         create_streamlit_integration()
@@ -0,0 +1,357 @@
+"""
+Backend API Client
+Frontend'lerin (Gradio / Streamlit) FastAPI backend ile konuşması için paylaşılan client
+
+- Keep-alive connection pooling: her mesajda yeni TCP bağlantısı açılmaz
+- Ayrı connect / read timeout'ları
+- Jitter'lı retry: bağlantı kurulamadığında her istek; istek gönderildikten
+  sonra kopan bağlantıda ve 429/502/503/504 durumunda ise sadece idempotent
+  istekler (ya da backend'in X-Admission-Rejected ile işaretlediği, upstream'e
+  hiç gitmeden reddedilen 429/503'ler) yeniden denenir
+- Gradio'nun queue'su için async varyant (httpx.AsyncClient)
+- /chat SSE stream'ini parça parça okuyan streaming yardımcıları
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from lazy_imports import lazy_import
+
+# Sadece sync client (Streamlit) kullanılırsa yüklenir; Gradio modu httpx ile çalışır
+requests = lazy_import("requests")
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+
+CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "3"))
+POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "32"))
+# Sunucunun keep-alive süresinden (uvicorn / gunicorn.conf.py: 5 s) kısa olmalı;
+# yoksa sunucunun kapattığı boştaki bağlantı tekrar kullanılır ve istek
+# RemoteProtocolError ile düşer (bağlantı hatası sayılmadığı için POST'ta retry yok)
+KEEPALIVE_EXPIRY = float(os.getenv("BACKEND_KEEPALIVE_EXPIRY", "4"))
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# 3_fastapi_backend.py ile aynı header
+ADMISSION_REJECTED_HEADER = "X-Admission-Rejected"
+
+
+class BackendError(Exception):
+    """
+    Backend isteği başarısız oldu
+    """
+
+
+class BackendUnavailable(BackendError):
+    """
+    Backend'e bağlanılamadı
+    """
+
+
+class BackendHTTPError(BackendError):
+    """
+    Backend 2xx dışında bir yanıt döndürdü
+    """
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"{status_code} - {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None, base: float = 0.2, cap: float = 5.0) -> float:
+    """
+    Full-jitter exponential backoff; Retry-After varsa ona uyulur
+    """
+    if retry_after:
+        try:
+            return min(cap, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+_SSE_DONE = object()
+
+
+def _parse_sse_line(line: str):
+    """
+    Backend'in SSE satırını çöz: metin parçası, akış sonu için _SSE_DONE
+    veya ilgisiz satırlar için None döner; stream içi hata BackendError olur
+    """
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return _SSE_DONE
+    payload = json.loads(data)
+    if "error" in payload:
+        raise BackendError(payload["error"])
+    return payload.get("content") or None
+
+
+def _chat_payload(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+    return {
+        "messages": messages,
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+
+def _should_retry_status(method: str, status_code: int, headers) -> bool:
+    if status_code not in RETRY_STATUSES:
+        return False
+    if method in IDEMPOTENT_METHODS:
+        return True
+    # Backend 429'u upstream'in (OpenAI) rate limit'inden de gelebilir; o durumda
+    # üretim işi başlamış olabilir. Sadece admission control / drain reddi
+    # (istek upstream'e hiç gitmedi) işaretlenir ve POST için güvenle tekrarlanır.
+    return status_code in (429, 503) and headers.get(ADMISSION_REJECTED_HEADER) == "1"
+
+
+def _is_connect_failure(error: Exception) -> bool:
+    """
+    requests'in ConnectionError'ı istek gönderildikten sonra kopan bağlantıları
+    da kapsar; sadece TCP bağlantısı hiç kurulamadıysa True döner
+    """
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+# ============================================================================
+# SYNC CLIENT (Streamlit)
+# ============================================================================
+
+class BackendClient:
+    """
+    requests.Session tabanlı, thread-safe kullanılabilen backend client
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 pool_size: int = POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        # Retry'ları kendimiz yönetiyoruz; adapter sadece bağlantı havuzu için
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive", "Accept": "application/json"})
+
+    def request(self, method: str, path: str, timeout=None, **kwargs) -> "requests.Response":
+        method = method.upper()
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                # Bağlantı kurulamadıysa istek backend'e ulaşmadı; her metod için güvenli.
+                # Gönderimden sonra kopan bağlantıda POST backend'de işlenmiş olabilir.
+                if method not in IDEMPOTENT_METHODS and not _is_connect_failure(e):
+                    raise BackendUnavailable(str(e)) from e
+                error = e
+            else:
+                if response.ok:
+                    return response
+                if attempt < self.max_retries and _should_retry_status(method, response.status_code, response.headers):
+                    time.sleep(_backoff(attempt, response.headers.get("Retry-After")))
+                    continue
+                raise BackendHTTPError(response.status_code, response.text)
+            if attempt < self.max_retries:
+                time.sleep(_backoff(attempt))
+        raise BackendUnavailable(str(error))
+
+    def get_json(self, path: str, **kwargs) -> Dict[str, Any]:
+        return self.request("GET", path, **kwargs).json()
+
+    def post_json(self, path: str, **kwargs) -> Dict[str, Any]:
+        return self.request("POST", path, **kwargs).json()
+
+    # ---------- Endpoint yardımcıları ----------
+    def health(self) -> Dict[str, Any]:
+        return self.get_json("/health", timeout=(CONNECT_TIMEOUT, 5))
+
+    def chat_simple(self, message: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+        return self.post_json("/chat/simple", params={"message": message, "model": model})
+
+    def summarize(self, text: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+        return self.post_json("/text/summarize", params={"text": text, "model": model})
+
+    def translate(self, text: str, target_language: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+        return self.post_json(
+            "/text/translate",
+            params={"text": text, "target_language": target_language, "model": model}
+        )
+
+    def stream_chat(self, messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo",
+                    temperature: float = 0.7, max_tokens: int = 500) -> Iterator[str]:
+        """
+        /chat SSE stream'inden gelen metin parçalarını (delta) geldikçe üret.
+        Retry yalnızca ilk yanıt başlığından önce yapılır; akış başladıktan
+        sonra kopan bağlantı yeniden denenmez.
+        """
+        response = self.request(
+            "POST", "/chat",
+            json=_chat_payload(messages, model, temperature, max_tokens),
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+        )
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                delta = _parse_sse_line(line) if line else None
+                if delta is _SSE_DONE:
+                    return
+                if delta:
+                    yield delta
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+# ============================================================================
+# ASYNC CLIENT (Gradio queue)
+# ============================================================================
+
+class AsyncBackendClient:
+    """
+    httpx.AsyncClient tabanlı backend client; Gradio'nun async handler'ları için
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 pool_size: int = POOL_SIZE):
+        import httpx
+
+        self._httpx = httpx
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+            headers={"Accept": "application/json"},
+        )
+
+    async def request(self, method: str, path: str, stream: bool = False, **kwargs):
+        import asyncio
+
+        httpx = self._httpx
+        method = method.upper()
+        for attempt in range(self.max_retries + 1):
+            try:
+                request = self.client.build_request(method, path, **kwargs)
+                response = await self.client.send(request, stream=stream)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                error = e
+            else:
+                if response.is_success:
+                    return response
+                if stream:
+                    await response.aread()
+                    await response.aclose()
+                if attempt < self.max_retries and _should_retry_status(method, response.status_code, response.headers):
+                    await asyncio.sleep(_backoff(attempt, response.headers.get("Retry-After")))
+                    continue
+                raise BackendHTTPError(response.status_code, response.text)
+            if attempt < self.max_retries:
+                await asyncio.sleep(_backoff(attempt))
+        raise BackendUnavailable(str(error))
+
+    async def get_json(self, path: str, **kwargs) -> Dict[str, Any]:
+        return (await self.request("GET", path, **kwargs)).json()
+
+    async def post_json(self, path: str, **kwargs) -> Dict[str, Any]:
+        return (await self.request("POST", path, **kwargs)).json()
+
+    # ---------- Endpoint yardımcıları ----------
+    async def health(self) -> Dict[str, Any]:
+        return await self.get_json("/health", timeout=5)
+
+    async def chat_simple(self, message: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+        return await self.post_json("/chat/simple", params={"message": message, "model": model})
+
+    async def summarize(self, text: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+        return await self.post_json("/text/summarize", params={"text": text, "model": model})
+
+    async def translate(self, text: str, target_language: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+        return await self.post_json(
+            "/text/translate",
+            params={"text": text, "target_language": target_language, "model": model}
+        )
+
+    async def stream_chat(self, messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo",
+                          temperature: float = 0.7, max_tokens: int = 500) -> AsyncIterator[str]:
+        """
+        /chat SSE stream'inden gelen metin parçalarını (delta) geldikçe üret
+        """
+        response = await self.request(
+            "POST", "/chat",
+            json=_chat_payload(messages, model, temperature, max_tokens),
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+        )
+        try:
+            async for line in response.aiter_lines():
+                delta = _parse_sse_line(line) if line else None
+                if delta is _SSE_DONE:
+                    return
+                if delta:
+                    yield delta
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# ============================================================================
+# PAYLAŞILAN INSTANCE'LAR
+# ============================================================================
+
+_client: Optional[BackendClient] = None
+_async_client: Optional[AsyncBackendClient] = None
+_lock = threading.Lock()
+
+
+def get_client() -> BackendClient:
+    """
+    Process başına tek sync client (Streamlit rerun'larında da korunur)
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = BackendClient()
+    return _client
+
+
+def get_async_client() -> AsyncBackendClient:
+    """
+    Process başına tek async client. Gradio tüm async handler'ları aynı
+    event loop'ta çalıştırdığı için bağlantı havuzu paylaşılabilir.
+    """
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = AsyncBackendClient()
+    return _async_client
@@ -0,0 +1,194 @@
+"""
+Backend Yaşam Döngüsü
+Readiness (trafik alabilir mi?) durumu ve SIGTERM'de bağlantı boşaltma (graceful drain)
+
+- Liveness (/health): süreç ayakta mı? Kapanırken bile 200 döner
+- Readiness (/ready): ısınma bitti mi, paylaşılan cache erişilebilir mi,
+  upstream kuyruğunda yer var mı, sunucu kapanıyor mu?
+- SIGTERM: readiness hemen 503 olur ama `DRAIN_READINESS_DELAY` saniye boyunca
+  istek kabul edilmeye devam eder (healthcheck / load balancer replikayı
+  trafikten çıkarabilsin diye). Sonra sunucu yeni bağlantı almayı bırakır ve
+  süren istekleri bekler. `DRAIN_TIMEOUT` içinde bitmeyen SSE stream'leri,
+  istemciye yeniden denemesini söyleyen bir hata event'iyle kapatılır.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+DRAIN_READINESS_DELAY = float(os.getenv("DRAIN_READINESS_DELAY", "5"))
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "20"))
+# Upstream kuyruğunda bundan fazla istek bekliyorsa replika "hazır değil" sayılır
+READY_MAX_QUEUE_DEPTH = int(os.getenv("READY_MAX_QUEUE_DEPTH", "20"))
+# Drain başlamadıysa stream'ler bu aralıkla uyanıp drain durumuna bakar (saniye);
+# drain başladıktan sonra bekleme doğrudan deadline'a göre yapılır
+DRAIN_POLL_INTERVAL = 1.0
+
+DRAIN_ABORT_EVENT = "data: " + json.dumps(
+    {"error": "Sunucu yeniden başlatılıyor, lütfen isteği tekrar gönderin", "retry": True},
+    ensure_ascii=False
+) + "\n\n"
+
+_STREAM_END = object()
+
+
+class BackendLifecycle:
+    """
+    Isınma, readiness ve drain durumunu tutan nesne (worker başına bir tane)
+    """
+
+    def __init__(self, readiness_delay: float = DRAIN_READINESS_DELAY, drain_timeout: float = DRAIN_TIMEOUT,
+                 max_queue_depth: int = READY_MAX_QUEUE_DEPTH):
+        self.readiness_delay = readiness_delay
+        self.drain_timeout = drain_timeout
+        self.max_queue_depth = max_queue_depth
+        self.warm = False
+        self.warmup_checks: Dict[str, bool] = {}
+        self.draining = False
+        self.deadline: Optional[float] = None
+        # Aktif SSE stream sayısı; readiness ve metrikler okur
+        self.active_streams = 0
+        self._lock = threading.Lock()
+
+    # ---------- Isınma ----------
+    def mark_warm(self, checks: Dict[str, bool]):
+        self.warmup_checks = dict(checks)
+        self.warm = True
+
+    # ---------- Drain ----------
+    def start_drain(self):
+        if not self.draining:
+            self.draining = True
+            self.deadline = time.monotonic() + self.readiness_delay + self.drain_timeout
+
+    def drain_expired(self) -> bool:
+        return self.draining and time.monotonic() >= self.deadline
+
+    def install_signal_handler(self, loop: asyncio.AbstractEventLoop):
+        """
+        Sunucunun (uvicorn / gunicorn worker) SIGTERM handler'ının önüne geç.
+
+        İlk SIGTERM drain'i başlatır ve asıl handler'ı `readiness_delay` sonra
+        çağırır; ikinci SIGTERM beklemeden iletilir. Sunucu kendi handler'ını
+        kurmadıysa (ör. uygulama başka bir şekilde çalıştırılıyorsa) dokunulmaz.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return
+
+        def handle_sigterm(sig, frame):
+            if self.draining or self.readiness_delay <= 0:
+                self.start_drain()
+                previous(sig, frame)
+                return
+            self.start_drain()
+            # Sinyal handler'ı event loop'un dışında çalışır; loop'u uyandırarak zamanla
+            loop.call_soon_threadsafe(loop.call_later, self.readiness_delay, previous, sig, frame)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def _drain_wait_timeout(self) -> float:
+        if self.draining:
+            return max(0.0, self.deadline - time.monotonic())
+        return DRAIN_POLL_INTERVAL
+
+    async def track_stream(self, events: Iterator[str], abort_event: str = DRAIN_ABORT_EVENT) -> AsyncIterator[str]:
+        """
+        SSE generator'ını sar: aktif stream sayısını tut, drain süresi
+        dolunca stream'i hata event'iyle sonlandır.
+
+        Sync generator ayrı bir daemon thread'de okunur, event loop sadece
+        kuyruğu bekler. Böylece upstream'den token beklenirken de drain süresi
+        kontrol edilir; süre dolunca stream bir sonraki token'ı beklemeden kapanır.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def post(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop kapandı (süreç çıkıyor); okuyan kalmadı
+                pass
+
+        def pump():
+            error = None
+            try:
+                for event in events:
+                    if stop.is_set():
+                        break
+                    post((event, None))
+            except Exception as e:
+                error = e
+            finally:
+                close = getattr(events, "close", None)
+                if close is not None:
+                    # İç generator'ın finally'si (ör. admission izninin bırakılması) çalışsın
+                    try:
+                        close()
+                    except RuntimeError:
+                        pass
+                post((_STREAM_END, error))
+
+        with self._lock:
+            self.active_streams += 1
+        threading.Thread(target=pump, name="sse-stream", daemon=True).start()
+        try:
+            while True:
+                try:
+                    event, error = await asyncio.wait_for(queue.get(), timeout=self._drain_wait_timeout())
+                except asyncio.TimeoutError:
+                    if self.drain_expired():
+                        yield abort_event
+                        return
+                    continue
+                if event is _STREAM_END:
+                    if error is not None:
+                        raise error
+                    return
+                yield event
+                if self.drain_expired():
+                    yield abort_event
+                    return
+        finally:
+            # Upstream'i bekleyen thread bir sonraki event'te durur ve generator'ı kapatır
+            stop.set()
+            with self._lock:
+                self.active_streams -= 1
+
+    # ---------- Readiness ----------
+    def readiness(self, admission) -> Tuple[bool, Dict[str, Any]]:
+        """
+        (hazır mı, açıklama) döndür. Upstream warm-up sonucu sadece raporlanır:
+        upstream kesintisinde tüm replikaların trafikten çıkması istenmez.
+        """
+        limit = admission.limit.limit
+        queue_depth = admission.queue_depth
+        reasons = []
+        if self.draining:
+            reasons.append("draining")
+        if not self.warm:
+            reasons.append("warming_up")
+        elif not self.warmup_checks.get("state", True):
+            reasons.append("state_backend_unavailable")
+        if queue_depth > self.max_queue_depth:
+            reasons.append("upstream_saturated")
+        return not reasons, {
+            "status": "ready" if not reasons else "not_ready",
+            "reasons": reasons,
+            "warmup": self.warmup_checks,
+            "upstream": {
+                "concurrency_limit": limit,
+                "in_flight": admission.in_flight,
+                "headroom": max(0, limit - admission.in_flight),
+                "queue_depth": queue_depth,
+            },
+            "active_streams": self.active_streams,
+        }
@@ -0,0 +1,310 @@
+"""
+Admission Control
+Upstream LLM önünde token-bucket, AIMD eşzamanlılık limiti ve öncelik kuyruğu
+"""
+
+import asyncio
+import functools
+import heapq
+import itertools
+import math
+import os
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+
+class Priority(IntEnum):
+    """
+    Küçük değer = yüksek öncelik
+    """
+    INTERACTIVE = 0  # /chat, /chat/simple, /code/explain
+    BATCH = 1        # /text/*
+
+
+class AdmissionRejected(Exception):
+    """
+    İstek kabul edilmedi; istemci `retry_after` saniye sonra tekrar denemeli
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """
+    Kaba token tahmini: ~4 karakter = 1 token, artı yanıt için ayrılan max_tokens
+    """
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+# ============================================================================
+# TOKEN BUCKET
+# ============================================================================
+
+class TokenBucket:
+    """
+    Dakikalık token bütçesi (ör. OpenAI TPM limiti) için token bucket
+    """
+
+    def __init__(self, tokens_per_minute: float, capacity: Optional[float] = None):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else tokens_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, amount: float, reserve: float = 0.0) -> float:
+        """
+        Token tüket. Başarılıysa 0 döner, değilse yeterli token birikene kadar
+        beklenmesi gereken süreyi (saniye) döner. `reserve`, bucket'ta bu
+        istekten sonra kalması gereken minimum token miktarıdır.
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        needed = amount + reserve
+        if self.tokens >= needed:
+            self.tokens -= amount
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def refund(self, amount: float):
+        """
+        Kuyrukta reddedilen isteğin tükettiği token'ları geri ver
+        """
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+
+# ============================================================================
+# AIMD EŞZAMANLILIK LİMİTİ
+# ============================================================================
+
+class AIMDLimit:
+    """
+    Additive-increase / multiplicative-decrease eşzamanlılık limiti.
+
+    Gecikme hedefin altındaysa limit her "tam pencere" başarıda ~1 artar;
+    upstream 429 döndürürse veya gecikme hedefi aşarsa limit düşürülür.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 latency_target: float = 15.0, backoff: float = 0.5, latency_backoff: float = 0.9):
+        self._limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            self._limit = max(self.min_limit, self._limit * self.latency_backoff)
+        else:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def on_overload(self):
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+
+
+# ============================================================================
+# ADMISSION CONTROLLER
+# ============================================================================
+
+class Permit:
+    """
+    Kabul edilen bir upstream çağrısı için izin; iş bitince release edilmelidir
+    """
+
+    __slots__ = ("model", "priority", "loop", "released")
+
+    def __init__(self, model: str, priority: Priority, loop: asyncio.AbstractEventLoop):
+        self.model = model
+        self.priority = priority
+        self.loop = loop
+        self.released = False
+
+
+class AdmissionController:
+    """
+    Upstream LLM çağrıları için kabul kontrolü.
+
+    Sıra: (1) model bazlı token bucket, (2) AIMD eşzamanlılık limiti,
+    (3) limit doluysa öncelik kuyruğu. Kuyruk dolu ya da bekleme süresi
+    aşıldıysa istek beklemeden `AdmissionRejected` ile reddedilir.
+    Tüm durum tek bir event loop üzerinde değiştirilir, kilit gerekmez.
+
+    `state` verilirse (bkz. shared_state.py) token bucket'lar worker'lar
+    arasında paylaşılır; AIMD limiti ve kuyruk her worker'da yereldir.
+    """
+
+    def __init__(self,
+                 tokens_per_minute: Optional[float] = None,
+                 model_tokens_per_minute: Optional[Dict[str, float]] = None,
+                 limit: Optional[AIMDLimit] = None,
+                 max_queue: int = 100,
+                 max_queue_wait: Optional[Dict[Priority, float]] = None,
+                 batch_reserve: float = 0.2,
+                 state=None):
+        self.tokens_per_minute = tokens_per_minute or float(os.getenv("LLM_TOKENS_PER_MINUTE", "90000"))
+        self.model_tokens_per_minute = model_tokens_per_minute or {}
+        self.limit = limit or AIMDLimit(
+            initial=int(os.getenv("LLM_INITIAL_CONCURRENCY", "8")),
+            max_limit=int(os.getenv("LLM_MAX_CONCURRENCY", "64")),
+            latency_target=float(os.getenv("LLM_LATENCY_TARGET", "15")),
+        )
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait or {Priority.INTERACTIVE: 10.0, Priority.BATCH: 2.0}
+        self.batch_reserve = batch_reserve
+        self.state = state
+        self.in_flight = 0
+        self.avg_latency = 2.0
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._refund_tasks: set = set()
+
+    def _tokens_per_minute(self, model: str) -> float:
+        return self.model_tokens_per_minute.get(model, self.tokens_per_minute)
+
+    def _bucket(self, model: str) -> TokenBucket:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            bucket = TokenBucket(self._tokens_per_minute(model))
+            self._buckets[model] = bucket
+        return bucket
+
+    async def _consume(self, model: str, amount: float, priority: Priority) -> float:
+        tpm = self._tokens_per_minute(model)
+        # Batch istekleri bucket'ın bir kısmını interaktif trafiğe bırakır
+        reserve = tpm * self.batch_reserve if priority == Priority.BATCH else 0.0
+        if self.state is None:
+            return self._bucket(model).try_consume(amount, reserve=reserve)
+        # Paylaşılan state (SQLite kilidi / Redis round-trip) event loop'u bloklamasın
+        return await asyncio.to_thread(self.state.consume_tokens, f"tpm:{model}", amount, tpm / 60.0, tpm, reserve)
+
+    async def _refund(self, model: str, amount: float):
+        if self.state is None:
+            self._bucket(model).refund(amount)
+        else:
+            tpm = self._tokens_per_minute(model)
+            await asyncio.to_thread(self.state.consume_tokens, f"tpm:{model}", -amount, tpm / 60.0, tpm)
+
+    def _refund_later(self, model: str, amount: float):
+        """
+        İptal edilen bir acquire içinden iade: ayrı task'ta çalışır, iptal onu kesmez
+        """
+        task = asyncio.ensure_future(self._refund(model, amount))
+        self._refund_tasks.add(task)
+        task.add_done_callback(self._refund_tasks.discard)
+
+    def _refund_if_consumed(self, model: str, amount: float, consume: asyncio.Future):
+        if not consume.cancelled() and consume.exception() is None and consume.result() == 0:
+            self._refund_later(model, amount)
+
+    def _estimated_wait(self) -> float:
+        return self.avg_latency * (len(self._queue) + 1) / self.limit.limit
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, model: str, estimated_tokens: int,
+                      priority: Priority = Priority.INTERACTIVE) -> Permit:
+        consume = asyncio.ensure_future(self._consume(model, estimated_tokens, priority))
+        try:
+            wait = await asyncio.shield(consume)
+        except asyncio.CancelledError:
+            # Paylaşılan state'e yazım thread'de sürer; tükettiyse bitince iade et
+            consume.add_done_callback(functools.partial(self._refund_if_consumed, model, estimated_tokens))
+            raise
+        if wait > 0:
+            raise AdmissionRejected(f"'{model}' için token bütçesi aşıldı", wait)
+
+        loop = asyncio.get_running_loop()
+        permit = Permit(model, priority, loop)
+
+        # Boş slot var ve öncelikli bekleyen yoksa hemen kabul et
+        if self.in_flight < self.limit.limit and not self._queue:
+            self.in_flight += 1
+            return permit
+
+        if len(self._queue) >= self.max_queue:
+            await self._refund(model, estimated_tokens)
+            raise AdmissionRejected("Upstream kuyruğu dolu", self._estimated_wait())
+
+        future = loop.create_future()
+        entry = [int(priority), next(self._seq), future]
+        heapq.heappush(self._queue, entry)
+        self._wake()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_queue_wait[priority])
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Zaman aşımıyla aynı anda slot verildi; izni kullan
+                return permit
+            self._discard(entry)
+            await self._refund(model, estimated_tokens)
+            raise AdmissionRejected("Upstream kapasitesi için bekleme süresi aşıldı", self._estimated_wait())
+        except asyncio.CancelledError:
+            # İstemci bağlantıyı kapattı; slot verildiyse geri bırak
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._discard(entry)
+            # Upstream çağrısı yapılmayacak; ayrılan token bütçesi geri verilir
+            self._refund_later(model, estimated_tokens)
+            raise
+        return permit
+
+    def _discard(self, entry: list):
+        entry[2].cancel()
+        try:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+        except ValueError:
+            pass
+
+    def _wake(self):
+        while self._queue and self.in_flight < self.limit.limit:
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(True)
+
+    def release(self, permit: Permit, latency: Optional[float] = None, overloaded: bool = False):
+        """
+        İzni geri bırak ve sonucu AIMD limitine bildir
+        """
+        if permit.released:
+            return
+        permit.released = True
+        self.in_flight -= 1
+        if overloaded:
+            self.limit.on_overload()
+        elif latency is not None:
+            self.limit.on_success(latency)
+            self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+        self._wake()
+
+    def release_threadsafe(self, permit: Permit, latency: Optional[float] = None, overloaded: bool = False):
+        """
+        Threadpool'da çalışan (ör. sync streaming generator) koddan release
+        """
+        permit.loop.call_soon_threadsafe(self.release, permit, latency, overloaded)
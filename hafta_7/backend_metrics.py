@@ -0,0 +1,394 @@
+"""
+Backend Metrikleri
+FastAPI backend için Prometheus formatında düşük maliyetli metrikler
+"""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Saniye cinsinden varsayılan histogram sınırları (LLM çağrıları için geniş aralık)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+# ============================================================================
+# METRİK TİPLERİ
+# ============================================================================
+
+class _ShardedMetric(ABC):
+    """
+    Thread başına shard tutan temel metrik sınıfı.
+
+    Hot path'te kilit alınmaz: her thread yalnızca kendi shard'ına yazar.
+    Kilit sadece bir thread ilk kez yazdığında (shard kaydı) ve /metrics
+    okunurken shard listesini kopyalarken kullanılır.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot_shards(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() GIL altında atomiktir
+        return [shard.copy() for shard in shards]
+
+    @abstractmethod
+    def _add(self, current, value):
+        """
+        İki shard değerini birleştir (current ilk seferde None)
+        """
+
+    def merge_into(self, collected: Dict[LabelValues, Any], labels: LabelValues, value):
+        collected[labels] = self._add(collected.get(labels), value)
+
+    def collect(self) -> Dict[LabelValues, Any]:
+        """
+        Tüm shard'ları birleştirilmiş değerler olarak döndür
+        """
+        collected: Dict[LabelValues, Any] = {}
+        for shard in self._snapshot_shards():
+            for labels, value in shard.items():
+                self.merge_into(collected, labels, value)
+        return collected
+
+    @abstractmethod
+    def render(self, collected: Optional[Dict[LabelValues, Any]] = None) -> List[str]:
+        """
+        Prometheus text formatında örnek satırları
+        """
+
+
+class Counter(_ShardedMetric):
+    """
+    Sadece artan sayaç
+    """
+
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def _add(self, current, value):
+        return value if current is None else current + value
+
+    def render(self, collected=None) -> List[str]:
+        if collected is None:
+            collected = self.collect()
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(collected.items())
+        ]
+
+
+class Gauge(Counter):
+    """
+    Artıp azalabilen değer (ör. o an işlenen istek sayısı)
+    """
+
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+
+class Histogram(_ShardedMetric):
+    """
+    Sabit bucket'lı histogram.
+
+    Shard içinde bucket sayıları kümülatif olmayan şekilde tutulur; kümülatif
+    toplam sadece /metrics çıktısı üretilirken hesaplanır.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()):
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # [bucket_0, ..., bucket_n, +Inf, sum, count]
+            entry = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            shard[labels] = entry
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def _add(self, current, value):
+        if current is None:
+            return list(value)
+        return [a + b for a, b in zip(current, value)]
+
+    def render(self, collected=None) -> List[str]:
+        if collected is None:
+            collected = self.collect()
+        n_buckets = len(self.buckets) + 1
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, entry in sorted(collected.items()):
+            cumulative = 0
+            for i in range(n_buckets):
+                cumulative += entry[i]
+                label_str = _format_labels(self.label_names + ("le",), labels + (bounds[i],))
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{label_str} {entry[-1]}")
+        return lines
+
+
+# ============================================================================
+# YARDIMCI FONKSİYONLAR
+# ============================================================================
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+# ============================================================================
+# BACKEND METRİKLERİ
+# ============================================================================
+
+class BackendMetrics:
+    """
+    LLM backend'inin kullandığı metriklerin toplandığı kayıt defteri
+    """
+
+    def __init__(self, prefix: str = "llm_backend"):
+        self.requests = Counter(
+            f"{prefix}_http_requests_total",
+            "Route, method ve status koduna göre HTTP istek sayısı",
+            ("method", "route", "status"),
+        )
+        self.request_latency = Histogram(
+            f"{prefix}_http_request_duration_seconds",
+            "Route bazında toplam istek süresi (streaming dahil)",
+            ("method", "route"),
+        )
+        self.in_flight = Gauge(
+            f"{prefix}_http_requests_in_flight",
+            "O an işlenmekte olan HTTP istekleri",
+        )
+        self.errors = Counter(
+            f"{prefix}_http_errors_total",
+            "Route ve hata sınıfına göre başarısız istekler",
+            ("route", "error_class"),
+        )
+        self.upstream_latency = Histogram(
+            f"{prefix}_upstream_duration_seconds",
+            "Upstream LLM çağrısının toplam süresi",
+            ("model", "mode"),
+        )
+        self.time_to_first_token = Histogram(
+            f"{prefix}_time_to_first_token_seconds",
+            "Streaming yanıtlarda ilk token'a kadar geçen süre",
+            ("model",),
+        )
+        self.upstream_errors = Counter(
+            f"{prefix}_upstream_errors_total",
+            "Model ve hata sınıfına göre upstream LLM hataları",
+            ("model", "error_class"),
+        )
+        self.cache_requests = Counter(
+            f"{prefix}_cache_requests_total",
+            "Cache isabet (hit) ve ıskalama (miss) sayıları",
+            ("cache", "result"),
+        )
+        self._metrics = [
+            self.requests,
+            self.request_latency,
+            self.in_flight,
+            self.errors,
+            self.upstream_latency,
+            self.time_to_first_token,
+            self.upstream_errors,
+            self.cache_requests,
+        ]
+
+    # ---------- Hot path yardımcıları ----------
+    def observe_upstream(self, model: str, seconds: float, mode: str = "blocking"):
+        self.upstream_latency.observe(seconds, (model, mode))
+
+    def observe_ttft(self, model: str, seconds: float):
+        self.time_to_first_token.observe(seconds, (model,))
+
+    def record_upstream_error(self, model: str, exc: BaseException):
+        self.upstream_errors.inc((model, type(exc).__name__))
+
+    def record_cache(self, cache: str, hit: bool):
+        self.cache_requests.inc((cache, "hit" if hit else "miss"))
+
+    # ---------- Çıktı ----------
+    def snapshot(self) -> Dict[str, list]:
+        """
+        Diğer worker'larla paylaşmak için JSON'a çevrilebilir anlık görüntü
+        """
+        return {
+            metric.name: [[list(labels), value] for labels, value in metric.collect().items()]
+            for metric in self._metrics
+        }
+
+    def render(self, others: Iterable[Tuple[Dict[str, list], bool]] = ()) -> str:
+        """
+        Tüm metrikleri Prometheus text formatında döndür.
+        `others`: diğer worker'ların (snapshot, process_canlı_mı) listesi;
+        ölü worker'ların sayaçları korunur ama gauge değerleri atlanır.
+        """
+        others = list(others)
+        lines = []
+        for metric in self._metrics:
+            collected = metric.collect()
+            for snapshot, alive in others:
+                if metric.kind == "gauge" and not alive:
+                    continue
+                for labels, value in snapshot.get(metric.name, ()):
+                    metric.merge_into(collected, tuple(labels), value)
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(collected))
+        return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# MULTI-PROCESS (ÇOKLU WORKER)
+# ============================================================================
+
+class MultiProcessMetricsStore:
+    """
+    Her worker metrik görüntüsünü paylaşılan bir dizine (ör. /dev/shm altında)
+    kendi dosyası olarak yazar; /metrics isteğini alan worker tüm dosyaları
+    birleştirir. Hot path etkilenmez, yazma periyodik olarak yapılır.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, pid: int) -> Path:
+        return self.directory / f"metrics_{pid}.json"
+
+    def write(self, snapshot: Dict[str, list]):
+        path = self._path(os.getpid())
+        tmp = path.with_suffix(".tmp")
+        # Dizin, master başlarken temizlenmiş olabilir (ör. gunicorn on_starting)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def read_others(self) -> Iterator[Tuple[Dict[str, list], bool]]:
+        own_pid = os.getpid()
+        for path in self.directory.glob("metrics_*.json"):
+            try:
+                pid = int(path.stem.split("_", 1)[1])
+                if pid == own_pid:
+                    continue
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (ValueError, OSError):
+                continue
+            yield snapshot, _pid_alive(pid)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ============================================================================
+# ASGI MIDDLEWARE
+# ============================================================================
+
+class PrometheusMiddleware:
+    """
+    Her HTTP isteği için sayaç, süre, in-flight ve hata metriklerini kaydeder.
+
+    BaseHTTPMiddleware yerine saf ASGI middleware kullanılır; böylece
+    StreamingResponse (SSE) gövdesi tamponlanmaz ve süre, stream bitene
+    kadar ölçülür.
+    """
+
+    def __init__(self, app, metrics: BackendMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        status_code = 500
+        error_class: Optional[str] = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            error_class = type(exc).__name__
+            raise
+        finally:
+            metrics.in_flight.dec()
+            # Path yerine route şablonu kullan: /items/{id} gibi label patlamasını önler
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "__unmatched__"
+            method = scope.get("method", "")
+            metrics.requests.inc((method, route_path, str(status_code)))
+            metrics.request_latency.observe(time.perf_counter() - started, (method, route_path))
+            if error_class is None and status_code >= 400:
+                error_class = f"http_{status_code}"
+            if error_class is not None:
+                metrics.errors.inc((route_path, error_class))
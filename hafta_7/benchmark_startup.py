@@ -0,0 +1,159 @@
+"""
+Container Başlangıç Benchmark'ı
+docker-compose.yml'deki her servis için image boyutunu ve time-to-healthy süresini ölçer
+
+Kullanım:
+    python benchmark_startup.py                      # tüm servisler, 3 tekrar
+    python benchmark_startup.py backend --runs 5
+    python benchmark_startup.py --no-build --output startup_report.md
+
+Not: backend servisi `.env` dosyası (OPENAI_API_KEY) olmadan açılmaz.
+Time-to-healthy, `docker compose up` çağrısından container'ın health durumu
+`healthy` olana kadar geçen süredir; bu yüzden servislerde healthcheck
+(ve hızlı ölçüm için `start_interval`) tanımlı olmalıdır.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+COMPOSE = ["docker", "compose"]
+
+
+# ============================================================================
+# YARDIMCI FONKSİYONLAR
+# ============================================================================
+
+def run(args: List[str], check: bool = True) -> str:
+    """
+    Komutu çalıştır ve stdout'u döndür
+    """
+    result = subprocess.run(args, check=check, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def list_services() -> List[str]:
+    return run(COMPOSE + ["config", "--services"]).splitlines()
+
+
+def image_for(service: str) -> Optional[str]:
+    """
+    Servisin image ID'si (build edilmiş olmalı)
+    """
+    out = run(COMPOSE + ["images", "-q", service], check=False)
+    if out:
+        return out.splitlines()[0]
+    # Container hiç oluşturulmadıysa compose varsayılan image adını kullan
+    project = run(COMPOSE + ["config", "--format", "json"], check=False)
+    if project:
+        name = json.loads(project).get("name")
+        if name:
+            return f"{name}-{service}"
+    return None
+
+
+def image_size_mb(image: str) -> Optional[float]:
+    out = run(["docker", "image", "inspect", "-f", "{{.Size}}", image], check=False)
+    return int(out) / 1e6 if out.isdigit() else None
+
+
+def health_status(container_id: str) -> str:
+    return run(
+        ["docker", "inspect", "-f", "{{if .State.Health}}{{.State.Health.Status}}{{else}}none{{end}}", container_id],
+        check=False,
+    )
+
+
+def time_to_healthy(service: str, timeout: float = 180.0, poll: float = 0.2) -> Optional[float]:
+    """
+    Servisi (bağımlılıkları olmadan) başlat ve healthy olana kadar geçen süreyi ölç
+    """
+    run(COMPOSE + ["rm", "-sf", service], check=False)
+    started = time.perf_counter()
+    run(COMPOSE + ["up", "-d", "--no-deps", "--no-build", service])
+    container_id = run(COMPOSE + ["ps", "-q", service])
+    try:
+        while time.perf_counter() - started < timeout:
+            status = health_status(container_id)
+            if status == "healthy":
+                return time.perf_counter() - started
+            if status in ("none", "unhealthy", ""):
+                print(f"  ⚠️  {service}: health durumu '{status}'", file=sys.stderr)
+                return None
+            time.sleep(poll)
+        print(f"  ⚠️  {service}: {timeout:.0f}s içinde healthy olmadı", file=sys.stderr)
+        return None
+    finally:
+        run(COMPOSE + ["rm", "-sf", service], check=False)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(services: List[str], runs: int, build: bool) -> List[dict]:
+    results = []
+    for service in services:
+        if build:
+            print(f"🔨 {service} build ediliyor...")
+            run(COMPOSE + ["build", service])
+        image = image_for(service)
+        size = image_size_mb(image) if image else None
+        timings = []
+        for i in range(runs):
+            elapsed = time_to_healthy(service)
+            if elapsed is not None:
+                timings.append(elapsed)
+                print(f"  {service} #{i + 1}: {elapsed:.2f}s")
+        results.append({
+            "service": service,
+            "image_mb": size,
+            "median_s": statistics.median(timings) if timings else None,
+            "min_s": min(timings) if timings else None,
+            "runs": len(timings),
+        })
+    return results
+
+
+def _fmt(value, spec: str) -> str:
+    return format(value, spec) if value is not None else "-"
+
+
+def format_report(results: List[dict]) -> str:
+    lines = [
+        "| Servis | Image boyutu (MB) | Time-to-healthy medyan (s) | En iyi (s) | Başarılı ölçüm |",
+        "|--------|------------------:|---------------------------:|-----------:|---------------:|",
+    ]
+    for r in results:
+        lines.append(
+            f"| {r['service']} | {_fmt(r['image_mb'], '.1f')} | {_fmt(r['median_s'], '.2f')} "
+            f"| {_fmt(r['min_s'], '.2f')} | {r['runs']} |"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="docker-compose servisleri için başlangıç benchmark'ı")
+    parser.add_argument("services", nargs="*", help="Ölçülecek servisler (varsayılan: hepsi)")
+    parser.add_argument("--runs", type=int, default=3, help="Servis başına tekrar sayısı")
+    parser.add_argument("--no-build", action="store_true", help="Image'ları yeniden build etme")
+    parser.add_argument("--output", help="Markdown raporunu bu dosyaya da yaz")
+    args = parser.parse_args()
+
+    services = args.services or list_services()
+    results = benchmark(services, args.runs, build=not args.no_build)
+    report = format_report(results)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"\n📄 Rapor yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
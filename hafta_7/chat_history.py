@@ -0,0 +1,152 @@
+"""
+Konuşma Geçmişi Yönetimi
+Token bütçeli kayan pencere + çıkarılan turların kümülatif özeti
+
+Her turda tüm geçmişi modele göndermek yerine:
+- Son mesajlar token bütçesine sığdığı kadar olduğu gibi gönderilir
+- Pencereden düşen mesajlar tek bir özet mesajına katlanır
+- Özet artımlı güncellenir ve oturum (session) başına önbellekte tutulur;
+  böylece istek başına prompt boyutu konuşma uzadıkça büyümez
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+Message = Dict[str, str]
+
+# (önceki_özet, yeni_çıkarılan_mesajlar) -> yeni_özet
+Summarizer = Callable[[str, List[Message]], str]
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken opsiyonel
+    _ENCODING = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token sayısı; tiktoken yoksa ~4 karakter = 1 token yaklaşımı
+    """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def normalize_history(history) -> List[Message]:
+    """
+    Gradio geçmişini (messages formatı veya eski tuple formatı) OpenAI mesajlarına çevir
+    """
+    messages = []
+    for msg in history or []:
+        if isinstance(msg, dict) and "role" in msg and "content" in msg:
+            if isinstance(msg["content"], str):
+                messages.append({"role": msg["role"], "content": msg["content"]})
+        elif isinstance(msg, (list, tuple)) and len(msg) == 2:
+            if msg[0]:
+                messages.append({"role": "user", "content": msg[0]})
+            if msg[1]:
+                messages.append({"role": "assistant", "content": msg[1]})
+    return messages
+
+
+class _SessionState:
+    __slots__ = ("summary", "summarized", "token_counts", "contents")
+
+    def __init__(self):
+        self.summary = ""
+        # Geçmişin baştan kaç mesajı özete katlandı
+        self.summarized = 0
+        # Mesaj başına token sayısı ve sayıldığı içerik (eşleşen önek tekrar sayılmaz)
+        self.token_counts: List[int] = []
+        self.contents: List[str] = []
+
+
+class ConversationMemory:
+    """
+    Oturum başına sınırlı konuşma belleği.
+
+    Pencere `max_history_tokens`'ı aşınca en eski mesajlar `low_watermark`
+    oranına inene kadar özete katlanır; bu histerezis sayesinde özet çağrısı
+    her turda değil, birkaç turda bir yapılır.
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None, max_history_tokens: int = 1500,
+                 low_watermark: float = 0.6, max_sessions: int = 256):
+        self.summarizer = summarizer
+        self.max_history_tokens = max_history_tokens
+        self.low_watermark = low_watermark
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, session_id: str) -> _SessionState:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = _SessionState()
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return state
+
+    def reset(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _count(self, state: _SessionState, history: List[Message]) -> List[int]:
+        counts, contents = state.token_counts, state.contents
+        # Gradio'da düzenle / yeniden dene geçmişi aynı uzunlukta bırakıp içeriği
+        # değiştirebilir: sayımlar sadece içeriği aynı kalan önek için kullanılır
+        same = 0
+        limit = min(len(contents), len(history))
+        while same < limit and contents[same] == history[same]["content"]:
+            same += 1
+        if same < state.summarized:
+            # Özete katlanmış bir mesaj değişmiş veya geçmiş temizlenmiş: oturumu sıfırla
+            state.summary, state.summarized = "", 0
+        del counts[same:]
+        del contents[same:]
+        for msg in history[same:]:
+            counts.append(count_tokens(msg["content"]) + 4)
+            contents.append(msg["content"])
+        return counts
+
+    def build_messages(self, system_prompt: str, history, message: str,
+                       session_id: str = "default") -> List[Message]:
+        """
+        System prompt + (varsa) özet + token bütçesindeki son mesajlar + yeni mesaj
+        """
+        history = normalize_history(history)
+        state = self._state(session_id)
+        counts = self._count(state, history)
+
+        window_tokens = sum(counts[state.summarized:])
+        if window_tokens > self.max_history_tokens:
+            # Pencere alt eşiğe inene kadar en eski mesajları çıkar
+            target = self.max_history_tokens * self.low_watermark
+            start = state.summarized
+            while start < len(history) and window_tokens > target:
+                window_tokens -= counts[start]
+                start += 1
+            self._fold(state, history[state.summarized:start])
+            state.summarized = start
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if state.summary:
+            messages.append({"role": "system", "content": f"Önceki konuşmanın özeti: {state.summary}"})
+        messages.extend(history[state.summarized:])
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _fold(self, state: _SessionState, evicted: List[Message]):
+        if not evicted or self.summarizer is None:
+            return
+        try:
+            state.summary = self.summarizer(state.summary, evicted)
+        except Exception:
+            # Özet alınamazsa eski özet korunur; sohbet yine de devam eder
+            pass
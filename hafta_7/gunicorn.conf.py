@@ -0,0 +1,45 @@
+"""
+Gunicorn yapılandırması - LLM Backend API (production modu)
+
+Kullanım:
+    gunicorn -c gunicorn.conf.py 3_fastapi_backend:app
+    # veya
+    python 3_fastapi_backend.py --prod --workers 4
+"""
+
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Uygulama master'da bir kez import edilir; worker'lar fork ile
+# copy-on-write paylaşır (daha hızlı başlangıç, daha az bellek)
+preload_app = True
+reload = False
+
+# SSE streaming yanıtları uzun sürebilir
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+# SIGTERM'de worker'lar önce readiness'i düşürür, sonra SSE stream'lerini boşaltır
+# (bkz. backend_lifecycle.py); gunicorn bu sürenin sonunda worker'ı öldürmeden önce beklemeli
+_drain_budget = float(os.getenv("DRAIN_READINESS_DELAY", "5")) + float(os.getenv("DRAIN_TIMEOUT", "20")) + 5
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", str(int(_drain_budget))))
+keepalive = 5
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+# Çoklu worker'da paylaşılan durum (master'dan worker'lara miras kalır)
+if workers > 1:
+    os.environ.setdefault("STATE_BACKEND_URL", "sqlite:////dev/shm/llm_backend_state.db")
+    os.environ.setdefault("METRICS_MULTIPROC_DIR", "/dev/shm/llm_backend_metrics")
+
+
+def on_starting(server):
+    # Önceki çalıştırmadan kalan metrik dosyalarını temizle
+    metrics_dir = os.getenv("METRICS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
@@ -0,0 +1,69 @@
+"""
+Lazy Import
+Ağır bağımlılıkları ilk kullanıldıkları ana kadar yüklemeyen modül vekili
+
+Örnek:
+    gr = lazy_import("gradio")      # burada gradio import edilmez
+    ...
+    with gr.Blocks() as demo:       # ilk attribute erişiminde import edilir
+
+Modül gerçekten yüklendikten sonra vekil, attribute'ları kendi __dict__'ine
+kopyalar; sonraki erişimler normal modül erişimi kadar hızlıdır. Paket kurulu
+değilse ImportError import satırında değil, ilk kullanımda yükselir.
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    İlk attribute erişiminde gerçek modülü import eden vekil
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_loaded"] = False
+
+    def _load(self) -> types.ModuleType:
+        with _lock:
+            module = importlib.import_module(self.__name__)
+            if not self.__dict__["_lazy_loaded"]:
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_loaded"] = True
+            return module
+
+    def __getattr__(self, attr: str):
+        # Sadece henüz __dict__'te olmayan attribute'lar için çağrılır
+        if attr.startswith("__") and attr.endswith("__") and not self.__dict__["_lazy_loaded"]:
+            # copy/pickle/inspect gibi araçların dunder sorguları import tetiklemesin
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "yüklendi" if self.__dict__["_lazy_loaded"] else "henüz yüklenmedi"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str):
+    """
+    Modül zaten yüklüyse kendisini, değilse ilk kullanımda yüklenen vekilini döndür
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """
+    Modül bu süreçte gerçekten import edildi mi?
+    """
+    return name in sys.modules
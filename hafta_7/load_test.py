@@ -0,0 +1,311 @@
+"""
+Backend Yük Testi
+3_fastapi_backend.py endpoint'lerini artan eşzamanlılıkta çalıştırıp RPS,
+gecikme yüzdelikleri ve (SSE için) time-to-first-token raporlar
+
+Kullanım:
+    # Mock LLM sunucusu + backend'i kendisi başlatır, ağ erişimi gerekmez
+    python load_test.py --spawn
+
+    # Zaten çalışan bir backend'e karşı
+    python load_test.py --base-url http://localhost:8000 --scenarios chat_stream --concurrency 1,8,32
+
+    python load_test.py --spawn --duration 20 --output load_report.md
+
+Her eşzamanlılık seviyesinde N sanal kullanıcı, süre dolana kadar yanıtı
+bekleyip hemen yeni istek gönderir (closed loop). RPS sadece başarılı
+istekleri sayar; 429'lar ve diğer hatalar ayrı sütunlarda raporlanır.
+Prompt'lar her istekte benzersizdir; response cache'i ölçmek için
+--repeat-prompt kullanın.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = ("health", "chat_simple", "chat", "chat_stream", "summarize")
+DEFAULT_SCENARIOS = ("chat_simple", "chat", "chat_stream")
+
+_counter = itertools.count()
+
+
+# ============================================================================
+# SENARYOLAR
+# ============================================================================
+
+def _prompt(repeat: bool) -> str:
+    if repeat:
+        return "Yük testi mesajı"
+    return f"Yük testi mesajı #{next(_counter)}"
+
+
+async def _run_request(client: httpx.AsyncClient, scenario: str, repeat: bool, max_tokens: int) -> Dict:
+    """
+    Tek bir isteği çalıştır: {"status", "latency", "ttft"} döndür
+    """
+    started = time.perf_counter()
+    ttft = None
+    if scenario == "health":
+        response = await client.get("/health")
+    elif scenario == "chat_simple":
+        response = await client.post("/chat/simple", params={"message": _prompt(repeat)})
+    elif scenario == "summarize":
+        response = await client.post("/text/summarize", params={"text": _prompt(repeat) * 20})
+    elif scenario == "chat":
+        response = await client.post("/chat", json={
+            "messages": [{"role": "user", "content": _prompt(repeat)}],
+            "max_tokens": max_tokens,
+        })
+    elif scenario == "chat_stream":
+        payload = {
+            "messages": [{"role": "user", "content": _prompt(repeat)}],
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        async with client.stream("POST", "/chat", json=payload,
+                                 headers={"Accept": "text/event-stream"}) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return {"status": response.status_code, "latency": time.perf_counter() - started}
+            completed = False
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    completed = True
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    # Backend stream içi hatayı 200 + error event olarak gönderir
+                    return {"status": "stream_error", "latency": time.perf_counter() - started}
+                if ttft is None and event.get("content"):
+                    ttft = time.perf_counter() - started
+            if not completed:
+                return {"status": "stream_error", "latency": time.perf_counter() - started}
+        return {"status": 200, "latency": time.perf_counter() - started, "ttft": ttft}
+    else:
+        raise ValueError(f"Bilinmeyen senaryo: {scenario}")
+    return {"status": response.status_code, "latency": time.perf_counter() - started}
+
+
+async def _user(client: httpx.AsyncClient, scenario: str, deadline: float, results: List[Dict],
+                repeat: bool, max_tokens: int):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            results.append(await _run_request(client, scenario, repeat, max_tokens))
+        except httpx.HTTPError as e:
+            results.append({"status": type(e).__name__, "latency": time.perf_counter() - started})
+
+
+async def run_level(base_url: str, scenario: str, concurrency: int, duration: float,
+                    repeat: bool, max_tokens: int, timeout: float) -> Dict:
+    """
+    Bir senaryoyu verilen eşzamanlılıkta `duration` saniye çalıştır ve özetle
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits,
+                                 timeout=httpx.Timeout(timeout, connect=5.0)) as client:
+        results: List[Dict] = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            _user(client, scenario, deadline, results, repeat, max_tokens) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return summarize(scenario, concurrency, elapsed, results)
+
+
+# ============================================================================
+# İSTATİSTİK
+# ============================================================================
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """
+    Nearest-rank yüzdelik (p: 0-100)
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(scenario: str, concurrency: int, elapsed: float, results: List[Dict]) -> Dict:
+    ok = [r for r in results if r["status"] == 200]
+    latencies = [r["latency"] for r in ok]
+    ttfts = [r["ttft"] for r in ok if r.get("ttft") is not None]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["status"] not in (200, 429):
+            errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "ok": len(ok),
+        "rate_limited": sum(1 for r in results if r["status"] == 429),
+        "errors": errors,
+        "rps": len(ok) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p99": percentile(ttfts, 99),
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:.0f}" if value is not None else "-"
+
+
+def format_report(results: List[Dict], header: str) -> str:
+    lines = [
+        header,
+        "",
+        "| Senaryo | Eşzamanlılık | İstek | RPS | p50 (ms) | p99 (ms) | TTFT p50 (ms) | TTFT p99 (ms) | 429 | Hata |",
+        "|---------|-------------:|------:|----:|---------:|---------:|--------------:|--------------:|----:|------|",
+    ]
+    for r in results:
+        errors = ", ".join(f"{k}: {v}" for k, v in sorted(r["errors"].items())) or "-"
+        lines.append(
+            f"| {r['scenario']} | {r['concurrency']} | {r['requests']} | {r['rps']:.1f} "
+            f"| {_ms(r['p50'])} | {_ms(r['p99'])} | {_ms(r['ttft_p50'])} | {_ms(r['ttft_p99'])} "
+            f"| {r['rate_limited']} | {errors} |"
+        )
+    return "\n".join(lines)
+
+
+# ============================================================================
+# MOCK + BACKEND BAŞLATMA
+# ============================================================================
+
+def _wait_healthy(url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} başlatılamadı (exit code {proc.returncode})")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} {timeout:.0f}s içinde hazır olmadı")
+
+
+def spawn_stack(backend_port: int, mock_port: int, mock_args: List[str]) -> List[subprocess.Popen]:
+    """
+    Mock LLM sunucusunu ve ona yönlendirilmiş backend'i alt süreç olarak başlat
+    """
+    env = dict(os.environ)
+    env["OPENAI_BASE_URL"] = f"http://127.0.0.1:{mock_port}/v1"
+    env["OPENAI_API_KEY"] = "sk-mock"
+    mock = subprocess.Popen(
+        [sys.executable, "mock_llm_server.py", "--port", str(mock_port), *mock_args],
+        cwd=HERE, env=env
+    )
+    procs = [mock]
+    try:
+        _wait_healthy(f"http://127.0.0.1:{mock_port}/health", mock)
+        backend = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "3_fastapi_backend:app", "--host", "127.0.0.1",
+             "--port", str(backend_port), "--log-level", "warning", "--no-access-log"],
+            cwd=HERE, env=env
+        )
+        procs.append(backend)
+        _wait_healthy(f"http://127.0.0.1:{backend_port}/health", backend)
+    except BaseException:
+        stop_stack(procs)
+        raise
+    return procs
+
+
+def stop_stack(procs: List[subprocess.Popen]):
+    for proc in reversed(procs):
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# ============================================================================
+# ANA AKIŞ
+# ============================================================================
+
+async def run_all(args) -> List[Dict]:
+    results = []
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            if args.warmup:
+                await run_level(args.base_url, scenario, concurrency, args.warmup,
+                                args.repeat_prompt, args.max_tokens, args.timeout)
+            result = await run_level(args.base_url, scenario, concurrency, args.duration,
+                                     args.repeat_prompt, args.max_tokens, args.timeout)
+            print(f"  {scenario:<12} c={concurrency:<4} {result['rps']:7.1f} RPS  "
+                  f"p99 {_ms(result['p99'])} ms  TTFT p99 {_ms(result['ttft_p99'])} ms")
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FastAPI backend yük testi")
+    parser.add_argument("--base-url", default=os.getenv("API_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(DEFAULT_SCENARIOS),
+                        help=f"Virgülle ayrılmış senaryolar: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 4, 16, 64],
+                        help="Virgülle ayrılmış eşzamanlılık seviyeleri")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seviye başına ölçüm süresi (s)")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seviye başına ısınma süresi (s, ölçülmez)")
+    parser.add_argument("--max-tokens", type=int, default=60, help="/chat isteklerinde max_tokens")
+    parser.add_argument("--timeout", type=float, default=60.0, help="İstek başına read timeout (s)")
+    parser.add_argument("--repeat-prompt", action="store_true", help="Aynı prompt'u tekrar gönder (cache testi)")
+    parser.add_argument("--spawn", action="store_true", help="Mock LLM sunucusu + backend'i kendin başlat")
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--mock-args", default="", help="mock_llm_server.py'ye iletilecek argümanlar")
+    parser.add_argument("--output", help="Markdown raporunu bu dosyaya da yaz")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Bilinmeyen senaryo: {', '.join(sorted(unknown))}")
+
+    procs = []
+    if args.spawn:
+        port = httpx.URL(args.base_url).port or 8000
+        args.base_url = f"http://127.0.0.1:{port}"
+        print(f"🚀 Mock LLM (:{args.mock_port}) ve backend (:{port}) başlatılıyor...")
+        procs = spawn_stack(port, args.mock_port, args.mock_args.split())
+
+    try:
+        results = asyncio.run(run_all(args))
+    finally:
+        stop_stack(procs)
+
+    header = (
+        f"Python {platform.python_version()} · {platform.system()} {platform.machine()} · "
+        f"{args.duration:.0f}s/seviye · hedef: {('mock LLM ' + args.mock_args).strip() if args.spawn else args.base_url}"
+    )
+    report = format_report(results, header)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"\n📄 Rapor yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Streaming Markdown Render
+Streamlit'te token token gelen yanıtı O(n²) yeniden render etmeden gösterme
+"""
+
+import time
+
+
+class IncrementalMarkdownRenderer:
+    """
+    Streaming yanıtı her token'da değil, kare aralığında (varsayılan 50 ms)
+    ekrana basar.
+
+    Kod bloğu dışında tamamlanan paragraflar bir kez yazılıp dondurulur;
+    her karede sadece son (açık) paragraf yeniden render edilir. Böylece
+    uzun yanıtlarda token başına maliyet yanıt uzunluğuyla büyümez.
+    """
+
+    def __init__(self, placeholder, frame_interval=0.05, cursor="▌"):
+        self.frame_interval = frame_interval
+        self.cursor = cursor
+        self._container = placeholder.container()
+        self._tail = self._container.empty()
+        self._parts = []
+        self._tail_parts = []
+        self._last_frame = 0.0
+
+    def append(self, delta):
+        self._parts.append(delta)
+        self._tail_parts.append(delta)
+        now = time.monotonic()
+        if now - self._last_frame >= self.frame_interval:
+            self._render_frame()
+            self._last_frame = now
+
+    def _render_frame(self):
+        tail = "".join(self._tail_parts)
+        blocks = tail.split("\n\n")
+        # Açık bir ``` bloğunun ortasından bölmemek için son güvenli sınırı bul
+        fences = 0
+        cut = 0
+        for i, block in enumerate(blocks[:-1]):
+            fences += block.count("```")
+            if fences % 2 == 0:
+                cut = i + 1
+        if cut:
+            self._tail.markdown("\n\n".join(blocks[:cut]))
+            self._tail = self._container.empty()
+            tail = "\n\n".join(blocks[cut:])
+            self._tail_parts = [tail]
+        self._tail.markdown(tail + self.cursor)
+
+    def finish(self):
+        """
+        Son kareyi imleçsiz çiz ve tam yanıtı döndür
+        """
+        self._tail.markdown("".join(self._tail_parts))
+        return "".join(self._parts)
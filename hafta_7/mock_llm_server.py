@@ -0,0 +1,244 @@
+"""
+Mock LLM Sunucusu
+Ağ erişimi ve API anahtarı olmadan backend'i test etmek için OpenAI uyumlu sahte sunucu
+
+- POST /v1/chat/completions (normal ve `stream=true` SSE)
+- GET  /v1/models
+- Ayarlanabilir ilk token gecikmesi, jitter, token hızı ve hata enjeksiyonu
+- GET/POST /mock/config ile ayarlar çalışırken değiştirilebilir
+
+Kullanım:
+    python mock_llm_server.py --port 9100 --latency-ms 300 --tokens-per-sec 50
+    python mock_llm_server.py --error-rate 0.02 --rate-limit-rate 0.05 --max-concurrency 32
+
+Backend'i bu sunucuya yönlendirmek için (OpenAI SDK bu değişkeni okur):
+    OPENAI_BASE_URL=http://localhost:9100/v1 OPENAI_API_KEY=sk-mock python 3_fastapi_backend.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+
+# ============================================================================
+# AYARLAR
+# ============================================================================
+
+class MockConfig(BaseModel):
+    latency_ms: float = Field(default=float(os.getenv("MOCK_LATENCY_MS", "200")), ge=0,
+                              description="İlk token'a kadar geçen süre (ms)")
+    jitter_ms: float = Field(default=float(os.getenv("MOCK_JITTER_MS", "50")), ge=0,
+                             description="Gecikmeye eklenen rastgele sapma (±ms)")
+    tokens_per_sec: float = Field(default=float(os.getenv("MOCK_TOKENS_PER_SEC", "50")), gt=0,
+                                  description="Üretim hızı (token/saniye)")
+    completion_tokens: int = Field(default=int(os.getenv("MOCK_COMPLETION_TOKENS", "60")), ge=1,
+                                   description="Yanıt uzunluğu (max_tokens'tan küçükse bu kullanılır)")
+    error_rate: float = Field(default=float(os.getenv("MOCK_ERROR_RATE", "0")), ge=0, le=1,
+                              description="500 döndürülecek istek oranı")
+    rate_limit_rate: float = Field(default=float(os.getenv("MOCK_RATE_LIMIT_RATE", "0")), ge=0, le=1,
+                                   description="429 döndürülecek istek oranı")
+    stream_error_rate: float = Field(default=float(os.getenv("MOCK_STREAM_ERROR_RATE", "0")), ge=0, le=1,
+                                     description="Stream'in ortasında kopacak istek oranı")
+    max_concurrency: int = Field(default=int(os.getenv("MOCK_MAX_CONCURRENCY", "0")), ge=0,
+                                 description="Aşılınca 429 döndürülen eşzamanlı istek sınırı (0 = sınırsız)")
+
+
+config = MockConfig()
+
+app = FastAPI(title="Mock LLM Server", description="OpenAI uyumlu sahte LLM sunucusu")
+
+# Aynı event loop'ta çalıştığı için kilit gerekmez
+_stats = {"in_flight": 0, "requests": 0, "errors": 0, "rate_limited": 0}
+
+_WORDS = ("merhaba", "dünya", "bu", "bir", "test", "yanıtı", "ve", "model", "çıktısı", "örnek",
+          "metin", "için", "token", "akış", "backend", "sunucu")
+
+
+# ============================================================================
+# YARDIMCI FONKSİYONLAR
+# ============================================================================
+
+def _openai_error(status_code: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None):
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+        headers=headers,
+    )
+
+
+def _first_token_delay() -> float:
+    jitter = random.uniform(-config.jitter_ms, config.jitter_ms)
+    return max(0.0, config.latency_ms + jitter) / 1000
+
+
+def _tokens(count: int) -> List[str]:
+    # Her kelime ~1 token; ilk kelime hariç başta boşluk (OpenAI delta'larına benzer)
+    return [(" " if i else "") + random.choice(_WORDS) for i in range(count)]
+
+
+def _prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1
+
+
+def _inject_error() -> Optional[JSONResponse]:
+    """
+    Ayarlanan oranlarda 429 / 500 üret; eşzamanlılık sınırı aşıldıysa 429
+    """
+    if config.max_concurrency and _stats["in_flight"] > config.max_concurrency:
+        _stats["rate_limited"] += 1
+        return _openai_error(429, "Mock: eşzamanlılık sınırı aşıldı", "rate_limit_error", {"retry-after": "1"})
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        _stats["rate_limited"] += 1
+        return _openai_error(429, "Mock: rate limit", "rate_limit_error", {"retry-after": "1"})
+    if roll < config.rate_limit_rate + config.error_rate:
+        _stats["errors"] += 1
+        return _openai_error(500, "Mock: sunucu hatası", "server_error")
+    return None
+
+
+def _chunk(completion_id: str, model: str, created: int, delta: Dict[str, str],
+           finish_reason: Optional[str] = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def _stream(completion_id: str, model: str, tokens: List[str]):
+    created = int(time.time())
+    interval = 1.0 / config.tokens_per_sec
+    break_at = random.randrange(len(tokens)) if random.random() < config.stream_error_rate else None
+    try:
+        await asyncio.sleep(_first_token_delay())
+        yield _chunk(completion_id, model, created, {"role": "assistant", "content": ""})
+        next_at = time.perf_counter()
+        for i, token in enumerate(tokens):
+            if i == break_at:
+                _stats["errors"] += 1
+                # Bağlantıyı yarıda kes: istemci eksik stream görür
+                raise ConnectionResetError("Mock: stream yarıda kesildi")
+            yield _chunk(completion_id, model, created, {"content": token})
+            # Birikimli zamanlama: sleep sapmaları token hızını düşürmez
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield _chunk(completion_id, model, created, {}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+    finally:
+        _stats["in_flight"] -= 1
+
+
+# ============================================================================
+# ENDPOINT'LER
+# ============================================================================
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    _stats["requests"] += 1
+    _stats["in_flight"] += 1
+
+    error = _inject_error()
+    if error is not None:
+        _stats["in_flight"] -= 1
+        return error
+
+    model = body.get("model", "mock-model")
+    count = min(config.completion_tokens, int(body.get("max_tokens") or config.completion_tokens))
+    tokens = _tokens(count)
+    completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(completion_id, model, tokens), media_type="text/event-stream")
+
+    try:
+        # Normal yanıt: ilk token gecikmesi + tüm token'ların üretim süresi
+        await asyncio.sleep(_first_token_delay() + count / config.tokens_per_sec)
+    finally:
+        _stats["in_flight"] -= 1
+    prompt_tokens = _prompt_tokens(body.get("messages", []))
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "".join(tokens)},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": count,
+            "total_tokens": prompt_tokens + count,
+        },
+    }
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {
+        "object": "list",
+        "data": [{"id": m, "object": "model", "created": 0, "owned_by": "mock"}
+                 for m in ("gpt-3.5-turbo", "gpt-4o-mini", "gpt-4")],
+    }
+
+
+@app.get("/mock/config")
+async def get_config():
+    return {"config": config.model_dump(), "stats": dict(_stats)}
+
+
+@app.post("/mock/config")
+async def update_config(update: Dict[str, Any]):
+    """
+    Ayarları kısmen güncelle (örn. test ortasında hata oranını artırmak için)
+    """
+    global config
+    config = MockConfig(**{**config.model_dump(), **update})
+    return {"config": config.model_dump()}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy", "in_flight": _stats["in_flight"]}
+
+
+# ============================================================================
+# UYGULAMA ÇALIŞTIRMA
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI uyumlu mock LLM sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_PORT", "9100")))
+    for name, field in MockConfig.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(field.default), help=field.description)
+    args = parser.parse_args()
+
+    global config
+    overrides = {name: getattr(args, name) for name in MockConfig.model_fields if getattr(args, name) is not None}
+    config = MockConfig(**{**config.model_dump(), **overrides})
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Başlangıç (Import) Profili
+Her giriş noktasını ayrı bir Python sürecinde `python -X importtime` ile çalıştırıp
+toplam import süresini ve en pahalı paketleri raporlar
+
+Kullanım:
+    python profile_startup.py                 # tüm giriş noktaları, 5 tekrar
+    python profile_startup.py --runs 10 --top 8
+    python profile_startup.py --output STARTUP_BENCHMARK.md
+
+Ölçülen süre, modülün import edilip ilgili arayüzün kurulmasına kadar geçen
+süredir (sunucu başlatılmaz). Eksik paketi olan giriş noktaları atlanır.
+"""
+
+import argparse
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (ad, çalıştırılacak kod); kod import + arayüz kurulumu yapar, sunucu başlatmaz
+ENTRY_POINTS: List[Tuple[str, str]] = [
+    ("3_fastapi_backend (app)",
+     "import importlib; importlib.import_module('3_fastapi_backend').app"),
+    ("4_fastapi_integration gradio modu",
+     "import importlib; importlib.import_module('4_fastapi_integration').create_gradio_integration()"),
+    ("4_fastapi_integration streamlit modu",
+     "import streamlit, importlib; importlib.import_module('4_fastapi_integration')"),
+    ("1_gradio_frontend",
+     "import importlib; importlib.import_module('1_gradio_frontend').create_gradio_interface()"),
+]
+
+# Import edilip edilmediği raporlanacak ağır paketler
+WATCHED = ["gradio", "streamlit", "uvicorn", "requests", "httpx", "pdfplumber", "PyPDF2", "plotly", "pandas"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    importtime çıktısından üst seviye paketlerin kümülatif sürelerini (µs) çıkar
+    """
+    totals: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m and m.group(3) == " ":
+            # Tek boşluk girintisi = doğrudan import edilen (üst seviye) modül
+            name = m.group(4).split(".")[0]
+            totals[name] = totals.get(name, 0) + int(m.group(2))
+    return totals
+
+
+def profile_once(code: str) -> Optional[Tuple[float, Dict[str, int], List[str]]]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-profile-placeholder")
+    env["PYTHONPATH"] = HERE + os.pathsep + env.get("PYTHONPATH", "")
+    probe = f"{code}\nimport sys\nprint(','.join(m for m in {WATCHED!r} if m in sys.modules))"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=HERE, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        last = result.stderr.strip().splitlines()[-1:] or ["?"]
+        print(f"  ⚠️  atlandı: {last[0]}", file=sys.stderr)
+        return None
+    loaded = [m for m in result.stdout.strip().splitlines()[-1].split(",") if m]
+    return wall, parse_importtime(result.stderr), loaded
+
+
+def profile(runs: int) -> List[dict]:
+    results = []
+    for name, code in ENTRY_POINTS:
+        print(f"⏱  {name}")
+        samples = [profile_once(code) for _ in range(runs)]
+        samples = [s for s in samples if s is not None]
+        if not samples:
+            results.append({"name": name, "skipped": True})
+            continue
+        walls = [s[0] for s in samples]
+        import_totals = [sum(s[1].values()) / 1e6 for s in samples]
+        # Paket sürelerinin medyanı
+        packages: Dict[str, List[int]] = {}
+        for _, totals, _ in samples:
+            for pkg, us in totals.items():
+                packages.setdefault(pkg, []).append(us)
+        results.append({
+            "name": name,
+            "skipped": False,
+            "wall_s": statistics.median(walls),
+            "import_s": statistics.median(import_totals),
+            "packages": {pkg: statistics.median(v) / 1e6 for pkg, v in packages.items()},
+            "loaded": samples[-1][2],
+        })
+    return results
+
+
+def format_report(results: List[dict], top: int) -> str:
+    lines = [
+        f"Python {platform.python_version()} · {platform.system()} {platform.machine()} · "
+        f"medyan değerler",
+        "",
+        "| Giriş noktası | Süreç süresi (s) | Import süresi (s) | Yüklenen ağır paketler |",
+        "|---------------|-----------------:|------------------:|------------------------|",
+    ]
+    for r in results:
+        if r["skipped"]:
+            lines.append(f"| {r['name']} | - | - | (eksik paket, atlandı) |")
+            continue
+        lines.append(
+            f"| {r['name']} | {r['wall_s']:.2f} | {r['import_s']:.2f} | {', '.join(r['loaded']) or '-'} |"
+        )
+    for r in results:
+        if r["skipped"]:
+            continue
+        lines += ["", f"**{r['name']}** - en pahalı {top} paket (s):", ""]
+        ranked = sorted(r["packages"].items(), key=lambda kv: kv[1], reverse=True)[:top]
+        lines.append(", ".join(f"`{pkg}` {sec:.3f}" for pkg, sec in ranked))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş noktaları için python -X importtime profili")
+    parser.add_argument("--runs", type=int, default=5, help="Giriş noktası başına tekrar sayısı")
+    parser.add_argument("--top", type=int, default=6, help="Raporlanacak en pahalı paket sayısı")
+    parser.add_argument("--output", help="Markdown raporunu bu dosyaya da yaz")
+    args = parser.parse_args()
+
+    report = format_report(profile(args.runs), args.top)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"\n📄 Rapor yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
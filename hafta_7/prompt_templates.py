@@ -0,0 +1,234 @@
+"""
+Prompt Şablonları
+Backend endpoint'leri için bir kez doğrulanan prompt şablonları ve mesaj oluşturucu
+
+Mikro benchmark:
+    python prompt_templates.py
+"""
+
+from string import Formatter
+from typing import Dict, FrozenSet, List, Optional
+
+Message = Dict[str, str]
+
+
+class PromptTemplateError(ValueError):
+    """
+    Şablon derleme veya eksik değişken hatası
+    """
+
+
+# ============================================================================
+# ŞABLON
+# ============================================================================
+
+class PromptTemplate:
+    """
+    `str.format` sözdizimli şablon; alanları oluşturulurken bir kez doğrulanır.
+
+    Değişkensiz şablonlar sabit string olarak tutulur; render çağrısı yeni
+    bir nesne oluşturmaz.
+    """
+
+    __slots__ = ("source", "variables", "_constant")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.variables: FrozenSet[str] = _parse_variables(source)
+        self._constant: Optional[str] = None if self.variables else source.format()
+
+    def render(self, values: Dict[str, str]) -> str:
+        if self._constant is not None:
+            return self._constant
+        try:
+            return self.source.format_map(values)
+        except KeyError as e:
+            raise PromptTemplateError(f"Eksik şablon değişkeni: {e.args[0]}") from None
+
+
+def _parse_variables(source: str) -> FrozenSet[str]:
+    names = set()
+    for _, field_name, format_spec, conversion in Formatter().parse(source):
+        if field_name is None:
+            continue
+        if not field_name.isidentifier():
+            raise PromptTemplateError(f"Geçersiz şablon alanı: {{{field_name}}}")
+        if format_spec or conversion:
+            raise PromptTemplateError(f"Format/conversion desteklenmiyor: {{{field_name}}}")
+        names.add(field_name)
+    return frozenset(names)
+
+
+class ChatTemplate:
+    """
+    System + user mesajlarından oluşan sohbet şablonu.
+
+    Şablonlar kayıt sırasında bir kez ayrıştırılır; istek başına sadece
+    `str.format_map` çağrılır. System mesajı sabitse tek bir dict paylaşılır,
+    değişkenliyse (ör. hedef dil) her istekte render edilir.
+    Dönen mesajlar değiştirilmemelidir.
+    """
+
+    def __init__(self, name: str, system: str, user: str):
+        self.name = name
+        self.system = PromptTemplate(system)
+        self.user = PromptTemplate(user)
+        self.variables = self.system.variables | self.user.variables
+        self._system_message: Optional[Message] = (
+            None if self.system.variables else {"role": "system", "content": self.system.render({})}
+        )
+
+    def build(self, **values: str) -> List[Message]:
+        # Eksik değişken render'da KeyError olur; sayı kontrolü fazlasını yakalar
+        if len(values) != len(self.variables):
+            raise PromptTemplateError(
+                f"'{self.name}' için hatalı değişkenler: beklenen {sorted(self.variables)}, gelen {sorted(values)}"
+            )
+        system = self._system_message or {"role": "system", "content": self.system.render(values)}
+        return [system, {"role": "user", "content": self.user.render(values)}]
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class PromptRegistry:
+    """
+    İsimle erişilen şablon kayıt defteri; uygulama başlarken doğrulanır
+    """
+
+    def __init__(self):
+        self._templates: Dict[str, ChatTemplate] = {}
+
+    def register(self, name: str, system: str, user: str, variables: Optional[set] = None) -> ChatTemplate:
+        """
+        Şablonu derleyip kaydet. `variables` verilirse şablondaki
+        değişkenlerle birebir eşleşmesi kontrol edilir.
+        """
+        if name in self._templates:
+            raise PromptTemplateError(f"Şablon zaten kayıtlı: {name}")
+        template = ChatTemplate(name, system, user)
+        if variables is not None and set(variables) != template.variables:
+            raise PromptTemplateError(
+                f"'{name}' değişkenleri uyuşmuyor: beklenen {sorted(variables)}, "
+                f"şablonda {sorted(template.variables)}"
+            )
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> ChatTemplate:
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise PromptTemplateError(f"Bilinmeyen şablon: {name}") from None
+
+    def build(self, name: str, **values: str) -> List[Message]:
+        return self.get(name).build(**values)
+
+    def validate(self):
+        """
+        Her şablonu örnek değerlerle bir kez render ederek başlangıçta doğrula
+        """
+        for template in self._templates.values():
+            template.build(**{var: f"<{var}>" for var in template.variables})
+
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+
+# ============================================================================
+# BACKEND ŞABLONLARI
+# ============================================================================
+
+DEFAULT_SYSTEM_PROMPT = "Sen yardımcı bir asistansın."
+SUMMARIZE_SYSTEM_PROMPT = "Sen bir metin özetleme uzmanısın. Verilen metni kısa ve öz şekilde özetle."
+TRANSLATE_SYSTEM_PROMPT = "Sen bir çevirmensin. Verilen metni {language} diline çevir."
+ANALYZE_SYSTEM_PROMPT = "Sen bir metin analiz uzmanısın. Verilen metni analiz et ve yorum yap."
+
+ANALYZE_USER_PROMPT = "Bu metni analiz et:\n\n{text}"
+
+registry = PromptRegistry()
+registry.register("chat_simple", DEFAULT_SYSTEM_PROMPT, "{message}", {"message"})
+registry.register("summarize", SUMMARIZE_SYSTEM_PROMPT, "Bu metni özetle:\n\n{text}", {"text"})
+registry.register("translate", TRANSLATE_SYSTEM_PROMPT, "Bu metni {language} diline çevir:\n\n{text}", {"language", "text"})
+# Dil verilmeden gelen 'translate' işlemi: varsayılan dilde system prompt + analiz kullanıcı mesajı
+registry.register("translate_default", TRANSLATE_SYSTEM_PROMPT.replace("{language}", "İngilizce"), ANALYZE_USER_PROMPT, {"text"})
+registry.register("analyze", ANALYZE_SYSTEM_PROMPT, ANALYZE_USER_PROMPT, {"text"})
+registry.register("default", DEFAULT_SYSTEM_PROMPT, ANALYZE_USER_PROMPT, {"text"})
+registry.register("translate_quick", TRANSLATE_SYSTEM_PROMPT, "{text}", {"language", "text"})
+registry.register(
+    "code_explain",
+    "Sen bir {language} programlama uzmanısın. Verilen kodu detaylı şekilde açıkla.",
+    "Bu kodu açıkla:\n\n```{fence}\n{code}\n```",
+    {"language", "fence", "code"},
+)
+registry.validate()
+
+# Builder'lar; hot path'te registry araması yapılmaz
+_summarize = registry.get("summarize").build
+_translate = registry.get("translate").build
+_translate_default = registry.get("translate_default").build
+_analyze = registry.get("analyze").build
+_default = registry.get("default").build
+
+
+def build_text_messages(operation: str, text: str, language: Optional[str]) -> List[Message]:
+    """
+    /text/process ve /text/batch için mesaj listesi oluştur
+    """
+    if operation == "summarize":
+        return _summarize(text=text)
+    if operation == "translate":
+        if language:
+            return _translate(language=language, text=text)
+        return _translate_default(text=text)
+    if operation == "analyze":
+        return _analyze(text=text)
+    return _default(text=text)
+
+
+# ============================================================================
+# MİKRO BENCHMARK
+# ============================================================================
+
+def _legacy_build_text_messages(operation: str, text: str, language: Optional[str]) -> List[Message]:
+    # Şablon registry'sinden önceki, her istekte dict ve f-string kuran sürüm
+    system_prompts = {
+        "summarize": "Sen bir metin özetleme uzmanısın. Verilen metni kısa ve öz şekilde özetle.",
+        "translate": f"Sen bir çevirmensin. Verilen metni {language or 'İngilizce'} diline çevir.",
+        "analyze": "Sen bir metin analiz uzmanısın. Verilen metni analiz et ve yorum yap."
+    }
+    system_prompt = system_prompts.get(operation, "Sen yardımcı bir asistansın.")
+    if operation == "translate" and language:
+        user_prompt = f"Bu metni {language} diline çevir:\n\n{text}"
+    elif operation == "summarize":
+        user_prompt = f"Bu metni özetle:\n\n{text}"
+    else:
+        user_prompt = f"Bu metni analiz et:\n\n{text}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def run_benchmark(number: int = 200_000):
+    import timeit
+
+    text = "Yapay zeka, bilgisayarların insan benzeri görevleri yerine getirmesini sağlayan teknolojidir. " * 5
+    cases = [("summarize", None), ("translate", "Almanca"), ("translate", None), ("analyze", None)]
+
+    # Önce iki sürümün aynı mesajları ürettiğini doğrula
+    for operation, language in cases:
+        assert _legacy_build_text_messages(operation, text, language) == build_text_messages(operation, text, language)
+
+    # Her iki sürüm de istek başına 1 µs civarındadır; LLM çağrısının yanında ölçülemez
+    print(f"{'İşlem':<22}{'Önce (µs)':>12}{'Sonra (µs)':>12}{'Önce/Sonra':>12}")
+    for operation, language in cases:
+        before = timeit.timeit(lambda: _legacy_build_text_messages(operation, text, language), number=number)
+        after = timeit.timeit(lambda: build_text_messages(operation, text, language), number=number)
+        label = f"{operation}/{language or '-'}"
+        print(f"{label:<22}{before / number * 1e6:>12.3f}{after / number * 1e6:>12.3f}{before / after:>11.2f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,253 @@
+"""
+Paylaşılan Durum (Shared State)
+Birden fazla worker process'i arasında cache ve rate limiter durumunu paylaşma
+
+Backend, STATE_BACKEND_URL ortam değişkeniyle seçilir:
+    local://                               -> process içi (tek worker, geliştirme)
+    sqlite:////dev/shm/llm_backend.db      -> aynı makinedeki worker'lar (tmpfs = paylaşılan bellek)
+    redis://localhost:6379/0               -> Redis veya Redis uyumlu sunucu (opsiyonel `redis` paketi)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+
+class StateBackend(ABC):
+    """
+    Paylaşılan durum arayüzü: TTL'li key-value cache ve atomik token bucket
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def cache_get(self, key: str) -> Optional[str]:
+        """
+        Süresi dolmamış değeri döndür, yoksa None
+        """
+
+    @abstractmethod
+    def cache_set(self, key: str, value: str, ttl: float):
+        """
+        Değeri `ttl` saniyeliğine yaz
+        """
+
+    @abstractmethod
+    def consume_tokens(self, key: str, amount: float, rate: float, capacity: float,
+                       reserve: float = 0.0) -> float:
+        """
+        Token bucket'tan atomik olarak `amount` tüket. Başarılıysa 0, değilse
+        yeterli token birikene kadar beklenmesi gereken süreyi (saniye) döner.
+        Negatif `amount` token iadesi anlamına gelir.
+        """
+
+    def close(self):
+        pass
+
+
+def _refill_and_consume(tokens: float, updated: float, now: float, amount: float,
+                        rate: float, capacity: float, reserve: float) -> Tuple[float, float]:
+    # (yeni_token_sayısı, bekleme_süresi)
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    amount = min(amount, capacity)
+    if amount <= 0:
+        return min(capacity, tokens - amount), 0.0
+    needed = amount + reserve
+    if tokens >= needed:
+        return tokens - amount, 0.0
+    return tokens, (needed - tokens) / rate
+
+
+# ============================================================================
+# LOCAL (PROCESS İÇİ)
+# ============================================================================
+
+class LocalStateBackend(StateBackend):
+    """
+    Process içi durum; tek worker ve geliştirme ortamı için
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self._cache = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def cache_get(self, key: str) -> Optional[str]:
+        item = self._cache.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.time():
+            self._cache.pop(key, None)
+            return None
+        return value
+
+    def cache_set(self, key: str, value: str, ttl: float):
+        self._cache[key] = (value, time.time() + ttl)
+
+    def consume_tokens(self, key, amount, rate, capacity, reserve=0.0):
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens, wait = _refill_and_consume(tokens, updated, now, amount, rate, capacity, reserve)
+            self._buckets[key] = (tokens, now)
+            return wait
+
+
+# ============================================================================
+# SQLITE (AYNI MAKİNEDEKİ WORKER'LAR)
+# ============================================================================
+
+class SqliteStateBackend(StateBackend):
+    """
+    Aynı makinedeki worker'lar için SQLite tabanlı durum.
+
+    Dosya /dev/shm altında tutulursa disk yerine paylaşılan bellekte (tmpfs)
+    durur. Token bucket güncellemeleri `BEGIN IMMEDIATE` ile atomiktir.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 bağlantıları thread'ler ve fork edilen worker'lar arasında paylaşılmamalı
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def cache_get(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def cache_set(self, key: str, value: str, ttl: float):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, now + ttl)
+        )
+        # Süresi dolan kayıtları ara sıra temizle
+        if hash(key) % 64 == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+
+    def consume_tokens(self, key, amount, rate, capacity, reserve=0.0):
+        conn = self._conn()
+        # Process'ler arası karşılaştırılabilir saat: monotonic değil wall clock
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, wait = _refill_and_consume(tokens, updated, now, amount, rate, capacity, reserve)
+            conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                         (key, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ============================================================================
+# REDIS (REDIS UYUMLU SUNUCU)
+# ============================================================================
+
+_REDIS_TOKEN_BUCKET = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated'))
+local amount = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4])
+local now = tonumber(ARGV[5])
+if tokens == nil then tokens = capacity; updated = now end
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+amount = math.min(amount, capacity)
+local wait = 0
+if amount <= 0 then
+  tokens = math.min(capacity, tokens - amount)
+elseif tokens >= amount + reserve then
+  tokens = tokens - amount
+else
+  wait = (amount + reserve - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Redis (veya Redis uyumlu, ör. KeyDB/Dragonfly) tabanlı durum; birden fazla
+    makinedeki worker'lar için de çalışır
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "llm_backend:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis state backend için `pip install redis` gerekli")
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._token_bucket = self.client.register_script(_REDIS_TOKEN_BUCKET)
+
+    def cache_get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + "cache:" + key)
+
+    def cache_set(self, key: str, value: str, ttl: float):
+        self.client.set(self.prefix + "cache:" + key, value, px=int(ttl * 1000))
+
+    def consume_tokens(self, key, amount, rate, capacity, reserve=0.0):
+        wait = self._token_bucket(
+            keys=[self.prefix + "bucket:" + key],
+            args=[amount, rate, capacity, reserve, time.time()],
+        )
+        return float(wait)
+
+    def close(self):
+        self.client.close()
+
+
+# ============================================================================
+# FACTORY
+# ============================================================================
+
+def create_state_backend(url: Optional[str] = None) -> StateBackend:
+    """
+    URL'e göre state backend oluştur (varsayılan: STATE_BACKEND_URL veya local://)
+    """
+    url = url or os.getenv("STATE_BACKEND_URL", "local://")
+    if url.startswith("local://"):
+        return LocalStateBackend()
+    if url.startswith("sqlite://"):
+        # sqlite:///goreli/yol.db veya sqlite:////mutlak/yol.db
+        return SqliteStateBackend(url[len("sqlite:///"):] or "/dev/shm/llm_backend_state.db")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateBackend(url)
+    raise ValueError(f"Desteklenmeyen STATE_BACKEND_URL: {url}")
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# hafta_7 modules are flat files imported from the project directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,254 @@
+"""
+AdmissionController testleri (pytest-asyncio gerektirmez, her test kendi loop'unu çalıştırır)
+"""
+
+import asyncio
+
+import pytest
+
+from backend_limiter import AdmissionController, AdmissionRejected, AIMDLimit, Priority, TokenBucket
+from shared_state import SqliteStateBackend
+
+MODEL = "gpt-4o-mini"
+# Testler boyunca bucket'ın dolmasını önemsiz kılacak kadar düşük hız
+TPM = 6000
+
+
+def make_controller(limit=2, max_queue=10, wait=1.0, **kwargs):
+    return AdmissionController(
+        tokens_per_minute=TPM,
+        limit=AIMDLimit(initial=limit, max_limit=limit),
+        max_queue=max_queue,
+        max_queue_wait={Priority.INTERACTIVE: wait, Priority.BATCH: wait},
+        **kwargs,
+    )
+
+
+async def _until_queued(ctl, depth=1):
+    while ctl.queue_depth < depth:
+        await asyncio.sleep(0.001)
+
+
+def test_token_bucket_consume_and_wait():
+    bucket = TokenBucket(TPM)
+    assert bucket.try_consume(TPM - 100) == 0
+    wait = bucket.try_consume(1000)
+    assert wait == pytest.approx(900 / (TPM / 60), rel=0.01)
+    bucket.refund(TPM * 2)
+    assert bucket.tokens == TPM
+
+
+def test_admits_up_to_limit():
+    async def scenario():
+        ctl = make_controller(limit=2)
+        permits = [await ctl.acquire(MODEL, 10) for _ in range(2)]
+        assert ctl.in_flight == 2
+        for p in permits:
+            ctl.release(p, latency=0.1)
+        assert ctl.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_token_budget_rejected_with_retry_after():
+    async def scenario():
+        ctl = make_controller()
+        permit = await ctl.acquire(MODEL, TPM - 10)
+        with pytest.raises(AdmissionRejected) as exc:
+            await ctl.acquire(MODEL, 500)
+        assert exc.value.retry_after == pytest.approx(490 / (TPM / 60), rel=0.05)
+        assert exc.value.retry_after_header == "5"
+        # Reddedilen istek slot tutmaz
+        assert ctl.in_flight == 1
+        ctl.release(permit)
+
+    asyncio.run(scenario())
+
+
+def test_batch_leaves_reserve_for_interactive():
+    async def scenario():
+        ctl = make_controller(batch_reserve=0.5)
+        await ctl.acquire(MODEL, TPM // 2, Priority.INTERACTIVE)
+        with pytest.raises(AdmissionRejected):
+            await ctl.acquire(MODEL, 100, Priority.BATCH)
+        await ctl.acquire(MODEL, 100, Priority.INTERACTIVE)
+
+    asyncio.run(scenario())
+
+
+def test_per_model_budgets():
+    async def scenario():
+        ctl = make_controller(model_tokens_per_minute={"small": 100})
+        await ctl.acquire("small", 100)
+        with pytest.raises(AdmissionRejected):
+            await ctl.acquire("small", 50)
+        await ctl.acquire(MODEL, 50)
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_admitted_on_release():
+    async def scenario():
+        ctl = make_controller(limit=1)
+        first = await ctl.acquire(MODEL, 10)
+        waiter = asyncio.ensure_future(ctl.acquire(MODEL, 10))
+        await _until_queued(ctl)
+        ctl.release(first, latency=0.1)
+        second = await waiter
+        assert ctl.in_flight == 1 and ctl.queue_depth == 0
+        ctl.release(second)
+
+    asyncio.run(scenario())
+
+
+def test_interactive_served_before_batch():
+    async def scenario():
+        ctl = make_controller(limit=1)
+        first = await ctl.acquire(MODEL, 10)
+        order = []
+
+        async def waiter(name, priority):
+            permit = await ctl.acquire(MODEL, 10, priority)
+            order.append(name)
+            ctl.release(permit)
+
+        tasks = [asyncio.ensure_future(waiter("batch", Priority.BATCH))]
+        await _until_queued(ctl)
+        tasks.append(asyncio.ensure_future(waiter("interactive", Priority.INTERACTIVE)))
+        await _until_queued(ctl, 2)
+        ctl.release(first)
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "batch"]
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_rejected_and_refunded():
+    async def scenario():
+        ctl = make_controller(limit=1, max_queue=1)
+        await ctl.acquire(MODEL, 10)
+        asyncio.ensure_future(ctl.acquire(MODEL, 10))
+        await _until_queued(ctl)
+        before = ctl._bucket(MODEL).tokens
+        with pytest.raises(AdmissionRejected) as exc:
+            await ctl.acquire(MODEL, 1000)
+        assert exc.value.retry_after > 0
+        assert ctl._bucket(MODEL).tokens == pytest.approx(before, abs=5)
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_timeout_rejected_and_refunded():
+    async def scenario():
+        ctl = make_controller(limit=1, wait=0.05)
+        await ctl.acquire(MODEL, 10)
+        before = ctl._bucket(MODEL).tokens
+        with pytest.raises(AdmissionRejected):
+            await ctl.acquire(MODEL, 1000)
+        assert ctl.queue_depth == 0
+        assert ctl._bucket(MODEL).tokens == pytest.approx(before, abs=5)
+
+    asyncio.run(scenario())
+
+
+async def _wait_refunds(ctl):
+    # İade ayrı bir task'ta çalışır
+    await asyncio.sleep(0.05)
+    while ctl._refund_tasks:
+        await asyncio.sleep(0.01)
+
+
+def _cancel_queued(ctl):
+    async def scenario():
+        await ctl.acquire(MODEL, 10)
+        waiter = asyncio.ensure_future(ctl.acquire(MODEL, 1000))
+        await _until_queued(ctl)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await _wait_refunds(ctl)
+        assert ctl.queue_depth == 0
+        assert ctl.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def _spent(state):
+    # Paylaşılan bucket'ta harcanmış token miktarı (dolum nedeniyle yaklaşık)
+    wait = state.consume_tokens(f"tpm:{MODEL}", TPM, TPM / 60, TPM)
+    return wait * TPM / 60
+
+
+def test_cancelled_acquire_refunds_tokens():
+    ctl = make_controller(limit=1)
+    _cancel_queued(ctl)
+    # İptal edilen isteğin 1000 token'ı geri verildi
+    assert ctl._bucket(MODEL).tokens > TPM - 500
+
+
+def test_cancelled_acquire_refunds_shared_state(tmp_path):
+    state = SqliteStateBackend(str(tmp_path / "state.db"))
+    try:
+        _cancel_queued(make_controller(limit=1, state=state))
+        # Yalnızca kabul edilen isteğin token'ları harcanmış olmalı
+        assert _spent(state) < 500
+    finally:
+        state.close()
+
+
+def test_cancel_during_shared_state_consume_refunds(tmp_path):
+    state = SqliteStateBackend(str(tmp_path / "state.db"))
+    try:
+        ctl = make_controller(limit=1, state=state)
+
+        async def scenario():
+            # İptal, token'lar thread'de tüketilirken (kuyruğa girmeden) gelir
+            waiter = asyncio.ensure_future(ctl.acquire(MODEL, 1000))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await _wait_refunds(ctl)
+
+        asyncio.run(scenario())
+        assert ctl.in_flight == 0
+        assert _spent(state) < 500
+    finally:
+        state.close()
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        ctl = make_controller(limit=2)
+        permit = await ctl.acquire(MODEL, 10)
+        ctl.release(permit)
+        ctl.release(permit)
+        assert ctl.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_aimd_limit_adapts():
+    limit = AIMDLimit(initial=8, min_limit=1, max_limit=10, latency_target=1.0)
+    limit.on_overload()
+    assert limit.limit == 4
+    for _ in range(20):
+        limit.on_success(0.1)
+    assert limit.limit > 4
+    before = limit._limit
+    limit.on_success(5.0)
+    assert limit._limit < before
+    for _ in range(10):
+        limit.on_overload()
+    assert limit.limit == 1
+
+
+def test_overload_release_shrinks_limit():
+    async def scenario():
+        ctl = make_controller(limit=4)
+        ctl.limit.max_limit = 4
+        permit = await ctl.acquire(MODEL, 10)
+        ctl.release(permit, overloaded=True)
+        assert ctl.limit.limit == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,132 @@
+"""
+ConversationMemory testleri
+"""
+
+import chat_history
+from chat_history import ConversationMemory, normalize_history
+
+
+def make_history(n, size=40, start=0):
+    history = []
+    for i in range(start, start + n):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append({"role": role, "content": f"{i}:" + "x" * size})
+    return history
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, summary, evicted):
+        self.calls.append((summary, [m["content"] for m in evicted]))
+        return f"özet{len(self.calls)}"
+
+
+def contents(messages):
+    return [m["content"] for m in messages]
+
+
+def test_normalize_history_formats():
+    assert normalize_history([("merhaba", "selam"), ("nasılsın", None)]) == [
+        {"role": "user", "content": "merhaba"},
+        {"role": "assistant", "content": "selam"},
+        {"role": "user", "content": "nasılsın"},
+    ]
+    messages = [{"role": "user", "content": "a", "metadata": {}}, {"role": "assistant", "content": None}]
+    assert normalize_history(messages) == [{"role": "user", "content": "a"}]
+    assert normalize_history(None) == []
+
+
+def test_small_history_sent_as_is():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer, max_history_tokens=1000)
+    history = make_history(4)
+    messages = memory.build_messages("sys", history, "yeni")
+
+    assert contents(messages) == ["sys"] + contents(history) + ["yeni"]
+    assert summarizer.calls == []
+
+
+def test_overflow_folded_into_summary():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer, max_history_tokens=100, low_watermark=0.5)
+    history = make_history(10)
+    messages = memory.build_messages("sys", history, "yeni")
+
+    assert len(summarizer.calls) == 1
+    evicted = summarizer.calls[0][1]
+    window = contents(messages[2:-1])
+    # Çıkarılanlar + pencere = tüm geçmiş, sıra korunur
+    assert evicted + window == contents(history)
+    assert messages[1] == {"role": "system", "content": "Önceki konuşmanın özeti: özet1"}
+    window_tokens = sum(chat_history.count_tokens(c) + 4 for c in window)
+    assert window_tokens <= 100 * 0.5
+
+
+def test_summary_not_recomputed_every_turn():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer, max_history_tokens=100, low_watermark=0.5)
+    history = make_history(10)
+    memory.build_messages("sys", history, "yeni")
+    # Alt eşiğe inildiği için bir sonraki kısa tur özet çağırmaz
+    history = history + [{"role": "user", "content": "kısa"}]
+    memory.build_messages("sys", history, "yeni")
+    assert len(summarizer.calls) == 1
+
+
+def test_summary_is_incremental():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer, max_history_tokens=100, low_watermark=0.5)
+    history = make_history(10)
+    memory.build_messages("sys", history, "yeni")
+    history = history + make_history(10, start=10)
+    messages = memory.build_messages("sys", history, "yeni")
+
+    assert len(summarizer.calls) == 2
+    # İkinci çağrı önceki özeti alır ve yalnızca yeni çıkarılan mesajları görür
+    assert summarizer.calls[1][0] == "özet1"
+    evicted = summarizer.calls[0][1] + summarizer.calls[1][1]
+    assert evicted + contents(messages[2:-1]) == contents(history)
+
+
+def test_same_length_edit_recounted():
+    memory = ConversationMemory(None, max_history_tokens=100)
+    history = make_history(2, size=4)
+    memory.build_messages("sys", history, "yeni")
+    # Yeniden dene: son yanıt aynı uzunlukta kalır ama içerik büyür
+    edited = history[:-1] + [{"role": "assistant", "content": "y" * 600}]
+    messages = memory.build_messages("sys", edited, "yeni")
+    assert "y" * 600 not in contents(messages)
+
+
+def test_cleared_history_resets_summary():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer, max_history_tokens=100, low_watermark=0.5)
+    memory.build_messages("sys", make_history(10), "yeni")
+    messages = memory.build_messages("sys", [], "yeni")
+    assert contents(messages) == ["sys", "yeni"]
+
+
+def test_sessions_isolated_and_bounded():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer, max_history_tokens=100, low_watermark=0.5, max_sessions=2)
+    memory.build_messages("sys", make_history(10), "yeni", session_id="a")
+    messages = memory.build_messages("sys", make_history(2), "yeni", session_id="b")
+    assert len(messages) == 4
+
+    memory.build_messages("sys", [], "yeni", session_id="c")
+    assert "a" not in memory._sessions
+    memory.reset("b")
+    assert list(memory._sessions) == ["c"]
+
+
+def test_summarizer_error_keeps_chat_going():
+    def failing(summary, evicted):
+        raise RuntimeError("upstream hata")
+
+    memory = ConversationMemory(failing, max_history_tokens=100, low_watermark=0.5)
+    messages = memory.build_messages("sys", make_history(10), "yeni")
+    assert messages[0]["content"] == "sys"
+    assert messages[-1]["content"] == "yeni"
+    assert all("özeti" not in m["content"] for m in messages)
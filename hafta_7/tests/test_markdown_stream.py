@@ -0,0 +1,84 @@
+"""
+IncrementalMarkdownRenderer testleri (Streamlit yerine sahte placeholder)
+"""
+
+from markdown_stream import IncrementalMarkdownRenderer
+
+
+class FakeElement:
+    def __init__(self):
+        self.renders = []
+
+    def markdown(self, text):
+        self.renders.append(text)
+
+    @property
+    def text(self):
+        return self.renders[-1] if self.renders else None
+
+
+class FakeContainer:
+    def __init__(self):
+        self.elements = []
+
+    def empty(self):
+        element = FakeElement()
+        self.elements.append(element)
+        return element
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.box = FakeContainer()
+
+    def container(self):
+        return self.box
+
+
+def render(chunks, frame_interval=0.0):
+    placeholder = FakePlaceholder()
+    renderer = IncrementalMarkdownRenderer(placeholder, frame_interval=frame_interval)
+    for chunk in chunks:
+        renderer.append(chunk)
+    return renderer, placeholder.box.elements
+
+
+def test_finish_returns_full_text_without_cursor():
+    renderer, elements = render(["Mer", "haba ", "dünya"])
+    assert renderer.finish() == "Merhaba dünya"
+    assert elements[-1].text == "Merhaba dünya"
+
+
+def test_cursor_shown_while_streaming():
+    _, elements = render(["Merhaba"])
+    assert elements[-1].text == "Merhaba▌"
+
+
+def test_completed_paragraphs_frozen():
+    renderer, elements = render(["Birinci paragraf.", "\n\nİkinci", " paragraf."])
+    renderer.finish()
+    assert [e.text for e in elements] == ["Birinci paragraf.", "İkinci paragraf."]
+    # Dondurulan paragraf bir daha yeniden çizilmez
+    assert elements[0].renders == ["Birinci paragraf.▌", "Birinci paragraf."]
+    assert elements[1].renders == ["İkinci▌", "İkinci paragraf.▌", "İkinci paragraf."]
+
+
+def test_code_block_not_split():
+    chunks = ["Kod:\n\n```python\nx = 1", "\n\ny = 2\n```", "\n\nSon."]
+    renderer, elements = render(chunks)
+    text = renderer.finish()
+    assert text == "".join(chunks)
+    assert [e.text for e in elements] == ["Kod:", "```python\nx = 1\n\ny = 2\n```", "Son."]
+
+
+def test_frame_interval_limits_renders():
+    _, elements = render(["a"] * 50, frame_interval=60.0)
+    # İlk append hemen çizilir, sonrakiler kare aralığını bekler
+    assert sum(len(e.renders) for e in elements) == 1
+
+
+def test_rendered_frames_join_to_full_text():
+    chunks = ["# Başlık\n", "\nMetin", " burada.\n\n- a\n- b", "\n\n", "Son"]
+    renderer, elements = render(chunks)
+    text = renderer.finish()
+    assert "\n\n".join(e.text for e in elements) == text